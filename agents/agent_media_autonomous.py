@@ -14,6 +14,11 @@ from tools.script_gen import generate_script
 from tools.tts import synthesize_speech
 from tools.slides import create_slides
 from tools.nova_vedio import generate_nova_video
+from tools.catalog import match_product
+from agents.pipeline import run_media_pipeline
+from agents.pool import AgentPool
+from bedrock_helper import get_agent_model
+from prompt_builder import PromptTemplate, record_usage
 import json
 
 # Configure logging
@@ -26,30 +31,11 @@ S3_BUCKET = "my-insurance-agent-bucket"
 # Intent keywords
 INTENT_KEYWORDS = ["insurance", "policy", "annuity", "retirement", "inflation", "pension", "income", "protection"]
 
-def simple_intent_check(text: str) -> bool:
-    t = (text or "").lower()
-    return any(k in t for k in INTENT_KEYWORDS)
-
-
-def run_agent(query: str) -> dict:
-    """Main entry point so router can call this agent dynamically."""
-    if not query:
-        return {"status": "failed", "error": "No user input provided"}
-
-    if not simple_intent_check(query):
-        return {"status": "ignored", "error": "Query not related to insurance/products"}
-
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    s3_prefix = f"runs/run_{ts}"  # All outputs stored under s3://{S3_BUCKET}/{s3_prefix}/
+TOOLS = [recommend_product, generate_script, synthesize_speech, create_slides, generate_nova_video]
 
-    # Minimal agent initialization
-    agent = Agent(
-        tools=[recommend_product, generate_script, synthesize_speech, create_slides, generate_nova_video],
-        model="anthropic.claude-3-haiku-20240307-v1:0"
-    )
-
-    # Rich system prompt for full orchestration
-    system_prompt = f"""
+# Rich system prompt for full orchestration. It is static (sent once per agent as the
+# cacheable system prompt); the S3 context and the request go into the user message.
+SYSTEM_PROMPT = """
 You are an autonomous orchestrator agent for insurance & media workflows.
 
 RULES:
@@ -60,17 +46,13 @@ RULES:
   4) create_slides(product: dict, s3_bucket: str, s3_prefix: str) -> {{ "slides_s3_uri": "<S3 URI>" }}
   5) generate_nova_video(narration_script_s3_uri: str, narration_audio_s3_uri: str, s3_bucket: str, s3_prefix: str) -> {{ "video_s3_uri": "<S3 URI>" }}
 
-- Your task is to create an **end-to-end workflow** for the user request below.
+- Your task is to create an **end-to-end workflow** for the user request.
 - Always validate the output of each tool before calling the next.
 - Retry automatically if a tool fails, up to 2 times.
 - If a tool fails after retries, continue with remaining steps.
+- All outputs must be saved under the S3 bucket and prefix given in CONTEXT.
 - Return the final JSON containing all URIs, status, and errors.
 
-CONTEXT:
-- S3 bucket: {S3_BUCKET}
-- S3 prefix: {s3_prefix}
-- All outputs must be saved under s3://{S3_BUCKET}/{s3_prefix}/
-
 FINAL OUTPUT FORMAT:
 {{
     "recommended_product": <product dict>,
@@ -81,12 +63,49 @@ FINAL OUTPUT FORMAT:
     "status": "success" | "partial_success" | "failed",
     "error": "<error messages if any>"
 }}
+"""
+
+AGENT_PROMPT = PromptTemplate(SYSTEM_PROMPT, """
+CONTEXT:
+- S3 bucket: {bucket}
+- S3 prefix: {prefix}
+- All outputs must be saved under s3://{bucket}/{prefix}/
 
 User request: {query}
-"""
+""", call_site="agent_media_autonomous")
+
+# Warm agents reused across requests instead of building one per query (see agents/pool.py)
+AGENT_POOL = AgentPool(lambda: Agent(
+    tools=TOOLS,
+    model=get_agent_model(),  # shares the process-wide Bedrock rate limiter
+    system_prompt=AGENT_PROMPT.static
+), name="agent_media_autonomous")
+
+def simple_intent_check(text: str) -> bool:
+    t = (text or "").lower()
+    return any(k in t for k in INTENT_KEYWORDS)
+
+
+def run_agent(query: str) -> dict:
+    """Main entry point so router can call this agent dynamically."""
+    if not query:
+        return {"status": "failed", "error": "No user input provided"}
+
+    if not simple_intent_check(query):
+        return {"status": "ignored", "error": "Query not related to insurance/products"}
+
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    s3_prefix = f"runs/run_{ts}"  # All outputs stored under s3://{S3_BUCKET}/{s3_prefix}/
+
+    # Unambiguous product request: run the fixed DAG directly, no LLM orchestration turns
+    if match_product(query) is not None:
+        logger.info("Query matches a catalog product, running deterministic pipeline...")
+        return run_media_pipeline(query, S3_BUCKET, s3_prefix)
 
     logger.info("Dispatching to autonomous orchestrator agent...")
-    result = agent(system_prompt)
+    with AGENT_POOL.checkout() as agent:
+        result = agent(AGENT_PROMPT.render(bucket=S3_BUCKET, prefix=s3_prefix, query=query))
+        record_usage(AGENT_PROMPT.call_site, getattr(getattr(result, "metrics", None), "accumulated_usage", None))
     logger.info("Raw agent response: %s", result)
 
     # Convert result to dict safely
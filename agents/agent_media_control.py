@@ -12,7 +12,12 @@ from datetime import datetime
 import logging
 import json
 from strands import Agent
-from tools.tool_registry import list_tools
+from tools.tool_registry import list_tool_specs, list_tools
+from tools.catalog import match_product
+from agents.pipeline import run_media_pipeline
+from agents.pool import AgentPool
+from bedrock_helper import get_agent_model
+from prompt_builder import PromptTemplate, record_usage, render_tools
 
 
 # Show rich UI for tools in CLI
@@ -26,41 +31,17 @@ S3_BUCKET = "my-insurance-agent-bucket"
 
 INTENT_KEYWORDS = ["insurance", "policy", "annuity", "retirement", "inflation", "pension", "income", "protection"]
 
-def simple_intent_check(text: str) -> bool:
-    t = (text or "").lower()
-    return any(k in t for k in INTENT_KEYWORDS)
-
-
-def run_agent(query: str) -> dict:
-    """Main entry point so router can call this agent dynamically."""
-    if not query:
-        return {"status": "failed", "error": "No user input provided"}
-
-    if not simple_intent_check(query):
-        return {"status": "ignored", "error": "Query not related to insurance/products.I am here to help you with insurance products, policies, annuities, and retirement plans."
-        " Please ask me anything about these topics."
-        " For example, you can say: 'Recommend an annuity product for retirement income'."
-        " I will always provide structured JSON output for easy integration."
-        " Feel free to ask me about insurance products, policies, annuities, and retirement plans."
-        }
-
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    s3_prefix = f"runs/run_{ts}"
-
-    # Minimal Agent, fully LLM-driven orchestration
-    agent = Agent(
-        tools=list_tools(),
-        model="anthropic.claude-3-haiku-20240307-v1:0"
-    )
-
-    system_prompt = f"""
+# Rules, tool schemas and output format are static: rendered once and used as the agent's
+# (cacheable) system prompt. Only the S3 prefix and the query go into each request.
+SYSTEM_PROMPT = """
 You are a dynamic orchestrator for insurance and media workflows.
 
 Rules:
 1) Decide which tools to call, in what order, based on the user query.
 2) Handle retries, missing inputs, and logical flow yourself.
-3) Use only the tools from the registry: {list_tools()}
-4) Store all outputs in S3: bucket {S3_BUCKET}, prefix {s3_prefix}
+3) Use only these tools from the registry:
+{tool_schemas}
+4) Store all outputs in S3 under the bucket and prefix given with the query.
 5) Return a single JSON at the end with:
 {{
   "recommended_product": <product dict>,
@@ -80,12 +61,48 @@ Rules:
     }}
   ]
 }}
-
-User query: {query}
 """
 
+AGENT_PROMPT = PromptTemplate(SYSTEM_PROMPT, "S3 bucket: {bucket}\nS3 prefix: {prefix}\n\nUser query: {query}",
+                              call_site="agent_media_control", tool_schemas=render_tools(list_tool_specs()))
+
+# Warm agents reused across requests instead of building one per query (see agents/pool.py)
+AGENT_POOL = AgentPool(lambda: Agent(
+    tools=list_tools(),
+    model=get_agent_model(),  # shares the process-wide Bedrock rate limiter
+    system_prompt=AGENT_PROMPT.static
+), name="agent_media_control")
+
+def simple_intent_check(text: str) -> bool:
+    t = (text or "").lower()
+    return any(k in t for k in INTENT_KEYWORDS)
+
+
+def run_agent(query: str) -> dict:
+    """Main entry point so router can call this agent dynamically."""
+    if not query:
+        return {"status": "failed", "error": "No user input provided"}
+
+    if not simple_intent_check(query):
+        return {"status": "ignored", "error": "Query not related to insurance/products.I am here to help you with insurance products, policies, annuities, and retirement plans."
+        " Please ask me anything about these topics."
+        " For example, you can say: 'Recommend an annuity product for retirement income'."
+        " I will always provide structured JSON output for easy integration."
+        " Feel free to ask me about insurance products, policies, annuities, and retirement plans."
+        }
+
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    s3_prefix = f"runs/run_{ts}"
+
+    # Unambiguous product request: run the fixed DAG directly, no LLM orchestration turns
+    if match_product(query) is not None:
+        logger.info("Query matches a catalog product, running deterministic pipeline...")
+        return run_media_pipeline(query, S3_BUCKET, s3_prefix)
+
     logger.info("Dispatching user query to LLM agent...")
-    result = agent(system_prompt)
+    with AGENT_POOL.checkout() as agent:
+        result = agent(AGENT_PROMPT.render(bucket=S3_BUCKET, prefix=s3_prefix, query=query))
+        record_usage(AGENT_PROMPT.call_site, getattr(getattr(result, "metrics", None), "accumulated_usage", None))
     #logger.info("Raw agent response: %s", result)
 
     # Parse final JSON
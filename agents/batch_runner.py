@@ -0,0 +1,378 @@
+# agents/batch_runner.py
+"""
+Bulk media generation for a product list or the whole catalog.
+Each product runs the script → (TTS | slides | Nova video) graph on the
+deterministic pipeline engine; every stage has its own concurrency bound
+shared across products, so e.g. Nova jobs stay under the account limit while
+scripts and slides keep flowing. Progress is appended to a JSONL checkpoint
+after each product, so a rerun to the same bucket and prefix skips products
+that already succeeded there.
+
+Usage:
+    python agents/batch_runner.py --bucket my-bucket --prefix batch/compliance_v2
+    python agents/batch_runner.py --products p01,p02 --stages generate_script,synthesize_speech
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))  # add project root to path
+
+import argparse
+import json
+import logging
+import math
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from agents.pipeline import Pipeline, PipelineNode, _tool_name
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+S3_BUCKET = os.environ.get("BATCH_S3_BUCKET", "my-insurance-agent-bucket")
+CHECKPOINT_PATH = os.environ.get("BATCH_CHECKPOINT_PATH", os.path.join(PROJECT_ROOT, ".cache", "batch_checkpoint.jsonl"))
+MAX_PRODUCTS_IN_FLIGHT = int(os.environ.get("BATCH_MAX_PRODUCTS", "16"))
+SCRIPT_BATCH_LINGER = float(os.environ.get("SCRIPT_BATCH_LINGER", "0.5"))
+
+STAGES = ("generate_script", "synthesize_speech", "create_slides", "generate_nova_video")
+DEFAULT_STAGE_LIMITS = {"generate_script": 8, "synthesize_speech": 8, "create_slides": 16, "generate_nova_video": 4}
+STAGE_DEPS = {
+    "generate_script": (),
+    "synthesize_speech": ("generate_script",),
+    "create_slides": (),
+    "generate_nova_video": ("generate_script",),
+}
+
+
+def product_id(product: dict):
+    """Id used for S3 paths and checkpoint records: the product id, else its name."""
+    return product.get("id") or product.get("name")
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile of a list (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class StageLimiter:
+    """Per-stage semaphores shared by every product, plus wait/run timings for the report."""
+
+    def __init__(self, limits: dict):
+        self.limits = dict(limits)
+        self._slots = {stage: threading.BoundedSemaphore(n) for stage, n in self.limits.items()}
+        self._lock = threading.Lock()
+        self.run_seconds = {stage: [] for stage in self.limits}
+        self.wait_seconds = {stage: [] for stage in self.limits}
+
+    def wrap(self, stage: str, func):
+        slots = self._slots[stage]
+
+        def limited(ctx, results):
+            queued = time.perf_counter()
+            with slots:
+                started = time.perf_counter()
+                try:
+                    return func(ctx, results)
+                finally:
+                    finished = time.perf_counter()
+                    with self._lock:
+                        self.wait_seconds[stage].append(started - queued)
+                        self.run_seconds[stage].append(finished - started)
+        return limited
+
+    def report(self) -> dict:
+        with self._lock:
+            return {
+                stage: {
+                    "calls": len(runs),
+                    "p50": round(percentile(runs, 50), 3),
+                    "p95": round(percentile(runs, 95), 3),
+                    "p99": round(percentile(runs, 99), 3),
+                    "mean_wait": round(sum(self.wait_seconds[stage]) / len(runs), 3) if runs else 0.0,
+                }
+                for stage, runs in self.run_seconds.items()
+            }
+
+
+class ScriptBatcher:
+    """
+    Micro-batches generate_script calls from concurrent product runs into
+    packed multi-product prompts (tools.script_gen.generate_scripts_batch).
+    A batch is sent when batch_size products are waiting or after `linger` seconds.
+    """
+
+    def __init__(self, s3_bucket: str, s3_prefix: str, batch_size: int = None, linger: float = SCRIPT_BATCH_LINGER,
+                 generate=None):
+        from tools.script_gen import BATCH_SIZE, generate_scripts_batch
+        self.s3_bucket = s3_bucket
+        self.s3_prefix = s3_prefix
+        self.batch_size = batch_size or BATCH_SIZE
+        self.linger = linger
+        self._generate = generate or generate_scripts_batch
+        self._waiting = []  # (product_id, product, future)
+        self._lock = threading.Lock()
+        self._timer = None
+        self.calls = 0
+
+    def submit(self, product: dict) -> Future:
+        future = Future()
+        pid = str(product_id(product))
+        with self._lock:
+            self._waiting.append((pid, product, future))
+            batch = self._take() if len(self._waiting) >= self.batch_size else None
+            if batch is None and self._timer is None:
+                self._timer = threading.Timer(self.linger, self._flush_waiting)
+                self._timer.daemon = True
+                self._timer.start()
+        if batch:
+            self._run(batch)
+        return future
+
+    def _take(self) -> list:
+        batch, self._waiting = self._waiting, []
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+
+    def _flush_waiting(self):
+        with self._lock:
+            self._timer = None
+            batch = self._take()
+        if batch:
+            self._run(batch)
+
+    def _run(self, batch: list):
+        with self._lock:
+            self.calls += 1
+        try:
+            results = self._generate([p for _, p, _ in batch], self.s3_bucket, self.s3_prefix,
+                                     batch_size=len(batch))
+        except Exception as e:
+            results = {pid: {"error": str(e)} for pid, _, _ in batch}
+        for pid, _, future in batch:
+            future.set_result(results.get(pid) or {"error": "No narration returned"})
+
+
+def build_product_pipeline(limiter: StageLimiter, tools=None, stages=STAGES, retries: int = 1,
+                           script_batcher: ScriptBatcher = None) -> Pipeline:
+    """
+    Per-product graph over the selected stages; the product comes from ctx["product"].
+    With a script_batcher, narrations come from packed prompts and fall back
+    to the single-product generate_script tool for products that fail there.
+    """
+    if tools is None:
+        from tools.tool_registry import list_lazy_tools
+        tools = list_lazy_tools()  # tool modules are imported when a node first runs
+    by_name = {_tool_name(t): t for t in tools}
+
+    def script(ctx, res):
+        if script_batcher is not None:
+            result = script_batcher.submit(ctx["product"]).result()
+            if "error" not in result:
+                return result
+            logger.warning(f"⚠️ Packed script failed ({result['error']}), using generate_script")
+        return by_name["generate_script"](product=ctx["product"], s3_bucket=ctx["s3_bucket"], s3_prefix=ctx["s3_prefix"])
+
+    calls = {
+        "generate_script": script,
+        "synthesize_speech": lambda ctx, res: by_name["synthesize_speech"](
+            script_s3_uri=res["generate_script"]["narration_script_s3_uri"],
+            s3_bucket=ctx["s3_bucket"], s3_prefix=ctx["s3_prefix"]),
+        "create_slides": lambda ctx, res: by_name["create_slides"](
+            product=ctx["product"], s3_bucket=ctx["s3_bucket"], s3_prefix=ctx["s3_prefix"]),
+        "generate_nova_video": lambda ctx, res: by_name["generate_nova_video"](
+            narration_script_s3_uri=res["generate_script"]["narration_script_s3_uri"],
+            s3_bucket=ctx["s3_bucket"], s3_prefix=ctx["s3_prefix"]),
+    }
+    selected = set(stages)
+    for stage in selected:
+        missing = [d for d in STAGE_DEPS[stage] if d not in selected]
+        if missing:
+            raise ValueError(f"Stage '{stage}' needs {missing}")
+    nodes = [
+        PipelineNode(stage, limiter.wrap(stage, calls[stage]), deps=STAGE_DEPS[stage], retries=retries)
+        for stage in STAGES if stage in selected
+    ]
+    return Pipeline(nodes, max_workers=len(nodes))
+
+
+class Checkpoint:
+    """
+    Append-only JSONL of finished products; the last line per product id wins.
+    Records carry the bucket and prefix they were written to, so one file can
+    serve several output locations without a run skipping another's products.
+    """
+
+    def __init__(self, path: str = CHECKPOINT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._checked_tail = False
+
+    def load(self, s3_bucket: str = None, s3_prefix: str = None) -> dict:
+        """Last record per product id, only from runs to s3_bucket/s3_prefix when given."""
+        records = {}
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn last line from a crash
+                if s3_bucket is not None and record.get("s3_bucket") != s3_bucket:
+                    continue
+                if s3_prefix is not None and record.get("s3_prefix") != s3_prefix:
+                    continue
+                records[record["product_id"]] = record
+        return records
+
+    def _ends_torn(self) -> bool:
+        """True if the file ends mid-line (a crash during append)."""
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                return f.read(1) != b"\n"
+        except OSError:
+            return False  # missing or empty
+
+    def append(self, record: dict):
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            if not self._checked_tail:
+                # Terminate a torn last line so this record is not glued onto it
+                if self._ends_torn():
+                    line = "\n" + line
+                self._checked_tail = True
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+
+def load_products(catalog_path: str = None, product_ids=None) -> list:
+    """Products from a catalog file (default: the service's catalog), optionally filtered by id."""
+    if catalog_path:
+        from tools.catalog_store import load_catalog
+        catalog = load_catalog(catalog_path)
+        products = [catalog[i] for i in range(len(catalog))]
+    else:
+        from tools.catalog import CATALOG_SERVICE
+        with CATALOG_SERVICE.lease() as snap:  # a reload mid-copy must not close the catalog
+            products = [snap.catalog[i] for i in range(len(snap.catalog))]
+    if product_ids:
+        wanted = set(product_ids)
+        products = [p for p in products if p.get("id") in wanted]
+    return products
+
+
+def run_batch(products: list, s3_bucket: str = S3_BUCKET, s3_prefix: str = "batch",
+              checkpoint: Checkpoint = None, stages=STAGES, stage_limits: dict = None,
+              max_products: int = MAX_PRODUCTS_IN_FLIGHT, tools=None, resume: bool = True,
+              packed_scripts: bool = True) -> dict:
+    """
+    Generate media for every product, writing to {s3_prefix}/{product_id}/.
+    Products already marked "success" in the checkpoint for this bucket and
+    prefix are skipped when resume=True.
+    packed_scripts=True generates narrations several products per Bedrock call.
+    Returns a report with counts, throughput and per-stage latency percentiles.
+    """
+    checkpoint = checkpoint or Checkpoint()
+    limits = dict(DEFAULT_STAGE_LIMITS, **(stage_limits or {}))
+    limiter = StageLimiter({s: limits[s] for s in stages})
+    batcher = ScriptBatcher(s3_bucket, s3_prefix) if packed_scripts and "generate_script" in stages else None
+    pipeline = build_product_pipeline(limiter, tools=tools, stages=stages, script_batcher=batcher)
+
+    previous = checkpoint.load(s3_bucket, s3_prefix) if resume else {}
+    done = {pid for pid, r in previous.items() if r.get("status") == "success"}
+    todo = [p for p in products if product_id(p) not in done]
+    logger.info(f"📦 Batch: {len(products)} products, {len(products) - len(todo)} already done, {len(todo)} to run")
+
+    counts = {"success": 0, "partial_success": 0, "failed": 0}
+    counts_lock = threading.Lock()
+
+    def run_one(product):
+        pid = product_id(product)
+        started = time.perf_counter()
+        run = pipeline.run({"product": product, "s3_bucket": s3_bucket, "s3_prefix": f"{s3_prefix}/{pid}"})
+        steps = run["steps"]
+        ok = [s for s in steps if s["status"] == "success"]
+        status = "success" if len(ok) == len(pipeline.nodes) else ("partial_success" if ok else "failed")
+        checkpoint.append({
+            "product_id": pid,
+            "s3_bucket": s3_bucket,
+            "s3_prefix": s3_prefix,
+            "status": status,
+            "outputs": {name: out for name, out in run["results"].items() if "error" not in out},
+            "errors": {s["tool"]: s["error"] for s in steps if s.get("error")},
+            "seconds": round(time.perf_counter() - started, 3),
+            "finished_at": time.time(),
+        })
+        with counts_lock:
+            counts[status] += 1
+        logger.info(f"{'✅' if status == 'success' else '⚠️'} {pid}: {status}")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_products, thread_name_prefix="batch") as pool:
+        for future in [pool.submit(run_one, p) for p in todo]:
+            future.result()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "products": len(products),
+        "resumed_skipped": len(products) - len(todo),
+        **counts,
+        "elapsed_seconds": round(elapsed, 2),
+        "products_per_hour": round(len(todo) / elapsed * 3600, 1) if elapsed > 0 else 0.0,
+        "stage_limits": limiter.limits,
+        "packed_script_calls": batcher.calls if batcher else 0,
+        "stages": limiter.report(),
+    }
+
+
+def _parse_limits(text: str) -> dict:
+    limits = {}
+    for part in filter(None, (text or "").split(",")):
+        stage, _, n = part.partition("=")
+        limits[stage.strip()] = int(n)
+    return limits
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Generate media for many catalog products.")
+    parser.add_argument("--catalog", help="catalog file (.json/.ndjson/.pcat); default: PRODUCT_CATALOG_PATH")
+    parser.add_argument("--products", help="comma-separated product ids (default: all)")
+    parser.add_argument("--bucket", default=S3_BUCKET)
+    parser.add_argument("--prefix", default="batch", help="S3 prefix; outputs go to {prefix}/{product_id}/")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH)
+    parser.add_argument("--stages", default=",".join(STAGES))
+    parser.add_argument("--limits", default="", help="per-stage concurrency, e.g. generate_nova_video=2,generate_script=16")
+    parser.add_argument("--max-products", type=int, default=MAX_PRODUCTS_IN_FLIGHT)
+    parser.add_argument("--no-resume", action="store_true", help="rerun products that already succeeded")
+    parser.add_argument("--single-scripts", action="store_true", help="one Bedrock call per product script")
+    args = parser.parse_args()
+
+    report = run_batch(
+        load_products(args.catalog, args.products.split(",") if args.products else None),
+        s3_bucket=args.bucket,
+        s3_prefix=args.prefix.strip("/"),
+        checkpoint=Checkpoint(args.checkpoint),
+        stages=[s.strip() for s in args.stages.split(",") if s.strip()],
+        stage_limits=_parse_limits(args.limits),
+        max_products=args.max_products,
+        resume=not args.no_resume,
+        packed_scripts=not args.single_scripts,
+    )
+    print(f"\n📊 {report['products']} products ({report['resumed_skipped']} resumed): "
+          f"{report['success']} ok, {report['partial_success']} partial, {report['failed']} failed "
+          f"in {report['elapsed_seconds']}s ({report['products_per_hour']} products/hour)")
+    print(f"{'stage':<22}{'calls':>7}{'p50 s':>9}{'p95 s':>9}{'p99 s':>9}{'wait s':>9}")
+    for stage, s in report["stages"].items():
+        print(f"{stage:<22}{s['calls']:>7}{s['p50']:>9}{s['p95']:>9}{s['p99']:>9}{s['mean_wait']:>9}")
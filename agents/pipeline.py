@@ -0,0 +1,232 @@
+# agents/pipeline.py
+"""
+Deterministic DAG pipeline engine for the insurance-media workflow.
+Each tool becomes a node with declared dependencies; independent nodes
+run concurrently on a bounded thread pool, so no LLM turn is spent on
+sequencing and TTS / slides / Nova video overlap instead of queueing.
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))  # add project root to path
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+DEFAULT_MAX_WORKERS = int(os.environ.get("PIPELINE_MAX_WORKERS", "4"))
+
+
+class PipelineNode:
+    """
+    One step of a pipeline.
+    `func(ctx, results)` receives the run context and the outputs of the
+    finished nodes, and returns a dict; a dict with an "error" key is a failure.
+    """
+
+    def __init__(self, name: str, func, deps=(), retries: int = 0):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.retries = retries
+
+
+class Pipeline:
+    """Run a set of PipelineNodes in dependency order with parallel fan-out."""
+
+    def __init__(self, nodes, max_workers: int = DEFAULT_MAX_WORKERS):
+        self.nodes = {n.name: n for n in nodes}
+        self.max_workers = max_workers
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> list:
+        for node in self.nodes.values():
+            missing = [d for d in node.deps if d not in self.nodes]
+            if missing:
+                raise ValueError(f"Node '{node.name}' depends on unknown nodes: {missing}")
+
+        order, done, visiting = [], set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle detected at node '{name}'")
+            visiting.add(name)
+            for dep in self.nodes[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.nodes:
+            visit(name)
+        return order
+
+    def _call(self, node: PipelineNode, ctx: dict, results: dict) -> tuple:
+        started = time.perf_counter()
+        try:
+            output = node.func(ctx, results)
+        except Exception as e:
+            output = {"error": str(e)}
+        if not isinstance(output, dict):
+            output = {"error": f"Node returned {type(output).__name__}, expected dict"}
+        return output, time.perf_counter() - started
+
+    def run(self, ctx: dict) -> dict:
+        """
+        Execute the graph. Nodes whose dependencies failed are skipped.
+        Returns {"results": {name: output}, "steps": [...]} with steps in graph order.
+        """
+        results, steps, attempts = {}, {}, {}
+        pending = list(self.order)
+        running = {}
+
+        def ready(name):
+            return all(d in results and "error" not in results[d] for d in self.nodes[name].deps)
+
+        def blocked(name):
+            return any(d in steps and steps[d]["status"] != "success" for d in self.nodes[name].deps)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline") as pool:
+            while pending or running:
+                for name in list(pending):
+                    if blocked(name):
+                        pending.remove(name)
+                        steps[name] = {"tool": name, "status": "skipped", "error": "Upstream step failed"}
+                    elif ready(name):
+                        pending.remove(name)
+                        attempts[name] = attempts.get(name, 0) + 1
+                        running[pool.submit(self._call, self.nodes[name], ctx, dict(results))] = name
+
+                if not running:
+                    continue
+
+                finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    name = running.pop(fut)
+                    output, elapsed = fut.result()
+                    node = self.nodes[name]
+                    if "error" in output and attempts[name] <= node.retries:
+                        logger.warning(f"⚠️ {name} failed ({output['error']}), retrying ({attempts[name]}/{node.retries})")
+                        attempts[name] += 1
+                        running[pool.submit(self._call, node, ctx, dict(results))] = name
+                        continue
+                    results[name] = output
+                    steps[name] = {
+                        "tool": name,
+                        "output": output,
+                        "status": "failed" if "error" in output else "success",
+                        "error": output.get("error"),
+                        "attempts": attempts[name],
+                        "seconds": round(elapsed, 3),
+                    }
+                    logger.info(f"✅ {name} finished: {steps[name]['status']} in {elapsed:.2f}s")
+
+        return {"results": results, "steps": [steps[n] for n in self.order if n in steps]}
+
+
+# ---------------------------------------------------------------------------
+# Media workflow graph
+#
+#   recommend_product ─┬─> generate_script ─┬─> synthesize_speech
+#                      │                    └─> generate_nova_video
+#                      └─> create_slides
+# ---------------------------------------------------------------------------
+
+def _tool_name(t) -> str:
+    return getattr(t, "tool_name", None) or getattr(t, "__name__", str(t))
+
+
+def build_media_pipeline(tools=None, max_workers: int = DEFAULT_MAX_WORKERS, retries: int = 1) -> Pipeline:
+    """
+    Build the media workflow DAG from the tools in tools.tool_registry.list_lazy_tools().
+    `tools` may be passed explicitly (list of tool callables) for custom wiring.
+    """
+    if tools is None:
+        from tools.tool_registry import list_lazy_tools
+        tools = list_lazy_tools()  # tool modules are imported when a node first runs
+    by_name = {_tool_name(t): t for t in tools}
+
+    def recommend(ctx, res):
+        return by_name["recommend_product"](user_text=ctx["query"])
+
+    def script(ctx, res):
+        return by_name["generate_script"](
+            product=res["recommend_product"], s3_bucket=ctx["s3_bucket"], s3_prefix=ctx["s3_prefix"]
+        )
+
+    def speech(ctx, res):
+        return by_name["synthesize_speech"](
+            script_s3_uri=res["generate_script"]["narration_script_s3_uri"],
+            s3_bucket=ctx["s3_bucket"], s3_prefix=ctx["s3_prefix"],
+        )
+
+    def slides(ctx, res):
+        return by_name["create_slides"](
+            product=res["recommend_product"], s3_bucket=ctx["s3_bucket"], s3_prefix=ctx["s3_prefix"]
+        )
+
+    def video(ctx, res):
+        return by_name["generate_nova_video"](
+            narration_script_s3_uri=res["generate_script"]["narration_script_s3_uri"],
+            s3_bucket=ctx["s3_bucket"], s3_prefix=ctx["s3_prefix"],
+        )
+
+    nodes = [
+        PipelineNode("recommend_product", recommend),
+        PipelineNode("generate_script", script, deps=["recommend_product"], retries=retries),
+        PipelineNode("synthesize_speech", speech, deps=["generate_script"], retries=retries),
+        PipelineNode("create_slides", slides, deps=["recommend_product"], retries=retries),
+        PipelineNode("generate_nova_video", video, deps=["generate_script"], retries=retries),
+    ]
+    return Pipeline(nodes, max_workers=max_workers)
+
+
+_MEDIA_PIPELINE = None
+
+
+def get_media_pipeline() -> Pipeline:
+    """Process-wide media pipeline, built on first use."""
+    global _MEDIA_PIPELINE
+    if _MEDIA_PIPELINE is None:
+        _MEDIA_PIPELINE = build_media_pipeline()
+    return _MEDIA_PIPELINE
+
+
+def run_media_pipeline(query: str, s3_bucket: str, s3_prefix: str, pipeline: Pipeline = None) -> dict:
+    """
+    Run recommend → script → (TTS | slides | Nova video) without LLM orchestration.
+    Returns the same final JSON shape as the LLM-driven agents.
+    """
+    pipeline = pipeline or get_media_pipeline()
+    run = pipeline.run({"query": query, "s3_bucket": s3_bucket, "s3_prefix": s3_prefix})
+    res, steps = run["results"], run["steps"]
+
+    def field(node, key):
+        out = res.get(node) or {}
+        return None if "error" in out else out.get(key)
+
+    errors = [f"{s['tool']}: {s['error']}" for s in steps if s.get("error")]
+    succeeded = [s for s in steps if s["status"] == "success"]
+    if len(succeeded) == len(pipeline.nodes):
+        status = "success"
+    elif succeeded:
+        status = "partial_success"
+    else:
+        status = "failed"
+
+    product = res.get("recommend_product")
+    return {
+        "recommended_product": None if not product or "error" in product else product,
+        "narration_script_s3_uri": field("generate_script", "narration_script_s3_uri"),
+        "narration_audio_s3_uri": field("synthesize_speech", "narration_audio_s3_uri"),
+        "slides_s3_uri": field("create_slides", "slides_s3_uri"),
+        "video_s3_uri": field("generate_nova_video", "video_s3_uri"),
+        "status": status,
+        "error": "; ".join(errors) or None,
+        "steps": steps,
+        "orchestration": "pipeline",
+    }
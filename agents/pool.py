@@ -0,0 +1,120 @@
+"""
+Pool of warm strands Agents.
+Building an Agent registers its tools (tool spec generation) and wires up
+the model; doing that on every query is wasted work when the tools, model
+and system prompt never change. An AgentPool creates up to `size` agents
+on demand and hands them out one request at a time; when a request ends
+the agent is reset to a clean conversation (messages, state, metrics) and
+returned for the next one. strands Agents are not safe to share between
+threads, so each checked-out agent is used by exactly one request.
+"""
+import logging
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+AGENT_POOL_SIZE = int(os.environ.get("MEDIA_AGENT_POOL_SIZE", "4"))
+CHECKOUT_TIMEOUT_SECONDS = float(os.environ.get("MEDIA_AGENT_POOL_TIMEOUT", "300"))
+
+
+def reset_agent(agent):
+    """Drop everything a request left behind so the next request starts fresh."""
+    agent.messages.clear()
+    # Fresh instances of the same types: keeps us off strands internals while
+    # making result.metrics / agent.state per-request again
+    for attr in ("state", "event_loop_metrics"):
+        current = getattr(agent, attr, None)
+        if current is not None:
+            try:
+                setattr(agent, attr, type(current)())
+            except TypeError:
+                pass  # type needs arguments; leave it as is
+    manager = getattr(agent, "conversation_manager", None)
+    if manager is not None and hasattr(manager, "removed_message_count"):
+        manager.removed_message_count = 0
+
+
+class AgentPool:
+    """
+    Bounded pool of agents built by `factory`. Safe to share between threads.
+    The queue starts with `size` empty slots (None); taking an empty slot
+    builds an agent, so agents are created lazily and never exceed `size`.
+    """
+
+    def __init__(self, factory, size: int = AGENT_POOL_SIZE, name: str = "agent"):
+        self.factory = factory
+        self.size = max(1, size)
+        self.name = name
+        # Most recently returned agent first, so steady traffic reuses the same few
+        # agents. HTTP connections are not per agent: they live on the shared
+        # get_agent_model() client whichever agent is checked out.
+        self._slots = queue.LifoQueue()
+        for _ in range(self.size):
+            self._slots.put(None)
+        self._lock = threading.Lock()
+        self.stats = {"checkouts": 0, "created": 0, "discarded": 0, "waits": 0}
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _fill(self, slot):
+        """An agent for a slot taken from the queue; on failure the empty slot goes back."""
+        if slot is not None:
+            return slot
+        try:
+            agent = self.factory()
+        except Exception:
+            self._slots.put(None)
+            raise
+        self._count("created")
+        logger.info(f"🧩 {self.name} pool: built agent ({self.stats['created']} created, size {self.size})")
+        return agent
+
+    def warm(self, count: int = None):
+        """Build agents ahead of the first requests (fills every empty slot by default)."""
+        taken = []
+        try:
+            for _ in range(min(count or self.size, self.size)):
+                taken.append(self._fill(self._slots.get_nowait()))
+        except queue.Empty:
+            pass
+        finally:
+            for agent in taken:
+                self._slots.put(agent)
+
+    def _acquire(self, timeout: float):
+        try:
+            slot = self._slots.get_nowait()
+        except queue.Empty:
+            self._count("waits")
+            try:
+                slot = self._slots.get(timeout=timeout)
+            except queue.Empty:
+                raise TimeoutError(f"No {self.name} agent free within {timeout:g}s (pool size {self.size})")
+        return self._fill(slot)
+
+    @contextmanager
+    def checkout(self, timeout: float = CHECKOUT_TIMEOUT_SECONDS):
+        """Borrow an agent for one request; it is reset and returned on exit."""
+        agent = self._acquire(timeout)
+        self._count("checkouts")
+        try:
+            yield agent
+        finally:
+            try:
+                reset_agent(agent)
+            except Exception as e:
+                # Could not clean it: free the slot so the next checkout builds a replacement
+                logger.warning(f"⚠️ {self.name} pool: discarding agent that failed to reset: {e}")
+                self._count("discarded")
+                self._slots.put(None)
+            else:
+                self._slots.put(agent)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return dict(self.stats, size=self.size, available=self._slots.qsize())
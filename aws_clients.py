@@ -0,0 +1,73 @@
+"""
+Shared AWS client pool.
+Clients are created lazily on first use and cached per (service, region,
+endpoint, config), so importing a tool module costs nothing and every
+thread reuses the same client and its pool of warm TLS connections.
+"""
+import json
+import os
+import threading
+import boto3
+from botocore.config import Config
+
+DEFAULT_REGION = os.environ.get("AWS_REGION", "eu-west-1")
+
+# Tuned defaults for many concurrent tool calls
+MAX_POOL_CONNECTIONS = int(os.environ.get("AWS_MAX_POOL_CONNECTIONS", "50"))
+RETRY_MODE = os.environ.get("AWS_RETRY_MODE", "standard")
+MAX_ATTEMPTS = int(os.environ.get("AWS_MAX_ATTEMPTS", "3"))
+CONNECT_TIMEOUT = float(os.environ.get("AWS_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.environ.get("AWS_READ_TIMEOUT", "120"))
+
+_lock = threading.Lock()
+_session = None
+_clients = {}
+
+
+def client_config(**overrides) -> Config:
+    """botocore Config with the shared pool/retry/timeout defaults, plus overrides."""
+    settings = {
+        "max_pool_connections": MAX_POOL_CONNECTIONS,
+        "retries": {"mode": RETRY_MODE, "max_attempts": MAX_ATTEMPTS},
+        "connect_timeout": CONNECT_TIMEOUT,
+        "read_timeout": READ_TIMEOUT,
+    }
+    settings.update(overrides)
+    return Config(**settings)
+
+
+def get_client(service: str, region: str = None, endpoint_url: str = None, **config_overrides):
+    """
+    Return the cached client for (service, region, endpoint, config), creating
+    it on first use. Safe to call from any thread; boto3 clients themselves
+    are thread-safe once created.
+    """
+    global _session
+    region = region or DEFAULT_REGION
+    key = (service, region, endpoint_url, json.dumps(config_overrides, sort_keys=True, default=str))
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            # Client creation on a shared session is not thread-safe, hence the lock
+            if _session is None:
+                _session = boto3.session.Session()
+            client = _session.client(
+                service,
+                region_name=region,
+                endpoint_url=endpoint_url,
+                config=client_config(**config_overrides),
+            )
+            _clients[key] = client
+    return client
+
+
+def clear_clients():
+    """Forget all cached clients (e.g. after credentials rotate)."""
+    global _session
+    with _lock:
+        _clients.clear()
+        _session = None
@@ -0,0 +1,138 @@
+"""
+Two-tier prompt/response cache for call_bedrock.
+Tier 1 is an in-memory LRU; tier 2 is a persistent SQLite file shared by
+every process on the box. Entries are keyed by model id, prompt, max_tokens
+and temperature, expire after a TTL and are evicted least-recently-used
+once either tier is full. The memory tier holds the JSON text and every
+get() decodes a fresh result, so callers may mutate what they receive.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_PATH = os.environ.get(
+    "BEDROCK_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "bedrock_cache.sqlite"),
+)
+CACHE_TTL_SECONDS = int(os.environ.get("BEDROCK_CACHE_TTL", str(7 * 24 * 3600)))
+MAX_MEMORY_ENTRIES = int(os.environ.get("BEDROCK_CACHE_MEMORY_ENTRIES", "512"))
+MAX_DISK_ENTRIES = int(os.environ.get("BEDROCK_CACHE_DISK_ENTRIES", "20000"))
+
+
+def make_key(model_id: str, prompt: str, max_tokens: int, temperature: float, system: str = None) -> str:
+    parts = [model_id, prompt, max_tokens, temperature]
+    if system is not None:
+        parts.append(system)  # appended only when set, so keys of prompt-only calls are unchanged
+    raw = json.dumps(parts, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class PromptCache:
+    """In-memory LRU in front of a SQLite store. Safe to share between threads."""
+
+    def __init__(self, path: str = CACHE_PATH, ttl_seconds: int = CACHE_TTL_SECONDS,
+                 max_memory_entries: int = MAX_MEMORY_ENTRIES, max_disk_entries: int = MAX_DISK_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()  # key -> (created, result as JSON text)
+        self._lock = threading.Lock()
+        self._db = None
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+
+    def _conn(self):
+        if self._db is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed)")
+        return self._db
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - created > self.ttl_seconds
+
+    def _remember(self, key: str, created: float, value: str):
+        self._memory[key] = (created, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def get(self, key: str):
+        """Return the cached result for key, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[0], now):
+                    self._memory.move_to_end(key)
+                    self.counters["memory_hits"] += 1
+                    return json.loads(entry[1])
+                del self._memory[key]
+                self.counters["expired"] += 1
+
+            db = self._conn()
+            row = db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                if not self._expired(row[1], now):
+                    db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                    db.commit()
+                    self._remember(key, row[1], row[0])
+                    self.counters["disk_hits"] += 1
+                    return json.loads(row[0])
+                db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                db.commit()
+                self.counters["expired"] += 1
+
+            self.counters["misses"] += 1
+            return None
+
+    def put(self, key: str, result):
+        now = time.time()
+        value = json.dumps(result, ensure_ascii=False)  # snapshot: later changes to result are not cached
+        with self._lock:
+            self._remember(key, now, value)
+            db = self._conn()
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            overflow = db.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_disk_entries
+            if overflow > 0:
+                db.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+                    (overflow,),
+                )
+                self.counters["evictions"] += overflow
+            db.commit()
+            self.counters["stores"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            db = self._conn()
+            db.execute("DELETE FROM responses")
+            db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.counters)
+            stats["memory_entries"] = len(self._memory)
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats["hit_rate"] = round(hits / lookups, 3) if lookups else 0.0
+        return stats
+
+
+# Process-wide cache used by bedrock_helper.call_bedrock
+prompt_cache = PromptCache()
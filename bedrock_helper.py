@@ -1,13 +1,82 @@
-import boto3
+import asyncio
 import json
+import logging
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from aws_clients import get_client
+from bedrock_cache import prompt_cache, make_key
+from rate_limiter import bedrock_limiter, instrument_client, is_throttle, is_transient
+from prompt_builder import prompt_caching_enabled, record_usage, system_blocks
 
-# Create Bedrock Runtime client
-client = boto3.client("bedrock-runtime", region_name="eu-west-1")
+logger = logging.getLogger(__name__)
 
-def call_bedrock(prompt: str, max_tokens: int = 512, temperature: float = 0.7, retries: int = 3):
-    """Call Claude 3 Haiku on Bedrock with retry + clean JSON output."""
+MODEL_ID = os.environ.get("BEDROCK_MODEL_ID", "anthropic.claude-3-haiku-20240307-v1:0")
+REGION = os.environ.get("BEDROCK_REGION", "eu-west-1")
+ENDPOINT_URL = os.environ.get("BEDROCK_ENDPOINT_URL")  # e.g. a local fake endpoint for load tests
+
+# Connection pool size and max in-flight requests per process
+POOL_SIZE = int(os.environ.get("BEDROCK_POOL_SIZE", "50"))
+MAX_CONCURRENCY = int(os.environ.get("BEDROCK_MAX_CONCURRENCY", "50"))
+MAX_RETRIES = int(os.environ.get("BEDROCK_MAX_RETRIES", "6"))
+
+_agent_model = None
+_agent_model_lock = threading.Lock()
+
+if not prompt_caching_enabled(MODEL_ID):
+    # Claude 3 Haiku (the default) has no Bedrock prompt caching: prompts still use the short
+    # static prefixes, but no cache checkpoints are sent and cache_read_tokens stays at 0
+    logger.warning(f"⚠️ Bedrock prompt caching is off for {MODEL_ID}; set BEDROCK_MODEL_ID to a cache-capable "
+                   f"model or BEDROCK_PROMPT_CACHING=on to enable it")
+
+
+def get_bedrock_client():
+    """
+    Shared Bedrock Runtime client (sync and async callers), created on first use.
+    botocore's own retries are off: call_bedrock retries throttles and
+    transient failures (5xx, model not ready, dropped connections) itself,
+    through the shared rate limiter, so every throttle feeds back into its limits.
+    """
+    return get_client("bedrock-runtime", REGION, endpoint_url=ENDPOINT_URL, max_pool_connections=POOL_SIZE,
+                      retries={"mode": "standard", "total_max_attempts": 1})
+
+
+def get_agent_model():
+    """strands BedrockModel for the agents, with its client routed through the shared rate limiter."""
+    global _agent_model
+    with _agent_model_lock:
+        if _agent_model is None:
+            from strands.models import BedrockModel
+            config = {"cache_prompt": "default"} if prompt_caching_enabled(MODEL_ID) else {}
+            _agent_model = BedrockModel(model_id=MODEL_ID, region_name=REGION, **config)
+            instrument_client(_agent_model.client, bedrock_limiter)
+        return _agent_model
+
+# Per-process bound on in-flight requests, shared by every caller (sync, async, batch)
+_inflight = threading.BoundedSemaphore(MAX_CONCURRENCY)
+
+# Worker threads that run the blocking boto3 calls for async/batch callers
+_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix="bedrock")
+
+
+def configure_bedrock(pool_size: int = None, max_concurrency: int = None):
+    """
+    Resize the shared connection pool and/or the concurrency bound.
+    Requests already in flight finish on the old client/executor.
+    """
+    global _executor, _inflight, POOL_SIZE, MAX_CONCURRENCY
+    if pool_size:
+        POOL_SIZE = pool_size  # next get_bedrock_client() call builds a client with the new pool
+    if max_concurrency:
+        MAX_CONCURRENCY = max_concurrency
+        _inflight = threading.BoundedSemaphore(max_concurrency)
+        old = _executor
+        _executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="bedrock")
+        old.shutdown(wait=False)
+
+
+def _build_payload(prompt: str, max_tokens: int, temperature: float, system: str = None) -> dict:
     payload = {
         "messages": [
             {"role": "user", "content": [{"type": "text", "text": prompt}]}
@@ -16,26 +85,157 @@ def call_bedrock(prompt: str, max_tokens: int = 512, temperature: float = 0.7, r
         "max_tokens": max_tokens,
         "anthropic_version": "bedrock-2023-05-31"
     }
+    if system:
+        payload["system"] = system_blocks(system, MODEL_ID)
+    return payload
+
+
+def call_bedrock(prompt: str, max_tokens: int = 512, temperature: float = 0.7, retries: int = MAX_RETRIES, cache: bool = None,
+                 system: str = None, call_site: str = None):
+    """
+    Call Claude 3 Haiku on Bedrock with retry + clean JSON output.
+    Requests pass through the process-wide adaptive rate limiter; throttled
+    attempts shrink its limits and are retried after a jittered backoff.
+    Responses go through the two-tier prompt cache: deterministic calls
+    (temperature 0) are cached by default; pass cache=True/False to override.
+    `system` is a static prefix (see prompt_builder) sent as the system prompt
+    and marked for Bedrock prompt caching; token usage is counted under `call_site`.
+    """
+    use_cache = (temperature == 0) if cache is None else cache
+    if use_cache:
+        cache_key = make_key(MODEL_ID, prompt, max_tokens, temperature, system)
+        cached = prompt_cache.get(cache_key)
+        if cached is not None:
+            record_usage(call_site, cached=True)
+            return cached
+
+    payload = _build_payload(prompt, max_tokens, temperature, system)
+    client = get_bedrock_client()
 
     for attempt in range(retries):
         try:
-            response = client.invoke_model(
-                modelId="anthropic.claude-3-haiku-20240307-v1:0",
-                body=json.dumps(payload),
-                contentType="application/json",
-                accept="application/json"
-            )
-
-            result = json.loads(response["body"].read())
+            with _inflight, bedrock_limiter.slot():
+                response = client.invoke_model(
+                    modelId=MODEL_ID,
+                    body=json.dumps(payload),
+                    contentType="application/json",
+                    accept="application/json"
+                )
+                result = json.loads(response["body"].read())
+            record_usage(call_site, result.get("usage"))
+            if use_cache:
+                prompt_cache.put(cache_key, result)
             return result
 
-        except client.exceptions.ThrottlingException:
-            wait_time = 2 ** attempt
-            print(f"⚠️ Throttled, retrying in {wait_time}s...")
+        except Exception as e:
+            if not (is_throttle(e) or is_transient(e)):
+                raise
+            wait_time = bedrock_limiter.backoff(attempt)
+            print(f"⚠️ {'Throttled' if is_throttle(e) else f'Transient error ({e})'}, retrying in {wait_time:.2f}s...")
+            time.sleep(wait_time)
+
+    raise RuntimeError("❌ Failed to get response from Bedrock after retries.")
+
+
+def call_bedrock_stream(prompt: str, max_tokens: int = 512, temperature: float = 0.7, retries: int = MAX_RETRIES, cache: bool = None,
+                        system: str = None, call_site: str = None):
+    """
+    Streaming call_bedrock built on invoke_model_with_response_stream.
+    Yields text deltas as they arrive. Throttled and transient failures are retried only
+    before the first delta is yielded. A cache hit yields the whole text at
+    once, and a completed stream is stored in the prompt cache like call_bedrock.
+    `system` and `call_site` work as in call_bedrock.
+    """
+    use_cache = (temperature == 0) if cache is None else cache
+    if use_cache:
+        cache_key = make_key(MODEL_ID, prompt, max_tokens, temperature, system)
+        cached = prompt_cache.get(cache_key)
+        if cached is not None:
+            record_usage(call_site, cached=True)
+            for item in cached.get("content", []):
+                if item.get("type") == "text" and item.get("text"):
+                    yield item["text"]
+            return
+
+    payload = _build_payload(prompt, max_tokens, temperature, system)
+    client = get_bedrock_client()
+
+    for attempt in range(retries):
+        parts, usage = [], {}
+        try:
+            with _inflight, bedrock_limiter.slot():
+                response = client.invoke_model_with_response_stream(
+                    modelId=MODEL_ID,
+                    body=json.dumps(payload),
+                    contentType="application/json",
+                    accept="application/json"
+                )
+                for event in response["body"]:
+                    chunk = event.get("chunk")
+                    if not chunk:
+                        continue
+                    data = json.loads(chunk["bytes"])
+                    if data.get("type") == "content_block_delta" and data.get("delta", {}).get("type") == "text_delta":
+                        parts.append(data["delta"]["text"])
+                        yield data["delta"]["text"]
+                    elif data.get("type") == "message_start":
+                        usage.update(data.get("message", {}).get("usage", {}))  # input and cache tokens
+                    elif data.get("type") == "message_delta":
+                        usage.update(data.get("usage", {}))  # final output tokens
+            record_usage(call_site, usage)
+            if use_cache:
+                prompt_cache.put(cache_key, {"content": [{"type": "text", "text": "".join(parts)}]})
+            return
+
+        except Exception as e:
+            if parts or not (is_throttle(e) or is_transient(e)):
+                raise  # once deltas reached the caller, a retry would duplicate them
+            wait_time = bedrock_limiter.backoff(attempt)
+            print(f"⚠️ {'Throttled' if is_throttle(e) else f'Transient error ({e})'}, retrying in {wait_time:.2f}s...")
             time.sleep(wait_time)
 
     raise RuntimeError("❌ Failed to get response from Bedrock after retries.")
 
+
+async def call_bedrock_async(prompt: str, max_tokens: int = 512, temperature: float = 0.7,
+                             retries: int = MAX_RETRIES, timeout: float = None, cache: bool = None,
+                             system: str = None, call_site: str = None):
+    """
+    Asyncio-native call_bedrock.
+    The blocking boto3 call runs on the shared worker pool, so any number of
+    coroutines can await concurrently while at most MAX_CONCURRENCY requests
+    are on the wire. Cancelling the awaiting task (or hitting `timeout`)
+    drops a request that has not started yet; one already on the wire is
+    abandoned and its result discarded.
+    """
+    fut = asyncio.wrap_future(submit_bedrock(prompt, max_tokens, temperature, retries, cache, system, call_site))
+    if timeout is None:
+        return await fut
+    return await asyncio.wait_for(fut, timeout)
+
+
+def submit_bedrock(prompt: str, max_tokens: int = 512, temperature: float = 0.7, retries: int = MAX_RETRIES, cache: bool = None,
+                   system: str = None, call_site: str = None):
+    """Thread-pool-backed sync shim: schedule call_bedrock and return a concurrent.futures.Future."""
+    return _executor.submit(call_bedrock, prompt, max_tokens, temperature, retries, cache, system, call_site)
+
+
+def call_bedrock_many(prompts, max_tokens: int = 512, temperature: float = 0.7, retries: int = MAX_RETRIES, cache: bool = None,
+                      system: str = None, call_site: str = None) -> list:
+    """
+    Run many prompts concurrently from synchronous code.
+    Returns results in prompt order; a failed prompt yields {"error": "..."}.
+    """
+    futures = [submit_bedrock(p, max_tokens, temperature, retries, cache, system, call_site) for p in prompts]
+    results = []
+    for fut in futures:
+        try:
+            results.append(fut.result())
+        except Exception as e:
+            results.append({"error": str(e)})
+    return results
+
+
 def save_output(result, filename="outputs/bedrock_output.json"):
     """Save raw JSON output to local file."""
     os.makedirs("outputs", exist_ok=True)
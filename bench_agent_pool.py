@@ -0,0 +1,65 @@
+"""
+Per-request agent setup benchmark.
+Compares what run_agent used to do for every query, building a fresh
+strands Agent (tool spec generation, model and boto3 client setup), with
+checking a warm agent out of agents.pool.AgentPool and returning it
+(including the conversation reset). No model calls are made; this only
+measures setup overhead, from one thread and from many threads at once.
+
+Run:  python bench_agent_pool.py [iterations]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+
+from strands import Agent
+from agents.pool import AgentPool
+from bedrock_helper import MODEL_ID, get_agent_model
+from tools.tool_registry import list_tools
+
+SYSTEM_PROMPT = "You are a dynamic orchestrator for insurance and media workflows."
+
+
+def fresh_agent_model_id():
+    """Before the pool: Agent(model=<model id>) builds a BedrockModel and boto3 client per query."""
+    return Agent(tools=list_tools(), model=MODEL_ID, system_prompt=SYSTEM_PROMPT)
+
+
+def fresh_agent_shared_model():
+    """Fresh Agent per query on the shared model: tool registration is still repeated."""
+    return Agent(tools=list_tools(), model=get_agent_model(), system_prompt=SYSTEM_PROMPT)
+
+
+def per_request(fn, n: int) -> float:
+    started = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - started) / n
+
+
+def threaded(fn, n: int, threads: int) -> float:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda _: fn(), range(n)))
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    pool = AgentPool(fresh_agent_shared_model, size=8, name="bench")
+    pool.warm()
+
+    def pooled():
+        with pool.checkout() as agent:
+            agent.messages.append({"role": "user", "content": [{"text": "hi"}]})  # something to reset
+
+    print(f"new Agent, model id:          {per_request(fresh_agent_model_id, n) * 1000:9.2f} ms/request")
+    print(f"new Agent, shared model:      {per_request(fresh_agent_shared_model, n) * 1000:9.2f} ms/request")
+    print(f"pool checkout + reset:        {per_request(pooled, n * 100) * 1e6:9.2f} us/request")
+    print(f"8 threads x {n}, new Agent:    {threaded(fresh_agent_model_id, n, 8) * 1000:9.1f} ms")
+    print(f"8 threads x {n}, pool:         {threaded(pooled, n, 8) * 1000:9.1f} ms")
+    print(f"pool: {pool.metrics()}")
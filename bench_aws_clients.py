@@ -0,0 +1,68 @@
+"""
+Startup-time benchmark for the shared AWS client pool.
+
+1. Import time of the tool modules (fresh interpreter per sample), which no
+   longer build boto3 clients at import.
+2. Cost of creating a new bedrock-runtime client per call (what
+   generate_nova_video used to do) vs fetching the cached client, from one
+   thread and from many threads at once.
+
+Run:  python bench_aws_clients.py
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+
+import boto3
+from aws_clients import get_client, clear_clients
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+TOOL_MODULES = ["tools.tts", "tools.slides", "tools.script_gen", "tools.nova_vedio", "bedrock_helper"]
+
+
+def import_time(samples: int = 5) -> float:
+    code = "import time; t = time.perf_counter(); import " + ", ".join(TOOL_MODULES) + \
+        "; print(time.perf_counter() - t)"
+    times = []
+    for _ in range(samples):
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+        if out.returncode != 0:
+            print(f"import failed: {out.stderr.strip().splitlines()[-1]}")
+            return float("nan")
+        times.append(float(out.stdout.strip()))
+    return statistics.median(times)
+
+
+def per_call(fn, n: int) -> float:
+    started = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - started) / n
+
+
+def threaded(fn, n: int, threads: int) -> float:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda _: fn(), range(n)))
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    print(f"tool module import (median): {import_time() * 1000:8.1f} ms")
+
+    new_client = lambda: boto3.session.Session().client("bedrock-runtime", region_name="eu-west-1")
+    cached_client = lambda: get_client("bedrock-runtime", "eu-west-1")
+
+    clear_clients()
+    first = per_call(cached_client, 1)
+    print(f"first get_client():          {first * 1000:8.2f} ms")
+    print(f"new client per call:         {per_call(new_client, 20) * 1000:8.2f} ms")
+    print(f"cached get_client():         {per_call(cached_client, 10000) * 1e6:8.2f} us")
+    print(f"32 threads x 200, new:       {threaded(new_client, 200, 32):8.2f} s")
+    print(f"32 threads x 200, cached:    {threaded(cached_client, 200, 32) * 1000:8.2f} ms")
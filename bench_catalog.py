@@ -0,0 +1,80 @@
+"""
+Product matcher benchmark at catalog scale.
+Builds a synthetic catalog of 100k products and compares the old linear
+keyword scan with the inverted index used by tools.catalog, then measures
+BM25 ranking throughput for single and batched queries.
+
+Run:  python bench_catalog.py [n_products]
+"""
+import random
+import sys
+import time
+
+from tools.bm25 import BM25Index
+from tools.product_index import ProductIndex
+
+VOCAB = ["annuity", "retirement", "income", "pension", "inflation", "protection", "child", "saver",
+         "junior", "life", "term", "critical", "illness", "mortgage", "health", "travel", "home",
+         "vehicle", "savings", "bond", "equity", "fixed", "variable", "guaranteed", "family"]
+
+
+def synthetic_catalog(n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    extra = [f"niche{i}" for i in range(n // 10)]  # long tail of rare keywords
+    return [
+        {
+            "id": f"p{i:06d}",
+            "name": f"Product {i}",
+            "short_description": f"Synthetic {rng.choice(VOCAB)} cover for {rng.choice(VOCAB)} needs",
+            "benefits": [],
+            "keywords": rng.sample(VOCAB, 2) + [rng.choice(extra)],
+        }
+        for i in range(n)
+    ]
+
+
+def linear_match(catalog, text):
+    q = (text or "").lower()
+    for p in catalog:
+        if any(k in q for k in p.get("keywords", [])):
+            return p
+    return None
+
+
+def timed(fn, queries, repeat: int = 1) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for q in queries:
+            fn(q)
+    return (time.perf_counter() - started) / (len(queries) * repeat)
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    catalog = synthetic_catalog(n)
+
+    started = time.perf_counter()
+    index = ProductIndex(catalog)
+    print(f"catalog size:          {n}")
+    print(f"index build:           {(time.perf_counter() - started) * 1000:10.1f} ms")
+
+    rare = [f"tell me about niche{i} cover" for i in range(0, n // 10, max(1, n // 1000))][:100]
+    misses = ["what is the weather like today"] * 20
+    common = ["annuity for retirement income"] * 5
+
+    print(f"rare keyword  linear:  {timed(lambda q: linear_match(catalog, q), rare[:10]) * 1e3:10.3f} ms/query")
+    print(f"rare keyword  index:   {timed(lambda q: index.search(q, 5), rare) * 1e3:10.3f} ms/query")
+    print(f"no match      linear:  {timed(lambda q: linear_match(catalog, q), misses[:3]) * 1e3:10.3f} ms/query")
+    print(f"no match      index:   {timed(lambda q: index.search(q, 5), misses) * 1e3:10.3f} ms/query")
+    print(f"common terms  index:   {timed(lambda q: index.search(q, 5), common) * 1e3:10.3f} ms/query")
+
+    started = time.perf_counter()
+    ranker = BM25Index(catalog)
+    print(f"bm25 build:            {(time.perf_counter() - started) * 1000:10.1f} ms")
+    requests = [f"niche{i} plan for my family" for i in range(2000)]
+    single = timed(lambda q: ranker.rank(q, 5), requests[:200])
+    started = time.perf_counter()
+    ranker.rank_batch(requests, 5)
+    batch = (time.perf_counter() - started) / len(requests)
+    print(f"bm25 single:           {1 / single:10.0f} queries/s")
+    print(f"bm25 batch:            {1 / batch:10.0f} queries/s")
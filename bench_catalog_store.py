@@ -0,0 +1,85 @@
+"""
+Memory and load-time benchmark for the compact catalog representations.
+Writes a synthetic catalog as JSON, NDJSON and a binary .pcat index, then
+measures for each source:
+- cold load: time to a usable catalog object (timed without tracemalloc),
+- retained memory per product and peak (separate run under tracemalloc),
+- service cold start: the first CatalogService snapshot, i.e. load plus the
+  keyword index and BM25 ranker. This is what the first catalog request (or
+  the watcher thread started by tools.catalog) pays.
+
+Run:  python bench_catalog_store.py [n_products]
+"""
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from bench_catalog import synthetic_catalog
+from tools.catalog_service import CatalogService
+from tools.catalog_store import CatalogStore, MappedCatalog, write_binary
+
+
+def _close(catalog):
+    if hasattr(catalog, "close"):
+        catalog.close()
+
+
+def measure(label: str, load, n: int):
+    gc.collect()
+    started = time.perf_counter()
+    catalog = load()
+    elapsed = time.perf_counter() - started
+    assert len(catalog) == n
+    assert "keywords" in catalog[0]  # materialize one record to prove access works
+    _close(catalog)
+    del catalog
+
+    gc.collect()
+    tracemalloc.start()
+    catalog = load()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<22} cold load {elapsed * 1000:9.1f} ms   retained {current / n:8.1f} B/product   "
+          f"peak {peak / 2**20:8.1f} MiB")
+    _close(catalog)
+
+
+def measure_service(label: str, path: str, n: int):
+    gc.collect()
+    started = time.perf_counter()
+    service = CatalogService(path)
+    with service.lease() as snap:
+        assert len(snap.catalog) == n
+    elapsed = time.perf_counter() - started
+    print(f"{label:<22} service cold start (load + keyword index + BM25) {elapsed * 1000:9.1f} ms")
+    _close(service.snapshot().catalog)
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    products = synthetic_catalog(n)
+    tmp = tempfile.mkdtemp(prefix="catalog_bench_")
+    json_path = os.path.join(tmp, "catalog.json")
+    ndjson_path = os.path.join(tmp, "catalog.ndjson")
+    pcat_path = os.path.join(tmp, "catalog.pcat")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(products, f)
+    with open(ndjson_path, "w", encoding="utf-8") as f:
+        for p in products:
+            f.write(json.dumps(p) + "\n")
+    write_binary(products, pcat_path)
+    del products
+
+    print(f"catalog size: {n} products ({os.path.getsize(json_path) / 2**20:.1f} MiB JSON)")
+    measure("json.load (list/dict)", lambda: json.load(open(json_path, encoding="utf-8")), n)
+    measure("CatalogStore json", lambda: CatalogStore.from_json(json_path), n)
+    measure("CatalogStore ndjson", lambda: CatalogStore.from_ndjson(ndjson_path), n)
+    measure("MappedCatalog (mmap)", lambda: MappedCatalog(pcat_path), n)
+    print()
+    measure_service("json", json_path, n)
+    measure_service("ndjson", ndjson_path, n)
+    measure_service("pcat", pcat_path, n)
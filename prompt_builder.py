@@ -0,0 +1,137 @@
+"""
+Compact prompts with a stable, cacheable prefix.
+Each call site declares a PromptTemplate: static instructions (rules, output
+format, tool/agent schemas) rendered once at import, plus a small per-request
+template. The static part is sent as the system prompt and, on models that
+support it, marked as a Bedrock prompt-cache checkpoint, so repeated calls
+only pay full price for the per-request part. Tool and agent schemas are
+rendered as one short line each instead of the repr of the Python objects.
+
+Token usage is counted per call site (record_usage / usage_report) from the
+`usage` that Bedrock returns, including cache reads and writes.
+"""
+import inspect
+import os
+import threading
+
+# auto: only on models known to accept cache checkpoints; on/off force it
+PROMPT_CACHING = os.environ.get("BEDROCK_PROMPT_CACHING", "auto").lower()
+# Matched as substrings so cross-region inference profile ids (us./eu. prefixes) match too
+CACHE_CAPABLE_MODELS = ("claude-3-5-haiku", "claude-3-7-sonnet", "claude-sonnet-4", "claude-opus-4",
+                        "claude-haiku-4", "nova-micro", "nova-lite", "nova-pro")
+
+
+def prompt_caching_enabled(model_id: str) -> bool:
+    if PROMPT_CACHING in ("on", "true", "1"):
+        return True
+    if PROMPT_CACHING in ("off", "false", "0"):
+        return False
+    return any(name in model_id for name in CACHE_CAPABLE_MODELS)
+
+
+def _first_line(text: str) -> str:
+    return next((line.strip() for line in (text or "").splitlines() if line.strip()), "")
+
+
+def tool_signature(tool) -> str:
+    """
+    One line per tool: `name(arg: type, opt?: type) - first docstring line`.
+    Accepts strands tools, plain functions and tool registry manifest specs.
+    """
+    if isinstance(tool, dict):
+        params = ", ".join(f"{p['name']}{'' if p['required'] else '?'}: {p['type'] or 'any'}"
+                           for p in tool["parameters"])
+        return f"- {tool['name']}({params}) - {_first_line(tool['description'])}"
+    spec = getattr(tool, "tool_spec", None)
+    if spec:
+        schema = spec.get("inputSchema", {}).get("json", {})
+        required = set(schema.get("required", []))
+        params = ", ".join(f"{name}{'' if name in required else '?'}: {prop.get('type', 'any')}"
+                           for name, prop in schema.get("properties", {}).items())
+        return f"- {spec['name']}({params}) - {_first_line(spec.get('description'))}"
+    fn = getattr(tool, "__wrapped__", tool)
+    params = []
+    for p in inspect.signature(fn).parameters.values():
+        kind = getattr(p.annotation, "__name__", "any") if p.annotation is not p.empty else "any"
+        params.append(f"{p.name}{'' if p.default is p.empty else '?'}: {kind}")
+    return f"- {fn.__name__}({', '.join(params)}) - {_first_line(fn.__doc__)}"
+
+
+def render_tools(tools) -> str:
+    return "\n".join(tool_signature(t) for t in tools)
+
+
+def render_agents(agents: dict) -> str:
+    """One line per registry agent: `- name: first line of its description`."""
+    lines = []
+    for name, agent in agents.items():
+        description = _first_line(getattr(agent, "description", ""))
+        lines.append(f"- {name}: {description}" if description else f"- {name}")
+    return "\n".join(lines)
+
+
+class PromptTemplate:
+    """
+    Static instructions + per-request template.
+    `static` is always formatted once, with static_fields (so it can hold
+    rendered schemas) and `{{`/`}}` for literal braces; `dynamic` is
+    formatted per call by render().
+    """
+
+    def __init__(self, static: str, dynamic: str, call_site: str, **static_fields):
+        self.static = static.format(**static_fields).strip()
+        self.dynamic = dynamic
+        self.call_site = call_site
+
+    def render(self, **fields) -> str:
+        return self.dynamic.format(**fields).strip()
+
+    def __repr__(self):
+        return f"PromptTemplate({self.call_site!r}, static={len(self.static)} chars)"
+
+
+def system_blocks(system: str, model_id: str) -> list:
+    """Anthropic messages `system` field: the static prefix, marked as a cache checkpoint when supported."""
+    block = {"type": "text", "text": system}
+    if prompt_caching_enabled(model_id):
+        block["cache_control"] = {"type": "ephemeral"}
+    return [block]
+
+
+# --- per-call-site token accounting ------------------------------------------
+
+# InvokeModel (Anthropic) and Converse (strands) report usage under different keys
+_USAGE_KEYS = {
+    "input_tokens": "input_tokens", "inputTokens": "input_tokens",
+    "output_tokens": "output_tokens", "outputTokens": "output_tokens",
+    "cache_read_input_tokens": "cache_read_tokens", "cacheReadInputTokens": "cache_read_tokens",
+    "cache_creation_input_tokens": "cache_write_tokens", "cacheWriteInputTokens": "cache_write_tokens",
+}
+
+_usage_lock = threading.Lock()
+_usage = {}
+
+
+def record_usage(call_site: str, usage: dict = None, cached: bool = False):
+    """Add one response's token usage to `call_site`'s totals; cached=True counts a local cache hit."""
+    call_site = call_site or "unknown"
+    with _usage_lock:
+        totals = _usage.setdefault(call_site, {"calls": 0, "cache_hits": 0, "input_tokens": 0, "output_tokens": 0,
+                                               "cache_read_tokens": 0, "cache_write_tokens": 0})
+        if cached:
+            totals["cache_hits"] += 1
+            return
+        totals["calls"] += 1
+        for key, value in (usage or {}).items():
+            if key in _USAGE_KEYS and isinstance(value, int):
+                totals[_USAGE_KEYS[key]] += value
+
+
+def usage_report() -> dict:
+    """Token totals per call site, with the average input tokens per Bedrock call."""
+    with _usage_lock:
+        report = {}
+        for site, totals in _usage.items():
+            sent = totals["input_tokens"] + totals["cache_read_tokens"] + totals["cache_write_tokens"]
+            report[site] = dict(totals, avg_input_tokens=round(sent / totals["calls"], 1) if totals["calls"] else 0)
+        return report
@@ -0,0 +1,317 @@
+"""
+Process-wide adaptive rate limiter for Bedrock.
+A token bucket caps the request rate and a concurrency limit caps requests
+in flight. Both follow AIMD: every success raises them a little (additive
+increase), a throttle cuts them by a factor (multiplicative decrease, at
+most once per cooldown so one burst of throttles counts once). Until the
+first throttle the bucket is open, so an unthrottled account runs at full
+speed. Retries use full-jitter backoff so workers do not retry in lockstep.
+
+Shared by call_bedrock (router, generate_script, batch scripts) and, via
+instrument_client(), by the botocore client inside strands BedrockModel.
+"""
+import os
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import contextmanager
+
+THROTTLE_CODES = {"ThrottlingException", "Throttling", "TooManyRequestsException", "RequestLimitExceeded"}
+# Worth a retry but not a sign of overload: they count as errors, not throttles
+TRANSIENT_CODES = {"ServiceUnavailableException", "ServiceUnavailable", "ModelNotReadyException",
+                   "InternalServerException", "InternalFailure", "ModelTimeoutException"}
+
+MIN_RATE = float(os.environ.get("BEDROCK_MIN_RATE", "0.5"))
+MAX_RATE = float(os.environ.get("BEDROCK_MAX_RATE", "1000"))
+RATE_STEP = float(os.environ.get("BEDROCK_RATE_STEP", "2"))  # req/s regained per second of success
+MAX_CONCURRENCY = int(os.environ.get("BEDROCK_LIMITER_MAX_CONCURRENCY", "64"))
+DECREASE_FACTOR = float(os.environ.get("BEDROCK_DECREASE_FACTOR", "0.7"))
+BACKOFF_BASE = float(os.environ.get("BEDROCK_BACKOFF_BASE", "0.5"))
+BACKOFF_CAP = float(os.environ.get("BEDROCK_BACKOFF_CAP", "20"))
+
+
+def _is_throttle_response(response: dict) -> bool:
+    code = (response or {}).get("Error", {}).get("Code")
+    status = (response or {}).get("ResponseMetadata", {}).get("HTTPStatusCode")
+    return code in THROTTLE_CODES or status == 429
+
+
+def is_throttle(error) -> bool:
+    """True for botocore throttling errors (by error code) and HTTP 429 responses."""
+    return _is_throttle_response(getattr(error, "response", None))
+
+
+def is_transient(error) -> bool:
+    """True for retryable non-throttle failures: transient error codes, HTTP 5xx and dropped connections."""
+    from botocore.exceptions import ConnectionError as BotocoreConnectionError, HTTPClientError
+
+    if isinstance(error, (BotocoreConnectionError, HTTPClientError)):
+        return True  # connection refused/reset/closed, connect and read timeouts
+    response = getattr(error, "response", None) or {}
+    code = response.get("Error", {}).get("Code")
+    status = response.get("ResponseMetadata", {}).get("HTTPStatusCode") or 0
+    return code in TRANSIENT_CODES or status >= 500
+
+
+class AdaptiveRateLimiter:
+    """Token bucket + AIMD concurrency limit. Safe to share between threads."""
+
+    def __init__(self, min_rate: float = MIN_RATE, max_rate: float = MAX_RATE, rate_step: float = RATE_STEP,
+                 max_concurrency: int = MAX_CONCURRENCY, min_concurrency: int = 1,
+                 decrease: float = DECREASE_FACTOR, cooldown: float = 1.0,
+                 backoff_base: float = BACKOFF_BASE, backoff_cap: float = BACKOFF_CAP):
+        self.min_rate, self.max_rate, self.rate_step = min_rate, max_rate, rate_step
+        self.min_concurrency, self.max_concurrency = min_concurrency, max_concurrency
+        self.decrease, self.cooldown = decrease, cooldown
+        self.backoff_base, self.backoff_cap = backoff_base, backoff_cap
+
+        self._cond = threading.Condition()
+        self.rate = None  # None = bucket open (no throttle seen yet, or fully recovered)
+        self.concurrency = float(max_concurrency)
+        self._tokens = 1.0
+        self._refilled = time.monotonic()
+        self._last_decrease = 0.0
+        self._sent = deque()  # send timestamps over the last 2s, to measure the real rate
+        self.in_flight = 0
+        self.counters = {"requests": 0, "successes": 0, "throttles": 0, "errors": 0,
+                         "decreases": 0, "waits": 0, "wait_seconds": 0.0}
+
+    # --- token bucket ---------------------------------------------------
+
+    def _refill(self, now: float):
+        if self.rate is not None:
+            self._tokens = min(max(1.0, self.rate), self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+
+    def _measured_rate(self, now: float) -> float:
+        while self._sent and now - self._sent[0] > 2.0:
+            self._sent.popleft()
+        return len(self._sent) / 2.0
+
+    def acquire(self, timeout: float = None) -> bool:
+        """Block until a concurrency slot and a token are available. Returns False on timeout."""
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+        with self._cond:
+            waited = False
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                has_slot = self.in_flight < max(self.min_concurrency, int(self.concurrency))
+                has_token = self.rate is None or self._tokens >= 1.0
+                if has_slot and has_token:
+                    break
+                if deadline is not None and now >= deadline:
+                    return False
+                # Sleep until the next token is due, or until a slot is released
+                delay = (1.0 - self._tokens) / self.rate if has_slot and self.rate else None
+                if deadline is not None:
+                    delay = min(delay if delay is not None else deadline - now, deadline - now)
+                waited = True
+                self._cond.wait(delay)
+            if self.rate is not None:
+                self._tokens -= 1.0
+            self.in_flight += 1
+            self._sent.append(now)
+            self.counters["requests"] += 1
+            if waited:
+                self.counters["waits"] += 1
+                self.counters["wait_seconds"] += now - started
+            return True
+
+    def release(self, outcome: str = "success"):
+        """
+        Free an acquired slot and report how the request went: "success",
+        "throttle", "error" (counted, limits unchanged) or "ignore" (e.g. the
+        caller abandoned it, or the throttle was already reported).
+        """
+        with self._cond:
+            self.in_flight -= 1
+            if outcome == "success":
+                self._on_success()
+            elif outcome == "throttle":
+                self._on_throttle()
+            elif outcome == "error":
+                self.counters["errors"] += 1
+            self._cond.notify_all()
+
+    # --- AIMD -----------------------------------------------------------
+
+    def _on_success(self):
+        self.counters["successes"] += 1
+        # +1 slot per window of `concurrency` successes
+        self.concurrency = min(self.max_concurrency, self.concurrency + 1.0 / max(1.0, self.concurrency))
+        if self.rate is not None:
+            # Each success adds step/rate, i.e. about `rate_step` req/s per second at a steady rate
+            self.rate += self.rate_step / max(self.rate, 1.0)
+            if self.rate >= self.max_rate:
+                self.rate = None  # fully recovered: open the bucket again
+
+    def _on_throttle(self):
+        self.counters["throttles"] += 1
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return  # same congestion event as the last decrease
+        self._last_decrease = now
+        self.counters["decreases"] += 1
+        current = self.rate if self.rate is not None else max(self._measured_rate(now), self.min_rate)
+        self.rate = max(self.min_rate, current * self.decrease)
+        self._tokens = min(self._tokens, 1.0)
+        self.concurrency = max(self.min_concurrency, min(self.concurrency, self.in_flight + 1) * self.decrease)
+
+    def on_throttle(self):
+        """Record a throttle seen outside acquire/release (e.g. a botocore internal retry)."""
+        with self._cond:
+            self._on_throttle()
+
+    # --- helpers --------------------------------------------------------
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for retry number `attempt` (0-based)."""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    @contextmanager
+    def slot(self):
+        """Hold a slot for one request; throttling errors raised inside are reported as throttles."""
+        self.acquire()
+        try:
+            yield
+        except Exception as e:
+            self.release("throttle" if is_throttle(e) else "error")
+            raise
+        except BaseException:
+            self.release("ignore")  # generator closed early, KeyboardInterrupt, ...
+            raise
+        self.release()
+
+    def metrics(self) -> dict:
+        with self._cond:
+            now = time.monotonic()
+            return dict(
+                self.counters,
+                wait_seconds=round(self.counters["wait_seconds"], 3),
+                rate_limit=None if self.rate is None else round(self.rate, 2),
+                concurrency_limit=round(self.concurrency, 2),
+                in_flight=self.in_flight,
+                measured_rate=self._measured_rate(now),
+            )
+
+
+class _ReleaseOnce:
+    """Releases one limiter slot exactly once, whichever path gets there first."""
+
+    def __init__(self, limiter: AdaptiveRateLimiter):
+        self._limiter = limiter
+        self._lock = threading.Lock()
+        self._released = False
+
+    def __call__(self, outcome: str):
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self._limiter.release(outcome)
+
+
+class _SlotHoldingStream:
+    """
+    Response event stream that keeps the call's limiter slot until the stream
+    is drained, fails, is closed or is garbage collected, so a streamed reply
+    counts against concurrency for as long as it is being read.
+    """
+
+    def __init__(self, stream, limiter: AdaptiveRateLimiter):
+        self._stream = stream
+        self._release = _ReleaseOnce(limiter)
+        weakref.finalize(self, self._release, "ignore")  # dropped without being read to the end
+
+    def __iter__(self):
+        outcome = "ignore"  # the caller stopped reading early
+        try:
+            for event in self._stream:
+                yield event
+            outcome = "success"
+        except Exception as e:
+            outcome = "throttle" if is_throttle(e) else "error"
+            raise
+        finally:
+            self._release(outcome)
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            self._release("ignore")
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def _event_stream_key(parsed):
+    """Key of the EventStream in a parsed streaming response (body: InvokeModel*, stream: ConverseStream)."""
+    from botocore.eventstream import EventStream
+
+    for key in ("body", "stream"):
+        if isinstance((parsed or {}).get(key), EventStream):
+            return key
+    return None
+
+
+def instrument_client(client, limiter: AdaptiveRateLimiter = None):
+    """
+    Route every API call of a botocore client (e.g. strands BedrockModel.client)
+    through the limiter using client events: a slot is taken in before-call and
+    released in after-call / after-call-error, or, for streaming responses
+    (converse_stream, invoke_model_with_response_stream), once the event
+    stream has been read to the end or closed. Throttles seen by botocore's
+    own retries are reported from needs-retry. Idempotent per client.
+    """
+    limiter = limiter or bedrock_limiter
+    if getattr(client, "_rate_limiter", None) is limiter:
+        return client
+    events = client.meta.events
+    service = client.meta.service_model.service_id.hyphenize()
+    ticket = "rate_limiter_slot"
+
+    def before_call(context=None, **kwargs):
+        limiter.acquire()
+        if context is not None:
+            context[ticket] = True
+
+    def after_call(http_response=None, parsed=None, context=None, **kwargs):
+        if context is not None and context.pop(ticket, False):
+            if _is_throttle_response(parsed):
+                limiter.release("ignore")  # already reported by needs-retry
+            elif (parsed or {}).get("Error"):
+                limiter.release("error")
+            else:
+                key = _event_stream_key(parsed)
+                if key:
+                    # Only the headers have arrived: hold the slot while the body streams
+                    parsed[key] = _SlotHoldingStream(parsed[key], limiter)
+                else:
+                    limiter.release("success")
+
+    def after_call_error(context=None, **kwargs):
+        if context is not None and context.pop(ticket, False):
+            limiter.release("error")
+
+    def needs_retry(response=None, **kwargs):
+        if response is not None:
+            http_response, parsed = response
+            if getattr(http_response, "status_code", None) == 429 or _is_throttle_response(parsed):
+                limiter.on_throttle()
+        return None  # leave the retry decision to botocore
+
+    events.register(f"before-call.{service}", before_call)
+    events.register(f"after-call.{service}", after_call)
+    events.register(f"after-call-error.{service}", after_call_error)
+    events.register(f"needs-retry.{service}", needs_retry)
+    client._rate_limiter = limiter
+    return client
+
+
+# Process-wide limiter shared by every Bedrock caller
+bedrock_limiter = AdaptiveRateLimiter()
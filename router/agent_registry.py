@@ -1,16 +1,174 @@
 # router/agent_registry.py
+"""
+Lazy agent registry.
+Agent files are described from their source (ast, no import) into a cached
+manifest: name, entry point, description, keywords and file mtime. The
+manifest is rebuilt only when an agent file is added, removed or modified,
+and list_agents() returns proxies that import an agent on first invocation.
+An agent module that was already imported is reloaded when its file's
+manifest mtime changes, so edited agents are picked up without a restart
+(modules the agent itself imports are not reloaded).
+"""
+import ast
 import importlib
+import json
+import logging
 import os
+import sys
+import threading
 
-AGENT_FOLDER = "agents"
+logger = logging.getLogger(__name__)
 
-def list_agents():
-    """Return all available agents as dict: name -> callable"""
-    agents = {}
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+AGENT_FOLDER = os.path.join(PROJECT_ROOT, "agents")
+MANIFEST_PATH = os.environ.get("AGENT_MANIFEST_PATH", os.path.join(PROJECT_ROOT, ".cache", "agent_manifest.json"))
+ENTRY_POINT = "run_agent"
+EXCLUDED_FILES = {"__init__.py", "agent_media_control.py"}
+
+_lock = threading.Lock()
+_agents = None
+_agents_mtimes = None
+_import_lock = threading.Lock()
+_imported_mtimes = {}  # module name -> manifest mtime of the file it was imported from
+
+
+def _agent_files() -> dict:
+    """Return {file name: mtime} for every agent module on disk."""
+    files = {}
     for f in os.listdir(AGENT_FOLDER):
-        if f.startswith("agent_") and f.endswith(".py") and f != "__init__.py" and f != "agent_media_control.py":
-            name = f.replace(".py", "")
-            module = importlib.import_module(f"agents.{name}")
-            if hasattr(module, "run_agent"):
-                agents[name] = module.run_agent
+        if f.startswith("agent_") and f.endswith(".py") and f not in EXCLUDED_FILES:
+            files[f] = os.path.getmtime(os.path.join(AGENT_FOLDER, f))
+    return files
+
+
+def _describe(file_name: str, mtime: float) -> dict:
+    """Read an agent's metadata from its source without importing it."""
+    path = os.path.join(AGENT_FOLDER, file_name)
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    entry_doc, has_entry, keywords = None, False, []
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name == ENTRY_POINT:
+            has_entry, entry_doc = True, ast.get_docstring(node)
+        elif isinstance(node, ast.Assign) and any(getattr(t, "id", None) == "INTENT_KEYWORDS" for t in node.targets):
+            try:
+                keywords = list(ast.literal_eval(node.value))
+            except ValueError:
+                keywords = []
+
+    doc = " ".join(d for d in (ast.get_docstring(tree), entry_doc) if d)
+    return {
+        "name": file_name[:-3],
+        "module": f"agents.{file_name[:-3]}",
+        "entry_point": ENTRY_POINT if has_entry else None,
+        "description": doc,
+        "keywords": keywords,
+        "file": file_name,
+        "mtime": mtime,
+    }
+
+
+def _load_manifest() -> dict:
+    try:
+        with open(MANIFEST_PATH, encoding="utf-8") as f:
+            return json.load(f).get("agents", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(entries: dict):
+    try:
+        os.makedirs(os.path.dirname(MANIFEST_PATH), exist_ok=True)
+        tmp = f"{MANIFEST_PATH}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"agents": entries}, f, indent=2)
+        os.replace(tmp, MANIFEST_PATH)
+    except OSError as e:
+        logger.warning(f"⚠️ Could not write agent manifest: {e}")
+
+
+def load_manifest(files: dict = None) -> dict:
+    """
+    Return manifest entries {name: metadata} for the files that define an
+    entry point, re-describing only the agent files whose mtime differs from
+    the cached manifest. Files without one are kept in the manifest with
+    entry_point None, so they do not force a rebuild on every call.
+    """
+    files = _agent_files() if files is None else files
+    cached = {e["file"]: e for e in _load_manifest().values()}
+    entries, changed = {}, set(cached) != set(files)
+    for file_name, mtime in sorted(files.items()):
+        entry = cached.get(file_name)
+        if entry is None or entry.get("mtime") != mtime:
+            entry, changed = _describe(file_name, mtime), True
+        entries[entry["name"]] = entry
+    agents = {name: entry for name, entry in entries.items() if entry.get("entry_point")}
+    if changed:
+        logger.info(f"🔄 Agent manifest rebuilt ({len(agents)} agents)")
+        _save_manifest(entries)
     return agents
+
+
+class LazyAgent:
+    """
+    Callable proxy for an agent; the module is imported on first call, or
+    reloaded if it was imported from an older version of the file.
+    """
+
+    def __init__(self, entry: dict):
+        self.name = entry["name"]
+        self.module = entry["module"]
+        self.entry_point = entry["entry_point"]
+        self.description = entry.get("description", "")
+        self.keywords = entry.get("keywords", [])
+        self.mtime = entry.get("mtime")
+        self._func = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._func is not None
+
+    def load(self):
+        if self._func is None:
+            with self._lock:
+                if self._func is None:
+                    self._func = getattr(self._import(), self.entry_point)
+        return self._func
+
+    def _import(self):
+        with _import_lock:
+            module = sys.modules.get(self.module)
+            imported = _imported_mtimes.get(self.module)
+            if module is not None and imported is not None and imported != self.mtime:
+                logger.info(f"🔄 Reloading agent {self.module} (file changed)")
+                module = importlib.reload(module)
+            elif module is None:
+                logger.info(f"📦 Importing agent {self.module}")
+                module = importlib.import_module(self.module)
+            _imported_mtimes[self.module] = self.mtime
+            return module
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+    def __repr__(self):
+        return f"LazyAgent({self.name!r}, loaded={self.loaded})"
+
+
+def list_agents():
+    """Return all available agents as dict: name -> callable (lazy proxy)"""
+    global _agents, _agents_mtimes
+    files = _agent_files()
+    with _lock:
+        if _agents is None or files != _agents_mtimes:
+            previous = _agents or {}
+            agents = {}
+            for name, entry in load_manifest(files).items():
+                old = previous.get(name)
+                # Keep already-imported proxies for files that did not change
+                unchanged = old is not None and _agents_mtimes and _agents_mtimes.get(entry["file"]) == entry["mtime"]
+                agents[name] = old if unchanged else LazyAgent(entry)
+            _agents, _agents_mtimes = agents, files
+        return dict(_agents)
@@ -0,0 +1,133 @@
+# router/intent_classifier.py
+"""
+Local fast-path intent classifier for the router.
+Scores a query against each agent's declared INTENT_KEYWORDS with TF-IDF
+weights, so obvious requests are routed without a Bedrock call. Docstrings
+are not scored: their incidental words ("system", "prompt", ...) made
+off-topic queries look confident. A query needs at least one keyword hit and
+must beat both the runner-up and a "none of them" baseline built from its
+unmatched words; everything below the threshold falls through to the LLM.
+"""
+import math
+import os
+import re
+import sys
+import threading
+from collections import Counter, OrderedDict
+
+CONFIDENCE_THRESHOLD = float(os.environ.get("ROUTER_LOCAL_CONFIDENCE", "0.7"))
+KEYWORD_WEIGHT = 3.0
+UNMATCHED_WEIGHT = 0.5  # "none/LLM" evidence per query word that no agent declares
+
+# Generic function words and request phrasing only; they carry no intent either way
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "could", "do", "for", "from", "how", "i", "in",
+    "is", "it", "me", "my", "of", "on", "or", "so", "that", "the", "this", "to", "via", "was", "what",
+    "when", "which", "with", "would", "you", "your", "all", "any", "please", "help", "want", "need", "like",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _stem(token: str) -> str:
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> list:
+    return [_stem(t) for t in _TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+def normalize_query(text: str) -> str:
+    """Canonical form used as the routing-cache key."""
+    return " ".join(_TOKEN_RE.findall((text or "").lower()))
+
+
+def agent_profile(fn) -> dict:
+    """Collect keywords and description for an agent callable."""
+    if hasattr(fn, "keywords"):
+        # Registry proxies carry manifest metadata, no import needed
+        return {"keywords": list(fn.keywords), "description": fn.description or ""}
+    module = sys.modules.get(getattr(fn, "__module__", None) or "")
+    keywords = list(getattr(module, "INTENT_KEYWORDS", []) or [])
+    description = " ".join(d for d in (getattr(module, "__doc__", None), getattr(fn, "__doc__", None)) if d)
+    return {"keywords": keywords, "description": description}
+
+
+class IntentClassifier:
+    """TF-IDF scorer of declared agent keywords, with a "none" baseline."""
+
+    def __init__(self, profiles: dict, threshold: float = CONFIDENCE_THRESHOLD):
+        self.threshold = threshold
+        self.weights = {}
+        df = Counter()
+        for name, profile in profiles.items():
+            tf = Counter()
+            for kw in profile.get("keywords", []):
+                for t in tokenize(kw):
+                    tf[t] += KEYWORD_WEIGHT
+            self.weights[name] = tf
+            df.update(tf.keys())
+        n = len(profiles)
+        self.idf = {t: math.log((1 + n) / (1 + c)) + 1.0 for t, c in df.items()}
+
+    @classmethod
+    def from_agents(cls, agents: dict, threshold: float = CONFIDENCE_THRESHOLD):
+        return cls({name: agent_profile(fn) for name, fn in agents.items()}, threshold)
+
+    def scores(self, query: str) -> dict:
+        tokens = set(tokenize(query))
+        return {
+            name: sum(math.log1p(tf[t]) * self.idf[t] for t in tokens if t in tf)
+            for name, tf in self.weights.items()
+        }
+
+    def baseline(self, query: str) -> float:
+        """Score of the implicit "none of the agents" candidate: words no agent declares."""
+        return UNMATCHED_WEIGHT * sum(1 for t in set(tokenize(query)) if t not in self.idf)
+
+    def classify(self, query: str) -> tuple:
+        """
+        Return (agent_name or None, confidence, scores).
+        Confidence combines match strength (saturating in the best score) with
+        the margin over the stronger of the runner-up and the "none" baseline,
+        so a lone registered agent does not win every query by default. The
+        name is None without a keyword hit or below the threshold.
+        """
+        scores = self.scores(query)
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+        if not ranked or ranked[0][1] <= 0:
+            return None, 0.0, scores
+        best_name, best = ranked[0]
+        second = ranked[1][1] if len(ranked) > 1 else 0.0
+        rival = max(second, self.baseline(query))
+        confidence = max(0.0, (1 - math.exp(-best)) * ((best - rival) / best))
+        return (best_name if confidence >= self.threshold else None), round(confidence, 3), scores
+
+
+class RouteCache:
+    """Small thread-safe LRU of routing decisions keyed by normalized query."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, query: str):
+        key = normalize_query(query)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        return None
+
+    def put(self, query: str, decision: dict):
+        key = normalize_query(query)
+        with self._lock:
+            self._entries[key] = decision
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
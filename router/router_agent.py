@@ -2,8 +2,13 @@
 import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import logging
-from bedrock_helper import call_bedrock
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from bedrock_helper import call_bedrock, call_bedrock_stream
+from prompt_builder import PromptTemplate, render_agents
 from agent_registry import list_agents
+from intent_classifier import IntentClassifier, RouteCache
 import json
 
 # Configure logging
@@ -13,10 +18,25 @@ logging.basicConfig(level=logging.INFO)
 # Load all available agents dynamically
 AGENTS = list_agents()
 
+# Local fast path: confident queries are routed without calling Bedrock
+CLASSIFIER = IntentClassifier.from_agents(AGENTS)
+ROUTE_CACHE = RouteCache()
+
+# Selected agents run concurrently on one bounded pool, each with its own deadline
+AGENT_POOL_SIZE = int(os.environ.get("ROUTER_AGENT_POOL_SIZE", "8"))
+AGENT_TIMEOUT_SECONDS = float(os.environ.get("ROUTER_AGENT_TIMEOUT", "600"))
+AGENT_TIMEOUTS = {}  # per-agent overrides: agent name -> seconds
+_AGENT_POOL = ThreadPoolExecutor(max_workers=AGENT_POOL_SIZE, thread_name_prefix="router-agent")
+# Agents reported as timed out but still running: each one keeps a pool worker until it returns
+_ABANDONED = set()
+_abandoned_lock = threading.Lock()
+
+# Static instructions + agent list, rendered once and sent as the (cacheable) system prompt
 SYSTEM_PROMPT = """
 You are an intelligent Router Agent. Your job is:
 1. Analyze user input and detect which agent(s) to call.
-2. Select only from the available agents in the registry: {agents_list}
+2. Select only from the available agents in the registry:
+{agent_schemas}
 3. Return strictly parseable JSON in this format:
 {{
   "agents_to_invoke": [
@@ -31,28 +51,226 @@ You are an intelligent Router Agent. Your job is:
      "Sorry, I cannot assist with this request. You can ask me anything about the existing agents: {agents_list}."
 5. Do NOT include any extra text outside the JSON.
 6. ALWAYS produce parseable JSON.
-
-User input: {user_input}
 """
 
+ROUTER_PROMPT = PromptTemplate(SYSTEM_PROMPT, "User input: {user_input}", call_site="router",
+                               agents_list=list(AGENTS.keys()), agent_schemas=render_agents(AGENTS))
+
+
+class AgentNameScanner:
+    """
+    Incremental JSON scanner for the router's streamed response.
+    Feed it text deltas; it returns each agents_to_invoke[*].name as soon as
+    the closing quote of that string has arrived, before the JSON is complete.
+    """
+
+    def __init__(self):
+        self._stack = []          # open containers: {"type": "{" | "[", "key": ..., "expect_key": ...}
+        self._in_string = False
+        self._escape = False
+        self._buf = []
+
+    def _on_string(self, raw: str) -> list:
+        if not self._stack or self._stack[-1]["type"] != "{":
+            return []
+        obj = self._stack[-1]
+        if obj["expect_key"]:
+            obj["key"] = raw
+            return []
+        in_agents = len(self._stack) >= 2 and self._stack[-2]["type"] == "[" and self._stack[-2]["key"] == "agents_to_invoke"
+        if obj["key"] == "name" and in_agents:
+            try:
+                return [json.loads(f'"{raw}"')]
+            except ValueError:
+                return [raw]
+        return []
+
+    def feed(self, delta: str) -> list:
+        """Consume a text delta and return agent names completed within it."""
+        names = []
+        for ch in delta:
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    names.extend(self._on_string("".join(self._buf)))
+                    self._buf = []
+                    continue
+                self._buf.append(ch)
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._stack.append({"type": "{", "key": None, "expect_key": True})
+            elif ch == "[":
+                parent_key = self._stack[-1]["key"] if self._stack and self._stack[-1]["type"] == "{" else None
+                self._stack.append({"type": "[", "key": parent_key, "expect_key": False})
+            elif ch in "}]":
+                if self._stack:
+                    self._stack.pop()
+            elif ch == ":" and self._stack and self._stack[-1]["type"] == "{":
+                self._stack[-1]["expect_key"] = False
+            elif ch == "," and self._stack and self._stack[-1]["type"] == "{":
+                self._stack[-1]["expect_key"] = True
+        return names
+
+
+def _invoke_agent(name: str, query: str) -> dict:
+    if name not in AGENTS:
+        return {"error": "Agent not found"}
+    try:
+        return AGENTS[name](query)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def _abandon(fut: Future):
+    """Track a timed-out agent that could not be cancelled until its worker is free again."""
+    with _abandoned_lock:
+        _ABANDONED.add(fut)
+
+    def release(done):
+        with _abandoned_lock:
+            _ABANDONED.discard(done)
+
+    fut.add_done_callback(release)  # runs at once if it finished meanwhile
+
+
+def _submit_agent(name: str, query: str) -> Future:
+    """
+    Run an agent on the shared pool, or refuse with an error result when
+    every worker is held by an abandoned (timed-out, still running) agent,
+    since a new request would only queue behind them and time out too.
+    """
+    with _abandoned_lock:
+        stuck = len(_ABANDONED)
+    if stuck >= AGENT_POOL_SIZE:
+        logger.error(f"❌ Not dispatching '{name}': all {AGENT_POOL_SIZE} router agent workers are held by timed-out agents")
+        refused = Future()
+        refused.set_result({
+            "status": "rejected",
+            "error": f"Agent pool is full: {stuck} timed-out agents are still running on all "
+                     f"{AGENT_POOL_SIZE} workers. Try again later.",
+        })
+        return refused
+    return _AGENT_POOL.submit(_invoke_agent, name, query)
+
 
+def _collect_outputs(dispatched: dict) -> dict:
+    """
+    Wait for dispatched agents until each finishes or hits its deadline.
+    Returns partial results: agents past their deadline are cancelled (if not
+    yet started) and reported as {"status": "timeout", ...} without waiting
+    for them, so total latency is bounded by the slowest deadline. Agents that
+    were already running are tracked as abandoned until they return.
+    """
+    outputs = {}
+    pending = dict(dispatched)  # name -> (future, deadline, timeout)
+    while pending:
+        now = time.monotonic()
+        for name, (fut, deadline, timeout) in list(pending.items()):
+            if fut.done():
+                outputs[name] = fut.result()
+                del pending[name]
+            elif now >= deadline:
+                if not fut.cancel():
+                    _abandon(fut)
+                logger.warning(f"⏱️ Agent '{name}' timed out after {timeout:g}s")
+                outputs[name] = {"status": "timeout", "error": f"Agent '{name}' did not finish within {timeout:g}s"}
+                del pending[name]
+        if pending:
+            next_deadline = min(deadline for _, deadline, _ in pending.values())
+            wait([fut for fut, _, _ in pending.values()], timeout=max(0.0, next_deadline - time.monotonic()),
+                 return_when=FIRST_COMPLETED)
+    return {name: outputs[name] for name in dispatched}
 
-def run_router(query: str) -> dict:
-    """Main function to route user queries to relevant agents dynamically."""
-    prompt = SYSTEM_PROMPT.format(
-        user_input=query,
-        agents_list=list(AGENTS.keys())   # <-- Added this
-    )
-    result = call_bedrock(prompt)
-    logger.info(f"Router LLM full response: {result}")
 
-    
-    # Extract LLM text
-    llm_content = result.get("content", [])
+def _extract_text(result: dict) -> str:
     llm_text = ""
-    for item in llm_content:
+    for item in result.get("content", []):
         if item.get("type") == "text" and item.get("text"):
             llm_text += item["text"]
+    return llm_text
+
+
+def local_route(query: str):
+    """
+    Routing decision from the route cache or the local classifier, or None
+    when the query is not confidently resolvable and needs the router LLM.
+    """
+    cached = ROUTE_CACHE.get(query)
+    if cached is not None:
+        logger.info("⚡ Routing decision served from route cache")
+        return cached
+
+    name, confidence, _ = CLASSIFIER.classify(query)
+    logger.info(f"Local intent classifier: {name or 'uncertain'} (confidence {confidence:.2f})")
+    if name is None:
+        return None
+    decision = {
+        "agents_to_invoke": [{"name": name, "reason": f"Local intent classifier (confidence {confidence:.2f})"}],
+        "error": None,
+        "confidence": confidence,
+    }
+    ROUTE_CACHE.put(query, decision)
+    return decision
+
+
+def run_router(query: str, stream: bool = True, timeout: float = None) -> dict:
+    """
+    Main function to route user queries to relevant agents dynamically.
+    Confident queries are routed locally; the rest go to the router LLM.
+    With stream=True the router response is streamed and each selected agent
+    is dispatched as soon as its name is complete, while the LLM keeps writing.
+    Selected agents run concurrently; `timeout` (or AGENT_TIMEOUTS /
+    AGENT_TIMEOUT_SECONDS) bounds each one and late agents are marked "timeout".
+    """
+    dispatched = {}  # agent name -> (Future, deadline, timeout)
+
+    def dispatch(name):
+        if name and name not in dispatched:
+            logger.info(f"🚀 Dispatching agent '{name}'")
+            limit = timeout if timeout is not None else AGENT_TIMEOUTS.get(name, AGENT_TIMEOUT_SECONDS)
+            dispatched[name] = (_submit_agent(name, query), time.monotonic() + limit, limit)
+
+    decision = local_route(query)
+    if decision is not None:
+        if not decision.get("agents_to_invoke"):
+            error_msg = decision.get("error") or f"Sorry, I cannot assist with this request. You can ask anything about the existing agents: {list(AGENTS.keys())}."
+            return {"agents_to_invoke": [], "error": error_msg}
+        for agent_info in decision["agents_to_invoke"]:
+            dispatch(agent_info.get("name"))
+        return _collect_outputs(dispatched)
+
+    prompt = ROUTER_PROMPT.render(user_input=query)
+    llm_args = {"temperature": 0, "system": ROUTER_PROMPT.static, "call_site": ROUTER_PROMPT.call_site}
+
+    llm_text = None
+    if stream:
+        scanner = AgentNameScanner()
+        parts = []
+        try:
+            # Routing is deterministic (temperature 0), so repeated queries are served from the prompt cache
+            for delta in call_bedrock_stream(prompt, **llm_args):
+                parts.append(delta)
+                for name in scanner.feed(delta):
+                    dispatch(name)
+            llm_text = "".join(parts)
+            logger.info(f"Router LLM streamed response: {llm_text}")
+        except Exception as e:
+            if dispatched:
+                # Agents already running; keep them and work with what was streamed
+                logger.warning(f"⚠️ Router stream interrupted after dispatch: {e}")
+                llm_text = "".join(parts)
+            else:
+                logger.warning(f"⚠️ Streaming router call failed ({e}), falling back to invoke_model")
+
+    if llm_text is None:
+        result = call_bedrock(prompt, **llm_args)
+        logger.info(f"Router LLM full response: {result}")
+        llm_text = _extract_text(result)
 
     llm_text = llm_text.strip()
 
@@ -60,43 +278,31 @@ def run_router(query: str) -> dict:
     if llm_text.startswith('"') and llm_text.endswith('"'):
         llm_text = llm_text[1:-1].replace('\\"', '"')
 
+    instructions = None
+    error = None
     if not llm_text:
-        return {
-            "agents_to_invoke": [],
-            "error": f"LLM returned empty response. Available agents: {list(AGENTS.keys())}"
-        }
-
-    # Parse JSON
-    try:
-        instructions = json.loads(llm_text)
-    except Exception as e:
-        return {
-            "agents_to_invoke": [],
-            "error": f"Failed to parse LLM output: {e}. Raw text: {llm_text}"
-        }
-
+        error = f"LLM returned empty response. Available agents: {list(AGENTS.keys())}"
+    else:
+        # Parse JSON
+        try:
+            instructions = json.loads(llm_text)
+        except Exception as e:
+            error = f"Failed to parse LLM output: {e}. Raw text: {llm_text}"
 
+    if instructions is not None:
+        ROUTE_CACHE.put(query, instructions)
+        for agent_info in instructions.get("agents_to_invoke", []):
+            dispatch(agent_info.get("name"))
 
-
-
-    # If no suitable agents, politely inform the user
-    if not instructions.get("agents_to_invoke"):
+    if not dispatched:
+        if error:
+            return {"agents_to_invoke": [], "error": error}
+        # If no suitable agents, politely inform the user
         error_msg = instructions.get("error") or f"Sorry, I cannot assist with this request. You can ask anything about the existing agents: {list(AGENTS.keys())}."
         return {"agents_to_invoke": [], "error": error_msg}
 
-    # Call selected agents
-    outputs = {}
-    for agent_info in instructions.get("agents_to_invoke", []):
-        name = agent_info.get("name")
-        if name in AGENTS:
-            try:
-                outputs[name] = AGENTS[name](query)
-            except Exception as e:
-                outputs[name] = {"error": str(e)}
-        else:
-            outputs[name] = {"error": "Agent not found"}
-
-    return outputs
+    # Collect outputs of the selected agents
+    return _collect_outputs(dispatched)
 
 
 if __name__ == "__main__":
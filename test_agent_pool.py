@@ -0,0 +1,129 @@
+"""
+Agent pool checks: agents are built lazily up to the pool size, the most
+recently returned agent is reused first, an agent that fails to reset is
+discarded and replaced, and reset_agent really clears a strands Agent's
+conversation, state and metrics between requests.
+
+Run:  python -m pytest -q test_agent_pool.py
+"""
+import os
+import threading
+
+import pytest
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "fake")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "fake")
+
+from agents.pool import AgentPool  # noqa: E402
+
+
+class FakeAgent:
+    def __init__(self, n: int):
+        self.n = n
+        self.messages = []
+
+
+class CountingFactory:
+    def __init__(self, build=FakeAgent, fail_first: int = 0):
+        self.build, self.fail_first = build, fail_first
+        self.built = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            if self.fail_first:
+                self.fail_first -= 1
+                raise RuntimeError("model unavailable")
+            self.built += 1
+            return self.build(self.built)
+
+
+def test_agents_are_built_lazily_up_to_size():
+    factory = CountingFactory()
+    pool = AgentPool(factory, size=3, name="test")
+    assert factory.built == 0 and pool.metrics()["available"] == 3
+    with pool.checkout() as first:
+        with pool.checkout() as second:
+            assert (first.n, second.n) == (1, 2) and factory.built == 2
+    for _ in range(5):
+        with pool.checkout():
+            pass
+    assert factory.built == 2  # idle agents are reused before empty slots are filled
+    m = pool.metrics()
+    assert (m["created"], m["checkouts"], m["available"], m["size"]) == (2, 7, 3, 3)
+
+    pool.warm()
+    assert factory.built == 3 and pool.metrics()["available"] == 3
+
+
+def test_most_recently_returned_agent_is_reused_first():
+    pool = AgentPool(CountingFactory(), size=3)
+    with pool.checkout() as outer:
+        with pool.checkout() as inner:
+            pass  # inner is returned first, outer last
+    with pool.checkout() as agent:
+        assert agent is outer
+        with pool.checkout() as next_agent:
+            assert next_agent is inner
+
+
+def test_agent_that_fails_to_reset_is_discarded():
+    class UnresettableMessages(list):
+        def clear(self):
+            raise RuntimeError("cannot clear")
+
+    def build(n):
+        agent = FakeAgent(n)
+        if n == 1:
+            agent.messages = UnresettableMessages()
+        return agent
+
+    factory = CountingFactory(build)
+    pool = AgentPool(factory, size=1)
+    with pool.checkout() as broken:
+        assert broken.n == 1
+    with pool.checkout() as replacement:
+        assert replacement is not broken and replacement.n == 2
+    m = pool.metrics()
+    assert (m["discarded"], m["created"], m["available"]) == (1, 2, 1)
+
+
+def test_factory_failure_frees_the_slot():
+    factory = CountingFactory(fail_first=1)
+    pool = AgentPool(factory, size=1)
+    with pytest.raises(RuntimeError, match="model unavailable"):
+        with pool.checkout():
+            pass
+    with pool.checkout() as agent:
+        assert agent.n == 1
+
+
+def test_checkout_times_out_when_every_agent_is_busy():
+    pool = AgentPool(CountingFactory(), size=1, name="busy")
+    with pool.checkout():
+        with pytest.raises(TimeoutError, match="No busy agent free"):
+            with pool.checkout(timeout=0.05):
+                pass
+    assert pool.metrics()["waits"] == 1
+
+
+def test_reset_clears_a_real_strands_agent():
+    from strands import Agent
+    from strands.models import BedrockModel
+
+    def build(n):
+        return Agent(model=BedrockModel(model_id="test-model", region_name="eu-west-1"), system_prompt="pooled",
+                     callback_handler=None)
+
+    factory = CountingFactory(build)
+    pool = AgentPool(factory, size=1)
+    with pool.checkout() as agent:
+        agent.messages.append({"role": "user", "content": [{"text": "first request"}]})
+        agent.state.set("product_id", "p01")
+        agent.event_loop_metrics.cycle_count = 3
+        agent.conversation_manager.removed_message_count = 2
+    with pool.checkout() as again:
+        assert again is agent and factory.built == 1
+        assert again.messages == [] and again.state.get() == {}
+        assert again.event_loop_metrics.cycle_count == 0 and again.conversation_manager.removed_message_count == 0
+        assert again.system_prompt == "pooled"
@@ -0,0 +1,93 @@
+"""
+Agent registry checks: the manifest is described from source and only
+rebuilt when agent files change, including files without an entry point,
+and an edited agent module is reloaded by the next proxy instead of being
+served from the import cache.
+
+Run:  python -m pytest -q test_agent_registry.py
+"""
+import json
+import os
+import sys
+
+from router import agent_registry
+
+AGENT_SOURCE = '''"""Quote agent for home insurance."""
+INTENT_KEYWORDS = ["home quote"]
+
+
+def run_agent(query):
+    return query
+'''
+HELPER_SOURCE = '''"""Helper module that happens to match the agent_*.py glob."""
+
+
+def helper():
+    return None
+'''
+
+
+def _point_registry_at(tmp_path, monkeypatch):
+    folder = tmp_path / "agents"
+    folder.mkdir()
+    (folder / "agent_quote.py").write_text(AGENT_SOURCE)
+    (folder / "agent_helpers.py").write_text(HELPER_SOURCE)
+    monkeypatch.setattr(agent_registry, "AGENT_FOLDER", str(folder))
+    monkeypatch.setattr(agent_registry, "MANIFEST_PATH", str(tmp_path / "manifest.json"))
+    return folder
+
+
+def test_manifest_lists_only_entry_points_but_keeps_other_files(tmp_path, monkeypatch):
+    _point_registry_at(tmp_path, monkeypatch)
+    agents = agent_registry.load_manifest()
+    assert list(agents) == ["agent_quote"]
+    assert agents["agent_quote"]["keywords"] == ["home quote"]
+    saved = json.loads((tmp_path / "manifest.json").read_text())["agents"]
+    assert saved["agent_helpers"]["entry_point"] is None
+
+
+def test_second_call_does_not_rebuild(tmp_path, monkeypatch):
+    folder = _point_registry_at(tmp_path, monkeypatch)
+    described = []
+    describe = agent_registry._describe
+    monkeypatch.setattr(agent_registry, "_describe", lambda f, m: described.append(f) or describe(f, m))
+    saves = []
+    save = agent_registry._save_manifest
+    monkeypatch.setattr(agent_registry, "_save_manifest", lambda entries: saves.append(entries) or save(entries))
+
+    agent_registry.load_manifest()
+    assert sorted(described) == ["agent_helpers.py", "agent_quote.py"] and len(saves) == 1
+
+    described.clear()
+    assert list(agent_registry.load_manifest()) == ["agent_quote"]
+    assert described == [] and len(saves) == 1
+
+    (folder / "agent_extra.py").write_text(AGENT_SOURCE)
+    assert sorted(agent_registry.load_manifest()) == ["agent_extra", "agent_quote"]
+    assert described == ["agent_extra.py"] and len(saves) == 2
+
+
+def test_edited_agent_module_is_reloaded(tmp_path, monkeypatch):
+    package = tmp_path / "reload_agents"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    path = package / "agent_echo.py"
+    path.write_text("def run_agent(query):\n    return 'v1'\n")
+    os.utime(path, (1_000, 1_000))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(agent_registry, "_imported_mtimes", {})
+
+    def proxy():
+        return agent_registry.LazyAgent({"name": "agent_echo", "module": "reload_agents.agent_echo",
+                                         "entry_point": "run_agent", "mtime": os.path.getmtime(path)})
+
+    try:
+        assert proxy()("q") == "v1"
+        assert proxy()("q") == "v1"  # same mtime: served from the import cache
+
+        path.write_text("def run_agent(query):\n    return 'v2, edited'\n")
+        os.utime(path, (2_000, 2_000))
+        assert proxy()("q") == "v2, edited"
+    finally:
+        sys.modules.pop("reload_agents.agent_echo", None)
+        sys.modules.pop("reload_agents", None)
@@ -0,0 +1,126 @@
+"""
+Artifact cache checks: the digest key, hits and misses in copy and reference
+mode, S3 errors degrading to a miss instead of failing the caller, and
+invalidation. S3 is replaced by an in-memory fake.
+
+Run:  python -m pytest -q test_artifact_store.py
+"""
+import pytest
+from botocore.exceptions import ClientError
+
+from tools.artifact_store import ArtifactStore, artifact_digest
+
+
+def _error(code: str, operation: str) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": code}}, operation)
+
+
+class FakeS3:
+    def __init__(self, fail: dict = None):
+        self.objects = {}
+        self.fail = fail or {}  # operation name -> error code to raise
+        self.calls = []
+
+    def _maybe_fail(self, operation: str):
+        self.calls.append(operation)
+        if operation in self.fail:
+            raise _error(self.fail[operation], operation)
+
+    def head_object(self, Bucket, Key):
+        self._maybe_fail("HeadObject")
+        if (Bucket, Key) not in self.objects:
+            raise _error("404", "HeadObject")
+        return {}
+
+    def copy_object(self, Bucket, Key, CopySource):
+        self._maybe_fail("CopyObject")
+        self.objects[(Bucket, Key)] = self.objects[(CopySource["Bucket"], CopySource["Key"])]
+
+    def get_paginator(self, name):
+        fake = self
+
+        class Paginator:
+            def paginate(self, Bucket, Prefix):
+                keys = sorted(k for b, k in fake.objects if b == Bucket and k.startswith(Prefix))
+                for start in range(0, len(keys), 2):  # two keys per page
+                    yield {"Contents": [{"Key": k} for k in keys[start:start + 2]]}
+
+        return Paginator()
+
+    def delete_objects(self, Bucket, Delete):
+        for obj in Delete["Objects"]:
+            self.objects.pop((Bucket, obj["Key"]), None)
+
+
+def test_digest_covers_kind_and_every_input():
+    digest = artifact_digest("audio", text="Hello", voice="Joanna", tool="1")
+    assert digest == artifact_digest("audio", tool="1", voice="Joanna", text="Hello")  # keyword order is irrelevant
+    assert digest != artifact_digest("audio", text="Hello", voice="Matthew", tool="1")
+    assert digest != artifact_digest("audio", text="Hello", voice="Joanna", tool="2")
+    assert digest != artifact_digest("narration", text="Hello", voice="Joanna", tool="1")
+    assert len(digest) == 64
+
+
+def test_miss_then_save_then_hit_copies_into_the_run_prefix():
+    s3 = FakeS3()
+    store = ArtifactStore(prefix="/cache/artifacts/", client=s3)
+    digest = artifact_digest("audio", text="Hello")
+    assert store.cache_key("audio", digest, "a.mp3") == f"cache/artifacts/audio/{digest}/a.mp3"
+
+    assert store.fetch("b", "audio", digest, "a.mp3", "run1/p01/a.mp3") is None
+    s3.objects[("b", "run1/p01/a.mp3")] = b"mp3"
+    store.save("b", "audio", digest, "a.mp3", "run1/p01/a.mp3")
+    assert s3.objects[("b", store.cache_key("audio", digest, "a.mp3"))] == b"mp3"
+
+    s3.calls.clear()
+    assert store.fetch("b", "audio", digest, "a.mp3", "run2/p01/a.mp3") == "s3://b/run2/p01/a.mp3"
+    assert s3.objects[("b", "run2/p01/a.mp3")] == b"mp3"
+    assert s3.calls == ["CopyObject"]  # saved keys are known, so no HEAD request
+    stats = store.stats()
+    assert (stats["hits"], stats["misses"], stats["stores"], stats["hit_rate"]) == (1, 1, 1, 0.5)
+
+
+def test_reference_mode_returns_the_cache_object():
+    s3 = FakeS3()
+    store = ArtifactStore(prefix="cache", mode="reference", client=s3)
+    s3.objects[("b", "cache/slides/d1/deck.pptx")] = b"pptx"
+    assert store.fetch("b", "slides", "d1", "deck.pptx", "run/deck.pptx") == "s3://b/cache/slides/d1/deck.pptx"
+    assert ("b", "run/deck.pptx") not in s3.objects and "CopyObject" not in s3.calls
+
+
+def test_s3_errors_are_misses_not_failures():
+    store = ArtifactStore(prefix="cache", client=FakeS3(fail={"HeadObject": "AccessDenied"}))
+    assert store.fetch("b", "audio", "d1", "a.mp3", "run/a.mp3") is None
+
+    s3 = FakeS3(fail={"CopyObject": "SlowDown"})
+    s3.objects[("b", "cache/audio/d1/a.mp3")] = b"mp3"
+    store_copy = ArtifactStore(prefix="cache", client=s3)
+    assert store_copy.fetch("b", "audio", "d1", "a.mp3", "run/a.mp3") is None
+    store_copy.save("b", "audio", "d2", "a.mp3", "run/a.mp3")  # logged, not raised
+    assert (store.stats()["errors"], store_copy.stats()["errors"], store_copy.stats()["stores"]) == (1, 2, 0)
+
+
+def test_disabled_store_never_touches_s3():
+    s3 = FakeS3()
+    store = ArtifactStore(enabled=False, client=s3)
+    assert store.fetch("b", "audio", "d1", "a.mp3", "run/a.mp3") is None
+    store.save("b", "audio", "d1", "a.mp3", "run/a.mp3")
+    assert s3.calls == []
+
+
+def test_invalidate_removes_one_kind_and_forgets_known_keys():
+    s3 = FakeS3()
+    store = ArtifactStore(prefix="cache", client=s3)
+    for kind, digest in (("audio", "d1"), ("audio", "d2"), ("audio", "d3"), ("slides", "d1")):
+        s3.objects[("b", f"run/{kind}-{digest}")] = kind.encode()
+        store.save("b", kind, digest, "f", f"run/{kind}-{digest}")
+
+    assert store.invalidate("b", "audio") == 3
+    assert store.fetch("b", "audio", "d1", "f", "run/again") is None  # HEAD again, not the stale known set
+    assert store.fetch("b", "slides", "d1", "f", "run/again") == "s3://b/run/again"
+    assert store.stats()["invalidated"] == 3
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError, match="Unknown artifact cache mode"):
+        ArtifactStore(mode="symlink")
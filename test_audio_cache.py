@@ -0,0 +1,111 @@
+"""
+Audio cache checks: byte-budgeted LRU eviction (including files indexed from
+a previous run), the S3 mirror fallback and write-through, and concurrent
+put/get from many threads.
+
+Run:  python -m pytest -q test_audio_cache.py
+"""
+import io
+import os
+import threading
+
+from botocore.exceptions import ClientError
+
+from tools.audio_cache import AudioCache, audio_key
+
+
+class FakeS3:
+    def __init__(self, fail_reads: bool = False):
+        self.objects = {}
+        self.fail_reads = fail_reads
+
+    def get_object(self, Bucket, Key):
+        if self.fail_reads:
+            raise ClientError({"Error": {"Code": "AccessDenied", "Message": "denied"}}, "GetObject")
+        if (Bucket, Key) not in self.objects:
+            raise ClientError({"Error": {"Code": "NoSuchKey", "Message": "missing"}}, "GetObject")
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)])}
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[(Bucket, Key)] = Body
+
+
+def test_key_ignores_whitespace_but_not_voice():
+    key = audio_key("Hello world.", "Joanna", "standard", "mp3")
+    assert audio_key("Hello  world.\n", "Joanna", "standard", "mp3") == key
+    assert audio_key("Hello world.", "Matthew", "standard", "mp3") != key
+
+
+def test_least_recently_used_files_are_evicted_by_size(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=10, mirror_bucket=None)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    assert cache.get("a") == b"aaaa"  # a is now the most recent
+    cache.put("c", b"cccc")  # 12 bytes > 10: evicts b
+    assert sorted(os.listdir(tmp_path)) == ["a.mp3", "c.mp3"]
+    assert cache.get("b") is None
+    stats = cache.stats()
+    assert (stats["bytes"], stats["entries"], stats["evictions"], stats["hits"], stats["misses"]) == (8, 2, 1, 1, 1)
+
+    cache.put("big", b"x" * 50)  # larger than the budget: kept alone rather than evicting itself
+    assert os.listdir(tmp_path) == ["big.mp3"] and cache.get("big") == b"x" * 50
+
+
+def test_existing_files_are_indexed_oldest_first(tmp_path):
+    for name, mtime in (("old.mp3", 1_000), ("new.mp3", 3_000), ("mid.mp3", 2_000)):
+        (tmp_path / name).write_bytes(b"1234")
+        os.utime(tmp_path / name, (mtime, mtime))
+    (tmp_path / "half-written.mp3.1.tmp").write_bytes(b"junk")
+    cache = AudioCache(str(tmp_path), max_bytes=12, mirror_bucket=None)
+    cache.put("fresh", b"5678")
+    assert cache.stats()["bytes"] == 12
+    assert not (tmp_path / "old.mp3").exists() and (tmp_path / "mid.mp3").exists()
+
+
+def test_mirror_fills_local_cache_and_receives_puts(tmp_path):
+    s3 = FakeS3()
+    writer = AudioCache(str(tmp_path / "machine1"), mirror_bucket="bucket", mirror_prefix="cache/audio/", s3_client=s3)
+    writer.put("k", b"voice")
+    assert s3.objects == {("bucket", "cache/audio/k.mp3"): b"voice"}
+
+    reader = AudioCache(str(tmp_path / "machine2"), mirror_bucket="bucket", mirror_prefix="cache/audio", s3_client=s3)
+    assert reader.get("k") == b"voice"  # from the mirror, then stored locally
+    assert reader.get("k") == b"voice"
+    assert reader.get("unknown") is None  # NoSuchKey is a plain miss
+    stats = reader.stats()
+    assert (stats["mirror_hits"], stats["hits"], stats["misses"], stats["errors"]) == (1, 1, 1, 0)
+    assert (tmp_path / "machine2" / "k.mp3").read_bytes() == b"voice"
+
+
+def test_mirror_errors_are_counted_not_raised(tmp_path):
+    cache = AudioCache(str(tmp_path), mirror_bucket="bucket", s3_client=FakeS3(fail_reads=True))
+    assert cache.get("k") is None
+    assert (cache.stats()["errors"], cache.stats()["misses"]) == (1, 1)
+
+
+def test_concurrent_puts_and_gets(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=40 * 8, mirror_bucket=None)
+    errors = []
+
+    def worker(n):
+        try:
+            for i in range(50):
+                key = f"k{(n * 7 + i) % 60}"
+                data = key.encode().ljust(8, b".")
+                cache.put(key, data)
+                got = cache.get(key)
+                assert got is None or got == data  # may already be evicted by another thread, never torn
+        except Exception as e:  # surfaced by the assert below
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    files = os.listdir(tmp_path)
+    assert not [f for f in files if f.endswith(".tmp")]
+    stats = cache.stats()
+    assert stats["bytes"] <= 40 * 8 and stats["entries"] == len(files)
+    assert stats["bytes"] == sum(os.path.getsize(tmp_path / f) for f in files)
@@ -0,0 +1,86 @@
+"""
+Batch runner checks: checkpoint resume scoped to the output location.
+Runs only the create_slides stage with a fake tool, so no AWS calls are made.
+
+Run:  python -m pytest -q test_batch_runner.py
+"""
+import threading
+
+from agents.batch_runner import Checkpoint, run_batch
+
+PRODUCTS = [{"id": "p01", "name": "Home"}, {"id": "p02", "name": "Travel"}, {"name": "Pet"}]
+
+
+def fake_slides_tool():
+    calls = []
+    lock = threading.Lock()
+
+    def create_slides(product, s3_bucket, s3_prefix):
+        with lock:
+            calls.append(s3_prefix)
+        return {"slides_s3_uri": f"s3://{s3_bucket}/{s3_prefix}/slides.pptx"}
+
+    return create_slides, calls
+
+
+def run_slides(checkpoint, prefix, tool):
+    return run_batch(PRODUCTS, s3_bucket="bucket", s3_prefix=prefix, checkpoint=checkpoint,
+                     stages=["create_slides"], tools=[tool], max_products=2, packed_scripts=False)
+
+
+def test_resume_is_scoped_to_bucket_and_prefix(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.jsonl"))
+    tool, calls = fake_slides_tool()
+
+    first = run_slides(checkpoint, "batch/v1", tool)
+    assert (first["success"], first["resumed_skipped"]) == (3, 0)
+
+    again = run_slides(checkpoint, "batch/v1", tool)
+    assert (again["success"], again["resumed_skipped"]) == (0, 3)  # including the product keyed by name
+
+    other = run_slides(checkpoint, "batch/v2", tool)
+    assert (other["success"], other["resumed_skipped"]) == (3, 0)
+    assert sorted(calls) == sorted([f"batch/v1/{p}" for p in ("p01", "p02", "Pet")] +
+                                   [f"batch/v2/{p}" for p in ("p01", "p02", "Pet")])
+    assert set(checkpoint.load("bucket", "batch/v2")) == {"p01", "p02", "Pet"}
+    assert checkpoint.load("other-bucket", "batch/v1") == {}
+
+
+def test_checkpoint_skips_torn_lines_and_keeps_last_record(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    checkpoint = Checkpoint(str(path))
+    checkpoint.append({"product_id": "p01", "s3_bucket": "b", "s3_prefix": "x", "status": "failed"})
+    checkpoint.append({"product_id": "p02", "s3_bucket": "b", "s3_prefix": "x", "status": "success"})
+    checkpoint.append({"product_id": "p01", "s3_bucket": "b", "s3_prefix": "x", "status": "success"})
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"product_id": "p03", "status": "succ')  # crash mid-write
+    records = checkpoint.load("b", "x")
+    assert {pid: r["status"] for pid, r in records.items()} == {"p01": "success", "p02": "success"}
+
+    resumed = Checkpoint(str(path))  # the next run after the crash
+    resumed.append({"product_id": "p03", "s3_bucket": "b", "s3_prefix": "x", "status": "success"})
+    resumed.append({"product_id": "p04", "s3_bucket": "b", "s3_prefix": "x", "status": "success"})
+    assert set(resumed.load("b", "x")) == {"p01", "p02", "p03", "p04"}  # not glued onto the torn line
+
+
+def test_resume_reruns_failed_and_partial_products(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.jsonl"))
+    failing = {"p02"}
+
+    def create_slides(product, s3_bucket, s3_prefix):
+        if product.get("id") in failing:
+            raise RuntimeError("renderer crashed")
+        return {"slides_s3_uri": f"s3://{s3_bucket}/{s3_prefix}/slides.pptx"}
+
+    first = run_slides(checkpoint, "batch", create_slides)
+    assert (first["success"], first["failed"]) == (2, 1)
+    assert checkpoint.load("bucket", "batch")["p02"]["errors"] == {"create_slides": "renderer crashed"}
+
+    failing.clear()
+    second = run_slides(checkpoint, "batch", create_slides)
+    assert (second["resumed_skipped"], second["success"], second["failed"]) == (2, 1, 0)
+    assert checkpoint.load("bucket", "batch")["p02"]["status"] == "success"
+
+    rerun = run_batch(PRODUCTS, s3_bucket="bucket", s3_prefix="batch", checkpoint=checkpoint, stages=["create_slides"],
+                      tools=[create_slides], packed_scripts=False, resume=False)
+    assert (rerun["resumed_skipped"], rerun["success"]) == (0, 3)
@@ -0,0 +1,119 @@
+"""
+Throughput harness for call_bedrock_async against a local fake Bedrock endpoint.
+The fake endpoint answers invoke_model with a fixed latency, so the achieved
+requests/second should grow roughly linearly with the concurrency bound.
+
+Run:  python test_bedrock_async.py
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+FAKE_LATENCY = 0.05  # seconds per invoke_model
+N_PROMPTS = 200
+
+
+class FakeBedrockHandler(BaseHTTPRequestHandler):
+    """Mimics POST /model/{modelId}/invoke with a Claude messages response."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, so pooled connections are reused
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        time.sleep(FAKE_LATENCY)
+        prompt = body.get("messages", [{}])[0].get("content", [{}])[0].get("text", "")
+        payload = json.dumps({
+            "content": [{"type": "text", "text": f"echo: {prompt}"}],
+            "usage": {"input_tokens": len(prompt.split()), "output_tokens": 2},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_fake_bedrock():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeBedrockHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _point_helper_at(server, monkeypatch):
+    """
+    Point bedrock_helper at a fake endpoint. Everything is set through
+    monkeypatch, so it is undone after the test, and the client cache is
+    swapped for an empty one so clients bound to the fake endpoint are dropped.
+    """
+    import aws_clients
+    import bedrock_helper
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setenv("BEDROCK_ENDPOINT_URL", url)
+    for name in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"):
+        if name not in os.environ:
+            monkeypatch.setenv(name, "fake")
+    monkeypatch.setattr(bedrock_helper, "ENDPOINT_URL", url)
+    monkeypatch.setattr(bedrock_helper, "POOL_SIZE", bedrock_helper.POOL_SIZE)  # restored after configure_bedrock
+    monkeypatch.setattr(aws_clients, "_clients", {})
+    monkeypatch.setattr(aws_clients, "_session", None)
+    return bedrock_helper
+
+
+def measure_throughput(helper, concurrency: int, n: int = N_PROMPTS) -> float:
+    helper.configure_bedrock(pool_size=concurrency, max_concurrency=concurrency)
+
+    async def run():
+        return await asyncio.gather(*(helper.call_bedrock_async(f"prompt {i}") for i in range(n)))
+
+    started = time.perf_counter()
+    results = asyncio.run(run())
+    elapsed = time.perf_counter() - started
+    assert all(r["content"][0]["text"].startswith("echo:") for r in results)
+    return n / elapsed
+
+
+def test_throughput_scales_with_concurrency(monkeypatch):
+    server = start_fake_bedrock()
+    try:
+        helper = _point_helper_at(server, monkeypatch)
+        low = measure_throughput(helper, 1, n=40)
+        high = measure_throughput(helper, 16, n=160)
+        assert high > 5 * low, f"expected scaling, got {low:.1f} -> {high:.1f} req/s"
+    finally:
+        server.shutdown()
+
+
+def test_cancellation_releases_waiters(monkeypatch):
+    server = start_fake_bedrock()
+    try:
+        helper = _point_helper_at(server, monkeypatch)
+        helper.configure_bedrock(pool_size=2, max_concurrency=2)
+
+        async def run():
+            with_timeout = [helper.call_bedrock_async("slow", timeout=FAKE_LATENCY / 10) for _ in range(4)]
+            return await asyncio.gather(*with_timeout, return_exceptions=True)
+
+        results = asyncio.run(run())
+        assert all(isinstance(r, asyncio.TimeoutError) for r in results)
+        # Pool is still usable after cancellations
+        assert helper.call_bedrock_many(["again"])[0]["content"][0]["text"] == "echo: again"
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    server = start_fake_bedrock()
+    helper = _point_helper_at(server, pytest.MonkeyPatch())
+    print(f"Fake Bedrock at {helper.ENDPOINT_URL} ({FAKE_LATENCY * 1000:.0f} ms/request)")
+    for c in (1, 4, 16, 64):
+        print(f"concurrency={c:>3}: {measure_throughput(helper, c):8.1f} req/s")
+    server.shutdown()
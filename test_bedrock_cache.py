@@ -0,0 +1,78 @@
+"""
+Prompt cache checks: in-memory LRU eviction, SQLite fallback across cache
+instances (processes), TTL expiry and disk-tier eviction.
+
+Run:  python -m pytest -q test_bedrock_cache.py
+"""
+import time
+
+from bedrock_cache import PromptCache, make_key
+
+
+def _cache(tmp_path, **kwargs):
+    return PromptCache(path=str(tmp_path / "cache.sqlite"), **kwargs)
+
+
+def test_memory_tier_evicts_least_recently_used(tmp_path):
+    cache = _cache(tmp_path, max_memory_entries=2)
+    cache.put("a", {"v": "a"})
+    cache.put("b", {"v": "b"})
+    assert cache.get("a") == {"v": "a"}  # a is now the most recent
+    cache.put("c", {"v": "c"})  # evicts b from memory
+    assert set(cache._memory) == {"a", "c"}
+    assert cache.stats()["evictions"] == 1
+
+    assert cache.get("b") == {"v": "b"}  # still served, from SQLite
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (1, 1, 0)
+
+
+def test_sqlite_tier_is_shared_between_instances(tmp_path):
+    key = make_key("model", "prompt", 256, 0)
+    _cache(tmp_path).put(key, {"content": [{"type": "text", "text": "cached"}]})
+
+    other = _cache(tmp_path)  # fresh memory tier, e.g. another process
+    assert other.get(key) == {"content": [{"type": "text", "text": "cached"}]}
+    assert other.get(key) is not None
+    stats = other.stats()
+    assert (stats["disk_hits"], stats["memory_hits"]) == (1, 1)  # promoted to memory on the first hit
+    assert other.get(make_key("model", "prompt", 256, 0.5)) is None
+    assert other.stats()["misses"] == 1
+
+
+def test_expired_entries_are_dropped_from_both_tiers(tmp_path):
+    cache = _cache(tmp_path, ttl_seconds=1)
+    cache.put("k", {"v": 1})
+    cache._memory["k"] = (time.time() - 5, cache._memory["k"][1])
+    db = cache._conn()
+    db.execute("UPDATE responses SET created = ?", (time.time() - 5,))
+    db.commit()
+    assert cache.get("k") is None
+    assert cache.stats()["expired"] == 2
+    assert db.execute("SELECT COUNT(*) FROM responses").fetchone()[0] == 0
+
+
+def test_disk_tier_evicts_least_recently_accessed(tmp_path):
+    cache = _cache(tmp_path, max_disk_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put(key, {"v": key})
+        time.sleep(0.01)
+    keys = {row[0] for row in cache._conn().execute("SELECT key FROM responses")}
+    assert keys == {"b", "c"}
+
+
+def test_system_prompt_changes_the_key():
+    assert make_key("m", "p", 1, 0) == make_key("m", "p", 1, 0, None)
+    assert make_key("m", "p", 1, 0, "system a") != make_key("m", "p", 1, 0, "system b")
+
+
+def test_returned_results_are_copies(tmp_path):
+    cache = _cache(tmp_path)
+    result = {"content": [{"type": "text", "text": "original"}]}
+    cache.put("k", result)
+    result["content"][0]["text"] = "changed after put"
+    hit = cache.get("k")
+    hit["content"][0]["text"] = "changed by caller"
+    hit["content"].append({"type": "text", "text": "extra"})
+    assert cache.get("k") == {"content": [{"type": "text", "text": "original"}]}
+    assert _cache(tmp_path).get("k") == {"content": [{"type": "text", "text": "original"}]}
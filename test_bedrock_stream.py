@@ -0,0 +1,108 @@
+"""
+Streaming Bedrock checks: call_bedrock_stream yields text deltas in order,
+records usage, retries a throttle or transient error raised before the first
+delta, and never retries once deltas have reached the caller.
+invoke_model_with_response_stream is replaced by an in-memory fake.
+
+Run:  python -m pytest -q test_bedrock_stream.py
+"""
+import json
+import os
+
+import pytest
+from botocore.exceptions import ClientError
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "fake")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "fake")
+
+import bedrock_helper  # noqa: E402
+from prompt_builder import usage_report  # noqa: E402
+from rate_limiter import AdaptiveRateLimiter  # noqa: E402
+
+
+def _error(code: str, status: int) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": code}, "ResponseMetadata": {"HTTPStatusCode": status}},
+                       "InvokeModelWithResponseStream")
+
+
+def _event(data: dict) -> dict:
+    return {"chunk": {"bytes": json.dumps(data).encode("utf-8")}}
+
+
+def _events(deltas, fail_after: int = None, error: Exception = None):
+    """Claude stream events for `deltas`; raises `error` after `fail_after` deltas when given."""
+    yield _event({"type": "message_start", "message": {"usage": {"input_tokens": 12}}})
+    for i, text in enumerate(deltas):
+        if i == fail_after:
+            raise error
+        yield _event({"type": "content_block_delta", "delta": {"type": "text_delta", "text": text}})
+    yield _event({"type": "message_delta", "usage": {"output_tokens": len(deltas)}})
+
+
+class FakeStreamClient:
+    """Plays one scripted outcome per call: an exception to raise, or a body (iterable of events)."""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def invoke_model_with_response_stream(self, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return {"body": outcome}
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    limiter = AdaptiveRateLimiter(backoff_base=0.001, backoff_cap=0.001)
+    monkeypatch.setattr(bedrock_helper, "bedrock_limiter", limiter)
+    return limiter
+
+
+def _use(monkeypatch, client):
+    monkeypatch.setattr(bedrock_helper, "get_bedrock_client", lambda: client)
+    return client
+
+
+def test_stream_yields_deltas_and_records_usage(monkeypatch, limiter):
+    client = _use(monkeypatch, FakeStreamClient([_events(["Hel", "lo", "!"])]))
+    deltas = list(bedrock_helper.call_bedrock_stream("hi", cache=False, call_site="stream-test"))
+    assert deltas == ["Hel", "lo", "!"] and client.calls == 1
+    usage = usage_report()["stream-test"]
+    assert (usage["calls"], usage["input_tokens"], usage["output_tokens"]) == (1, 12, 3)
+    assert limiter.metrics()["in_flight"] == 0
+
+
+def test_stream_retries_failures_before_the_first_delta(monkeypatch, limiter):
+    client = _use(monkeypatch, FakeStreamClient([
+        _error("ThrottlingException", 429),  # refused outright
+        _events(["never"], fail_after=0, error=_error("ServiceUnavailableException", 503)),  # before any delta
+        _events(["ok"]),
+    ]))
+    assert list(bedrock_helper.call_bedrock_stream("hi", cache=False)) == ["ok"]
+    m = limiter.metrics()
+    assert client.calls == 3 and (m["throttles"], m["errors"], m["successes"], m["in_flight"]) == (1, 1, 1, 0)
+
+
+def test_stream_does_not_retry_after_yielding(monkeypatch, limiter):
+    client = _use(monkeypatch, FakeStreamClient([
+        _events(["Hel", "lo"], fail_after=1, error=_error("ServiceUnavailableException", 503)),
+        _events(["Hel", "lo"]),
+    ]))
+    received = []
+    with pytest.raises(ClientError):
+        for delta in bedrock_helper.call_bedrock_stream("hi", cache=False):
+            received.append(delta)
+    assert received == ["Hel"]  # no duplicated "Hel" from a second attempt
+    assert client.calls == 1 and limiter.metrics()["in_flight"] == 0
+
+
+def test_completed_stream_is_cached(monkeypatch, limiter, tmp_path):
+    from bedrock_cache import PromptCache
+    monkeypatch.setattr(bedrock_helper, "prompt_cache", PromptCache(path=str(tmp_path / "cache.sqlite")))
+    client = _use(monkeypatch, FakeStreamClient([_events(["cached ", "reply"])]))
+    assert list(bedrock_helper.call_bedrock_stream("hi", temperature=0)) == ["cached ", "reply"]
+    assert list(bedrock_helper.call_bedrock_stream("hi", temperature=0)) == ["cached reply"]
+    assert client.calls == 1
@@ -0,0 +1,63 @@
+"""
+BM25 ranker checks: field-weighted ranking, batch ranking matching single
+queries on both the sparse and dense paths, incremental updates matching a
+full rebuild, and the BM25 fallback that recommend_product uses when no
+keyword matches.
+
+Run:  python -m pytest -q test_bm25.py
+"""
+import numpy as np
+
+import tools.bm25 as bm25
+import tools.catalog as catalog_tools
+from test_product_index import PRODUCTS, use_catalog
+from tools.bm25 import BM25Index
+
+
+def test_rank_prefers_matching_product_text():
+    index = BM25Index(PRODUCTS)
+    ranked = index.rank("something to cover flood damage to my house")
+    assert ranked[0]["product"]["id"] == "p02"
+    assert all(r["score"] > 0 for r in ranked)
+    assert index.rank("the of and to") == []  # stopwords only
+
+
+def test_rank_batch_matches_single_queries_on_both_paths(monkeypatch):
+    products = [{"id": f"x{i}", "name": f"Plan {i}", "keywords": [f"term{i % 7}"]} for i in range(200)] + PRODUCTS
+    index = BM25Index(products)
+    queries = ["term3", "flood house", "pension savings retirement", "nothing matches here", "term1 term2"]
+    single = [index.rank(q, top_k=4) for q in queries]
+    postings = [index._postings(q) for q in queries]
+    assert index._top_sparse(postings, 4) == single
+    assert index._top_dense(index._score_rows(postings), 4) == single
+    assert index.rank_batch(queries, top_k=4) == single
+    monkeypatch.setattr(bm25, "MAX_CELLS_PER_CHUNK", len(products))  # one query per chunk
+    assert index.rank_batch(queries, top_k=4) == single
+    scores = index.score_batch(queries)
+    assert np.allclose(scores[1], index.score("flood house"))
+
+
+def test_updated_index_matches_full_rebuild():
+    index = BM25Index(PRODUCTS)
+    edited = [dict(p) for p in PRODUCTS]
+    edited[1] = dict(edited[1], short_description="Cover for pets and vet bills", keywords=["pet insurance"])
+    new = index.updated(edited, [1])
+    rebuilt = BM25Index(edited)
+    for query in ("vet bills for my pet", "flood house", "retirement income", "cover"):
+        assert np.allclose(new.score(query), rebuilt.score(query)), query
+    assert index.rank("vet bills") == [] and new.rank("vet bills")[0]["product"]["id"] == "p02"
+    assert index.updated(PRODUCTS, []).rank("flood house") == index.rank("flood house")
+
+
+def test_recommend_product_falls_back_to_bm25(tmp_path, monkeypatch):
+    use_catalog(tmp_path, monkeypatch)
+    query = "something that covers flood damage"  # no product keyword, but matches a benefit
+    assert catalog_tools.match_product(query) is None
+    assert catalog_tools.recommend_product(user_text=query)["id"] == "p02"
+
+
+def test_weak_bm25_match_is_no_match(tmp_path, monkeypatch):
+    use_catalog(tmp_path, monkeypatch)
+    monkeypatch.setattr(catalog_tools, "MIN_RANK_SCORE", 100.0)
+    result = catalog_tools.recommend_product(user_text="something that covers flood damage")
+    assert result.get("no_match") is True
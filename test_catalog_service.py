@@ -0,0 +1,118 @@
+"""
+Catalog service checks: atomic snapshot swap on reload, retired mmap catalogs
+are closed once their last lease is released, incremental re-indexing of
+edited products, the first build happens off the import path, and a bad
+catalog file never replaces (or breaks) the live one.
+
+Run:  python -m pytest -q test_catalog_service.py
+"""
+import json
+import os
+
+from tools.catalog_service import CatalogService
+from tools.catalog_store import write_binary
+
+V1 = [{"id": "p01", "name": "Home Cover", "keywords": ["home insurance"]},
+      {"id": "p02", "name": "Travel Cover", "keywords": ["travel insurance"]}]
+V2 = V1 + [{"id": "p03", "name": "Pet Cover", "keywords": ["pet insurance"]}]
+
+
+def _write(path, products, mtime):
+    write_binary(products, str(path))
+    os.utime(path, (mtime, mtime))
+
+
+def test_reload_swaps_snapshot_and_closes_old_catalog(tmp_path):
+    path = tmp_path / "catalog.pcat"
+    _write(path, V1, 1_000_000)
+    service = CatalogService(str(path))
+    old = service.snapshot()
+    assert [p["id"] for p in old.catalog] == ["p01", "p02"]
+
+    _write(path, V2, 1_000_100)
+    assert service.reload() is True
+    new = service.snapshot()
+    assert new is not old and new.version == old.version + 1
+    assert [p["id"] for p in new.catalog] == ["p01", "p02", "p03"]
+    assert new.index.best("pet insurance")["id"] == "p03"
+    assert old.catalog._file.closed and not new.catalog._file.closed
+    assert service.reload() is False  # same mtime: nothing to do
+
+
+def test_leased_catalog_stays_open_until_released(tmp_path):
+    path = tmp_path / "catalog.pcat"
+    _write(path, V1, 1_000_000)
+    service = CatalogService(str(path))
+    with service.lease() as old:
+        with service.lease() as again:
+            _write(path, V2, 1_000_100)
+            assert service.reload() is True
+            assert service.snapshot() is not old and again is old
+        assert not old.catalog._file.closed  # one reader still holds the old snapshot
+        assert old.catalog[0]["id"] == "p01"
+    assert old.catalog._file.closed
+
+    with service.lease() as snap:
+        assert len(snap.catalog) == 3  # new leases get the new snapshot
+    assert not snap.catalog._file.closed  # the live catalog is not closed by its leases
+
+
+def test_edited_products_are_reindexed_incrementally(tmp_path):
+    path = tmp_path / "catalog.pcat"
+    _write(path, V2, 1_000_000)
+    service = CatalogService(str(path))
+    edited = [dict(p) for p in V2]
+    edited[1] = dict(edited[1], name="Ski Cover", keywords=["ski insurance"])
+    with service.lease() as old:
+        _write(path, edited, 1_000_100)
+        assert service.reload() is True
+        new = service.snapshot()
+        assert new.index.best("ski")["id"] == "p02" and new.ranker.rank("ski cover")[0]["product"]["id"] == "p02"
+        assert new.ranker.rank("travel") == []
+        assert old.ranker.rank("travel")[0]["product"]["id"] == "p02"  # old snapshot unchanged
+
+
+def test_first_snapshot_is_built_on_start_or_first_use(tmp_path):
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps(V1))
+    os.utime(path, (1_000_000, 1_000_000))
+    lazy = CatalogService(str(path))
+    assert lazy._snapshot is None  # constructing the service (at import) loads nothing
+    with lazy.lease() as snap:
+        assert len(snap.catalog) == 2
+        assert snap.hashes is None  # JSON catalogs are hashed only when a reload needs a diff
+
+    watched = CatalogService(str(path), poll_seconds=60).start()
+    try:
+        assert len(watched.snapshot().catalog) == 2  # built by the watcher, or waited for
+    finally:
+        watched.stop()
+
+    edited = [dict(V1[0], name="Home Cover Plus"), V1[1]]
+    path.write_text(json.dumps(edited))
+    os.utime(path, (1_000_100, 1_000_100))
+    assert lazy.reload() is True
+    assert lazy.snapshot().index.best("home insurance")["name"] == "Home Cover Plus"
+    assert len(lazy.snapshot().hashes) == 2
+
+
+def test_failed_reload_keeps_previous_snapshot(tmp_path):
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps(V1))
+    os.utime(path, (1_000_000, 1_000_000))
+    service = CatalogService(str(path))
+    live = service.snapshot()
+
+    path.write_text(json.dumps({"products": V2}))  # parses, but is not a list of products
+    os.utime(path, (1_000_100, 1_000_100))
+    assert service.reload() is False
+    assert service.snapshot() is live and len(live.catalog) == 2
+    assert service.reload() is False  # failed mtime is not retried until the file changes
+
+
+def test_bad_catalog_at_startup_gives_empty_snapshot(tmp_path):
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps({"products": V1}))
+    service = CatalogService(str(path))
+    snap = service.snapshot()
+    assert len(snap.catalog) == 0 and "Failed to load product catalog" in snap.load_error
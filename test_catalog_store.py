@@ -0,0 +1,78 @@
+"""
+Binary catalog index checks: round trip, header-only indexing (no record is
+decoded to build the keyword index) and ValueError for damaged files.
+
+Run:  python -m pytest -q test_catalog_store.py
+"""
+import pytest
+
+from tools.catalog_store import MappedCatalog, load_catalog, product_hash, write_binary
+from tools.product_index import ProductIndex
+
+PRODUCTS = [
+    {"id": "p01", "name": "Home Cover", "keywords": ["home insurance", "buildings"], "premium": 12},
+    {"id": "p02", "name": "Retirement Income", "keywords": ["annuity", "pension income"]},
+    {"name": "Unnamed", "keywords": []},
+]
+
+
+@pytest.fixture
+def pcat(tmp_path):
+    path = tmp_path / "catalog.pcat"
+    write_binary(PRODUCTS, str(path))
+    return path
+
+
+def test_round_trip_and_header_columns(pcat):
+    catalog = load_catalog(str(pcat))
+    try:
+        assert isinstance(catalog, MappedCatalog) and len(catalog) == 3
+        assert list(catalog) == PRODUCTS
+        assert catalog.ids == ("p01", "p02", None)
+        assert catalog.keywords[1] == ("annuity", "pension income")
+        assert catalog.hashes == tuple(product_hash(p) for p in PRODUCTS)
+        assert catalog.get("p02")["name"] == "Retirement Income" and catalog.get("p99") is None
+    finally:
+        catalog.close()
+
+
+def test_keyword_index_is_built_without_decoding_records(pcat, monkeypatch):
+    decoded = []
+    getitem = MappedCatalog.__getitem__
+    monkeypatch.setattr(MappedCatalog, "__getitem__", lambda self, row: decoded.append(row) or getitem(self, row))
+    catalog = MappedCatalog(str(pcat))
+    try:
+        index = ProductIndex(catalog)
+        assert decoded == []
+        assert index.best("pension annuity")["id"] == "p02"
+        assert decoded == [1]  # only the returned product
+    finally:
+        catalog.close()
+
+
+@pytest.mark.parametrize("damage", [
+    lambda data: b"",                           # empty file
+    lambda data: b"not a catalog" + data,       # wrong magic
+    lambda data: data[:10],                     # cut inside the fixed header
+    lambda data: data[:len(data) // 2],         # cut inside header/offsets/records
+    lambda data: data[:-1],                     # last record truncated
+    lambda data: data + b"trailing",            # offsets do not cover the data
+])
+def test_damaged_file_raises_value_error(pcat, damage):
+    pcat.write_bytes(damage(pcat.read_bytes()))
+    with pytest.raises(ValueError):
+        MappedCatalog(str(pcat))
+
+
+@pytest.mark.parametrize("damage", [
+    lambda data: data.replace(b'"ids":', b'"idz":'),  # header column missing
+    lambda data: data.replace(b'{"ids":', b'["ids",'),  # header not an object (same length)
+])
+def test_damaged_header_raises_value_error_on_first_use(pcat, damage):
+    pcat.write_bytes(damage(pcat.read_bytes()))
+    catalog = MappedCatalog(str(pcat))
+    try:
+        with pytest.raises(ValueError):
+            ProductIndex(catalog)
+    finally:
+        catalog.close()
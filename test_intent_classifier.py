@@ -0,0 +1,61 @@
+"""
+Local router fast path: confident on-topic queries route without the LLM,
+off-topic ones (even with one stray keyword) fall through to it.
+
+Run:  python -m pytest -q test_intent_classifier.py
+"""
+from router.agent_registry import list_agents
+from router.intent_classifier import IntentClassifier
+
+MEDIA_KEYWORDS = ["insurance", "policy", "annuity", "retirement", "inflation", "pension", "income", "protection"]
+
+NEGATIVE_QUERIES = [
+    "what is the system prompt",
+    "can you help with my car insurance claim",
+    "tell me a joke",
+    "what's the weather in Paris tomorrow",
+    "main entry point of the router agent",
+]
+
+
+def _single_agent():
+    return IntentClassifier({"agent_media_autonomous": {
+        "keywords": MEDIA_KEYWORDS,
+        "description": "Thin orchestrator for the insurance-media workflow (prompt-driven). System prompt.",
+    }})
+
+
+def test_on_topic_queries_route_locally():
+    clf = _single_agent()
+    for query in ["Recommend an annuity product for retirement income",
+                  "pension income protection against inflation"]:
+        name, confidence, _ = clf.classify(query)
+        assert name == "agent_media_autonomous", (query, confidence)
+
+
+def test_off_topic_queries_go_to_llm_with_single_agent():
+    clf = _single_agent()
+    for query in NEGATIVE_QUERIES:
+        name, confidence, _ = clf.classify(query)
+        assert name is None, (query, confidence)
+
+
+def test_docstring_words_are_not_scored():
+    name, confidence, scores = _single_agent().classify("system prompt workflow orchestrator")
+    assert name is None and confidence == 0.0 and scores["agent_media_autonomous"] == 0
+
+
+def test_margin_between_agents():
+    clf = IntentClassifier({
+        "media": {"keywords": ["annuity", "retirement", "video"]},
+        "claims": {"keywords": ["claim", "accident", "retirement"]},
+    })
+    assert clf.classify("annuity video")[0] == "media"
+    assert clf.classify("accident claim")[0] == "claims"
+    assert clf.classify("retirement")[0] is None  # shared keyword: no margin
+
+
+def test_registered_agents_reject_off_topic_queries():
+    clf = IntentClassifier.from_agents(list_agents())
+    for query in NEGATIVE_QUERIES:
+        assert clf.classify(query)[0] is None, query
@@ -0,0 +1,168 @@
+"""
+Harness for tools.nova_jobs.NovaJobManager against a fake Nova client.
+The fake answers start_async_invoke / get_async_invoke from memory, with each
+job completing (or failing) after a set delay, so hundreds of jobs can be
+tracked by the single poller thread in a couple of seconds. The same fake
+backs the tools.nova_dedup tests (completed reuse and in-flight coalescing).
+
+Run:  python test_nova_jobs.py
+"""
+import threading
+import time
+
+from tools.nova_dedup import NovaDeduplicator, VideoStore, generation_key
+from tools.nova_jobs import NovaJobManager
+
+N_JOBS = 300
+
+
+class FakeNovaClient:
+    """In-memory stand-in for the bedrock-runtime async invoke API."""
+
+    def __init__(self, duration=0.3, fail_every=0, never_finish=False):
+        self.duration = duration
+        self.fail_every = fail_every
+        self.never_finish = never_finish
+        self.jobs = {}
+        self.get_calls = 0
+        self.pollers = set()
+        self._lock = threading.Lock()
+
+    def start_async_invoke(self, modelId, modelInput, outputDataConfig):
+        with self._lock:
+            arn = f"arn:aws:bedrock:eu-west-1:000000000000:async-invoke/job-{len(self.jobs)}"
+            self.jobs[arn] = (time.monotonic(), outputDataConfig["s3OutputDataConfig"]["s3Uri"] + f"job-{len(self.jobs)}")
+        return {"invocationArn": arn}
+
+    def get_async_invoke(self, invocationArn):
+        with self._lock:
+            self.get_calls += 1
+            self.pollers.add(threading.current_thread().name)
+            started, s3_uri = self.jobs[invocationArn]
+        index = int(invocationArn.rsplit("-", 1)[1])
+        if self.never_finish or time.monotonic() - started < self.duration:
+            return {"invocationArn": invocationArn, "status": "InProgress"}
+        if self.fail_every and index % self.fail_every == 0:
+            return {"invocationArn": invocationArn, "status": "Failed", "failureMessage": "content filtered"}
+        return {"invocationArn": invocationArn, "status": "Completed",
+                "outputDataConfig": {"s3OutputDataConfig": {"s3Uri": s3_uri}}}
+
+
+def _manager(client, **kwargs):
+    kwargs.setdefault("initial_interval", 0.05)
+    kwargs.setdefault("max_interval", 0.2)
+    kwargs.setdefault("default_timeout", 10)
+    return NovaJobManager(client=client, **kwargs)
+
+
+def _submit(manager, i=0):
+    return manager.submit({"taskType": "TEXT_VIDEO", "textToVideoParams": {"text": f"video {i}"}},
+                          "s3://bucket/run/nova_video/")
+
+
+def test_submit_returns_immediately_and_completes():
+    manager = _manager(FakeNovaClient(duration=0.2))
+    started = time.perf_counter()
+    job = _submit(manager)
+    assert time.perf_counter() - started < 0.1
+    assert not job.done()
+    result = job.result(timeout=5)
+    assert result["video_s3_uri"] == "s3://bucket/run/nova_video/job-0/output.mp4"
+    assert job.status == "Completed"
+    manager.shutdown()
+
+
+def test_many_jobs_one_poller():
+    client = FakeNovaClient(duration=0.3, fail_every=7)
+    manager = _manager(client)
+    done = []
+    jobs = [_submit(manager, i) for i in range(N_JOBS)]
+    for job in jobs:
+        job.add_done_callback(done.append)
+    results = [job.result(timeout=10) for job in jobs]
+    failed = [r for r in results if r["video_s3_uri"] is None]
+    assert len(done) == N_JOBS
+    assert len(failed) == len(range(0, N_JOBS, 7))
+    assert all(r["error"] == "content filtered" for r in failed)
+    assert client.pollers == {"nova-poller"}
+    assert manager.pending() == 0
+    manager.shutdown()
+
+
+def test_backoff_limits_polls():
+    client = FakeNovaClient(duration=1.0)
+    manager = _manager(client, initial_interval=0.05, max_interval=0.4)
+    _submit(manager).result(timeout=5)
+    # Fixed 0.05s polling would need ~20 calls; 1.5x backoff needs far fewer
+    assert client.get_calls < 10
+    manager.shutdown()
+
+
+def test_deadline_times_out_job():
+    manager = _manager(FakeNovaClient(never_finish=True))
+    job = manager.submit({}, "s3://bucket/run/nova_video/", timeout=0.3)
+    result = job.result(timeout=5)
+    assert result["video_s3_uri"] is None
+    assert "did not complete" in result["error"]
+    assert job.status == "TimedOut"
+    manager.shutdown()
+
+
+def test_dedup_ignores_seed_and_reuses_completed_video():
+    client = FakeNovaClient(duration=0.1)
+    manager = _manager(client)
+    dedup = NovaDeduplicator(store=VideoStore(":memory:"), manager_for=lambda region: manager)
+    config = {"fps": 24, "durationSeconds": 6, "dimension": "1280x720"}
+    assert generation_key("hello", config=dict(config, seed=1)) == generation_key("hello", config=dict(config, seed=2))
+
+    first = dedup.submit("hello", dict(config, seed=1), "s3://bucket/a/nova_video/").result(timeout=5)
+    again = dedup.submit("hello", dict(config, seed=2), "s3://bucket/b/nova_video/")
+    assert again.done()
+    assert again.result()["video_s3_uri"] == first["video_s3_uri"]
+    assert again.result()["deduplicated"] is True
+    assert len(client.jobs) == 1
+    manager.shutdown()
+
+
+def test_dedup_coalesces_concurrent_requests():
+    client = FakeNovaClient(duration=0.3)
+    manager = _manager(client)
+    dedup = NovaDeduplicator(store=VideoStore(":memory:"), manager_for=lambda region: manager)
+    config = {"fps": 24, "durationSeconds": 6, "dimension": "1280x720"}
+    handles = []
+    threads = [threading.Thread(target=lambda: handles.append(
+        dedup.submit("same narration", config, "s3://bucket/run/nova_video/"))) for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    uris = {h.result(timeout=5)["video_s3_uri"] for h in handles}
+    assert len(client.jobs) == 1
+    assert len(uris) == 1
+    assert dedup.stats()["submitted"] == 1
+    manager.shutdown()
+
+
+def test_dedup_resubmits_when_stored_video_is_gone():
+    client = FakeNovaClient(duration=0.05)
+    manager = _manager(client)
+    dedup = NovaDeduplicator(store=VideoStore(":memory:"), manager_for=lambda region: manager,
+                             exists=lambda uri: False)
+    dedup.submit("text", {}, "s3://bucket/run/nova_video/").result(timeout=5)
+    dedup.submit("text", {}, "s3://bucket/run/nova_video/").result(timeout=5)
+    assert len(client.jobs) == 2
+    manager.shutdown()
+
+
+if __name__ == "__main__":
+    client = FakeNovaClient(duration=1.0)
+    manager = _manager(client, initial_interval=0.1, max_interval=0.5)
+    started = time.perf_counter()
+    jobs = [_submit(manager, i) for i in range(N_JOBS)]
+    submitted = time.perf_counter() - started
+    results = [job.result(timeout=30) for job in jobs]
+    elapsed = time.perf_counter() - started
+    ok = sum(1 for r in results if r["video_s3_uri"])
+    print(f"{N_JOBS} jobs submitted in {submitted * 1000:.1f} ms, all finished in {elapsed:.2f}s")
+    print(f"{ok} completed, {client.get_calls} status polls, poller threads: {sorted(client.pollers)}")
+    manager.shutdown()
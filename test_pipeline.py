@@ -0,0 +1,111 @@
+"""
+Pipeline engine checks: dependency ordering, parallel fan-out, retries and
+propagation of upstream failures to skipped dependents.
+
+Run:  python -m pytest -q test_pipeline.py
+"""
+import threading
+import time
+
+import pytest
+
+from agents.pipeline import Pipeline, PipelineNode, build_media_pipeline, run_media_pipeline
+
+
+def _recorder():
+    events, lock = [], threading.Lock()
+
+    def node(name, output=None, delay=0.0):
+        def func(ctx, results):
+            with lock:
+                events.append(("start", name, tuple(sorted(results))))
+            time.sleep(delay)
+            with lock:
+                events.append(("end", name))
+            return output if output is not None else {"value": name}
+        return func
+
+    return node, events
+
+
+def test_nodes_run_after_their_dependencies():
+    node, events = _recorder()
+    pipeline = Pipeline([
+        PipelineNode("d", node("d"), deps=["b", "c"]),
+        PipelineNode("b", node("b"), deps=["a"]),
+        PipelineNode("c", node("c"), deps=["a"]),
+        PipelineNode("a", node("a")),
+    ])
+    assert pipeline.order.index("a") < pipeline.order.index("b") < pipeline.order.index("d")
+    run = pipeline.run({})
+    assert [s["tool"] for s in run["steps"]] == pipeline.order
+    assert all(s["status"] == "success" for s in run["steps"])
+    started = {e[1]: e[2] for e in events if e[0] == "start"}
+    assert started["a"] == () and started["d"] == ("a", "b", "c")
+
+
+def test_independent_nodes_overlap():
+    node, events = _recorder()
+    pipeline = Pipeline([PipelineNode(n, node(n, delay=0.2)) for n in ("x", "y", "z")], max_workers=3)
+    started = time.perf_counter()
+    pipeline.run({})
+    assert time.perf_counter() - started < 0.5  # three 0.2s nodes, not 0.6s in sequence
+
+
+def test_unknown_dependency_and_cycle_are_rejected():
+    with pytest.raises(ValueError, match="unknown"):
+        Pipeline([PipelineNode("a", lambda c, r: {}, deps=["missing"])])
+    with pytest.raises(ValueError, match="cycle"):
+        Pipeline([PipelineNode("a", lambda c, r: {}, deps=["b"]), PipelineNode("b", lambda c, r: {}, deps=["a"])])
+
+
+def test_failed_node_is_retried_until_it_succeeds():
+    calls = []
+
+    def flaky(ctx, results):
+        calls.append(1)
+        if len(calls) < 3:
+            raise RuntimeError("transient")
+        return {"ok": True}
+
+    run = Pipeline([PipelineNode("flaky", flaky, retries=2)]).run({})
+    step = run["steps"][0]
+    assert (step["status"], step["attempts"], len(calls)) == ("success", 3, 3)
+
+
+def test_failure_after_retries_skips_dependents_only():
+    node, _ = _recorder()
+    pipeline = Pipeline([
+        PipelineNode("root", node("root")),
+        PipelineNode("bad", node("bad", output={"error": "boom"}), deps=["root"], retries=1),
+        PipelineNode("child", node("child"), deps=["bad"]),
+        PipelineNode("grandchild", node("grandchild"), deps=["child"]),
+        PipelineNode("sibling", node("sibling"), deps=["root"]),
+    ])
+    steps = {s["tool"]: s for s in pipeline.run({})["steps"]}
+    assert steps["bad"]["status"] == "failed" and steps["bad"]["attempts"] == 2
+    assert steps["child"]["status"] == "skipped" and steps["grandchild"]["status"] == "skipped"
+    assert steps["sibling"]["status"] == "success" and steps["root"]["status"] == "success"
+
+
+def test_non_dict_output_is_a_failure():
+    run = Pipeline([PipelineNode("odd", lambda c, r: "text")]).run({})
+    assert run["steps"][0]["status"] == "failed" and "expected dict" in run["steps"][0]["error"]
+
+
+def test_media_pipeline_reports_partial_success():
+    def tool(name, fn):
+        fn.tool_name = name
+        return fn
+
+    tools = [
+        tool("recommend_product", lambda user_text: {"id": "p01", "name": "Home"}),
+        tool("generate_script", lambda product, s3_bucket, s3_prefix: {"narration_script_s3_uri": "s3://b/p/script.txt"}),
+        tool("synthesize_speech", lambda script_s3_uri, s3_bucket, s3_prefix: {"error": "polly down"}),
+        tool("create_slides", lambda product, s3_bucket, s3_prefix: {"slides_s3_uri": "s3://b/p/slides.pptx"}),
+        tool("generate_nova_video", lambda narration_script_s3_uri, s3_bucket, s3_prefix: {"video_s3_uri": "s3://b/p/v.mp4"}),
+    ]
+    result = run_media_pipeline("home insurance", "b", "p", pipeline=build_media_pipeline(tools, retries=0))
+    assert result["status"] == "partial_success"
+    assert result["narration_audio_s3_uri"] is None and result["video_s3_uri"] == "s3://b/p/v.mp4"
+    assert result["error"] == "synthesize_speech: polly down"
@@ -0,0 +1,68 @@
+"""
+Keyword index checks: ranking by keyword postings, the no-match path of
+recommend_product, and copy-on-write updates for edited products.
+
+Run:  python -m pytest -q test_product_index.py
+"""
+import json
+
+import tools.catalog as catalog_tools
+from tools.catalog_service import CatalogService
+from tools.catalog_store import CatalogStore
+from tools.product_index import ProductIndex, tokenize
+
+PRODUCTS = [
+    {"id": "p01", "name": "Annuity Protector Plus", "short_description": "Lifetime income with inflation protection",
+     "benefits": ["Guaranteed income"], "keywords": ["annuity", "retirement", "income"]},
+    {"id": "p02", "name": "Home Shield", "short_description": "Cover for your house and contents",
+     "benefits": ["Flood cover", "Theft cover"], "keywords": ["home insurance", "buildings", "contents"]},
+    {"id": "p03", "name": "Retirement Saver", "short_description": "Tax-efficient pension savings",
+     "benefits": ["Employer top-ups"], "keywords": ["pension", "retirement"]},
+]
+
+
+def use_catalog(tmp_path, monkeypatch, products=PRODUCTS):
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps(products))
+    monkeypatch.setattr(catalog_tools, "CATALOG_SERVICE", CatalogService(str(path)))
+
+
+def test_tokenize_folds_plurals_and_suffixes():
+    assert tokenize("Annuities, protecting PENSIONS") == ["annuity", "protect", "pension"]
+
+
+def test_search_ranks_by_keyword_overlap():
+    index = ProductIndex(CatalogStore.from_products(PRODUCTS))
+    hits = index.search("retirement income annuity")
+    assert [h["product"]["id"] for h in hits] == ["p01", "p03"]
+    assert hits[0]["score"] > hits[1]["score"]
+    assert index.best("my pensions")["id"] == "p03"
+
+
+def test_no_keyword_hit_returns_nothing():
+    index = ProductIndex(PRODUCTS)
+    assert index.search("car breakdown cover") == [] and index.best("car breakdown cover") is None
+
+
+def test_recommend_product_reports_no_match(tmp_path, monkeypatch):
+    use_catalog(tmp_path, monkeypatch)
+    assert catalog_tools.recommend_product(user_text="annuity please")["id"] == "p01"
+    assert catalog_tools.recommend_product(user_text="quantum chromodynamics") == {
+        "error": "No product matches the request.", "no_match": True}
+    assert catalog_tools.match_product("quantum chromodynamics") is None
+
+
+def test_recommend_product_with_empty_catalog_reports_load_error(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog_tools, "CATALOG_SERVICE", CatalogService(str(tmp_path / "missing.json")))
+    result = catalog_tools.recommend_product(user_text="annuity")
+    assert "not found" in result["error"] and "no_match" not in result
+
+
+def test_updated_index_only_changes_edited_rows():
+    index = ProductIndex(PRODUCTS)
+    edited = [dict(p) for p in PRODUCTS]
+    edited[1] = dict(edited[1], keywords=["pet insurance"])
+    new = index.updated(edited, [1])
+    assert new.best("pet")["id"] == "p02" and new.best("buildings") is None
+    assert index.best("buildings")["id"] == "p02" and index.best("pet") is None  # old index unchanged
+    assert new.search("retirement") == ProductIndex(edited).search("retirement")
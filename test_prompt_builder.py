@@ -0,0 +1,66 @@
+"""
+Prompt builder checks: static prefixes are rendered once, with literal JSON
+braces (no `{{` left over), for every call site that uses a PromptTemplate,
+and prompt caching is only switched on for models that support it.
+
+Run:  python -m pytest -q test_prompt_builder.py
+"""
+import os
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "fake")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "fake")
+
+import prompt_builder
+from bedrock_helper import MODEL_ID, _build_payload
+from prompt_builder import PromptTemplate, prompt_caching_enabled, record_usage, render_tools, usage_report
+
+
+def _call_site_templates():
+    from agents import agent_media_autonomous, agent_media_control
+    from tools import script_gen
+    return [agent_media_autonomous.AGENT_PROMPT, agent_media_control.AGENT_PROMPT,
+            script_gen.NARRATION_PROMPT, script_gen.BATCH_PROMPT]
+
+
+def test_static_braces_are_unescaped_without_fields():
+    template = PromptTemplate('Reply with {{"status": "ok"}}', "Q: {query}", call_site="t")
+    assert template.static == 'Reply with {"status": "ok"}'
+    assert template.render(query="hi") == "Q: hi"
+
+
+def test_call_site_prompts_have_no_escaped_braces():
+    for template in _call_site_templates():
+        assert "{{" not in template.static and "}}" not in template.static, template
+        assert '"video_s3_uri"' in template.static or "narration" in template.static
+
+
+def test_render_tools_is_one_line_per_tool():
+    def recommend_product(user_text: str, top_k: int = 3) -> dict:
+        """Pick the best product.
+        Longer explanation that must not be rendered."""
+    assert render_tools([recommend_product]) == "- recommend_product(user_text: str, top_k?: int) - Pick the best product."
+
+
+def test_usage_is_counted_per_call_site():
+    record_usage("test-site", {"input_tokens": 40, "cache_read_input_tokens": 300, "output_tokens": 5})
+    record_usage("test-site", {"inputTokens": 60, "outputTokens": 7})
+    record_usage("test-site", cached=True)
+    report = usage_report()["test-site"]
+    assert (report["calls"], report["cache_hits"], report["input_tokens"], report["cache_read_tokens"]) == (2, 1, 100, 300)
+    assert report["avg_input_tokens"] == 200.0
+
+
+def test_prompt_caching_follows_the_configured_model(monkeypatch):
+    monkeypatch.setattr(prompt_builder, "PROMPT_CACHING", "auto")
+    payload = _build_payload("question", 64, 0, system="static prefix")
+    if prompt_caching_enabled(MODEL_ID):
+        assert payload["system"][0]["cache_control"] == {"type": "ephemeral"}
+    else:  # the default Claude 3 Haiku has no Bedrock prompt caching
+        assert MODEL_ID == "anthropic.claude-3-haiku-20240307-v1:0"
+        assert "cache_control" not in payload["system"][0]
+    assert prompt_caching_enabled("eu.anthropic.claude-3-7-sonnet-20250219-v1:0")
+
+    monkeypatch.setattr(prompt_builder, "PROMPT_CACHING", "on")
+    assert _build_payload("question", 64, 0, system="static prefix")["system"][0]["cache_control"] == {"type": "ephemeral"}
+    monkeypatch.setattr(prompt_builder, "PROMPT_CACHING", "off")
+    assert not prompt_caching_enabled("eu.anthropic.claude-3-7-sonnet-20250219-v1:0")
@@ -0,0 +1,294 @@
+"""
+Adaptive rate limiter checks.
+Unit tests for the AIMD rules, plus a load test against a local fake Bedrock
+endpoint that answers 429 ThrottlingException above ALLOWED_RATE req/s.
+With the limiter, call_bedrock should settle close to the allowed rate and
+only see a small share of throttled attempts instead of a retry storm.
+
+Run:  python test_rate_limiter.py
+"""
+import gc
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import boto3
+import pytest
+from botocore.eventstream import EventStream
+
+from rate_limiter import AdaptiveRateLimiter, instrument_client, is_throttle, is_transient
+from test_bedrock_async import _point_helper_at
+
+ALLOWED_RATE = 40.0  # req/s the fake endpoint accepts
+ALLOWED_BURST = 10
+FAKE_LATENCY = 0.02
+N_PROMPTS = 400
+
+
+class ThrottlingBedrockHandler(BaseHTTPRequestHandler):
+    """POST /model/{modelId}/invoke behind a server-side token bucket."""
+
+    protocol_version = "HTTP/1.1"
+    lock = threading.Lock()
+    tokens = float(ALLOWED_BURST)
+    refilled = time.monotonic()
+    stats = {"ok": 0, "throttled": 0}
+
+    @classmethod
+    def reset(cls):
+        with cls.lock:
+            cls.tokens, cls.refilled = float(ALLOWED_BURST), time.monotonic()
+            cls.stats = {"ok": 0, "throttled": 0}
+
+    @classmethod
+    def _admit(cls) -> bool:
+        with cls.lock:
+            now = time.monotonic()
+            cls.tokens = min(ALLOWED_BURST, cls.tokens + (now - cls.refilled) * ALLOWED_RATE)
+            cls.refilled = now
+            if cls.tokens >= 1:
+                cls.tokens -= 1
+                cls.stats["ok"] += 1
+                return True
+            cls.stats["throttled"] += 1
+            return False
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not self._admit():
+            payload = json.dumps({"message": "Too many requests, please wait before trying again."}).encode()
+            self.send_response(429)
+            self.send_header("x-amzn-ErrorType", "ThrottlingException")
+        else:
+            time.sleep(FAKE_LATENCY)
+            payload = json.dumps({"content": [{"type": "text", "text": "ok"}],
+                                  "usage": {"input_tokens": 1, "output_tokens": 1}}).encode()
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_throttling_bedrock():
+    ThrottlingBedrockHandler.reset()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ThrottlingBedrockHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_load(helper, limiter, n: int = N_PROMPTS, concurrency: int = 32) -> dict:
+    helper.configure_bedrock(pool_size=concurrency, max_concurrency=concurrency)
+    started = time.perf_counter()
+    results = helper.call_bedrock_many([f"prompt {i}" for i in range(n)], retries=12)
+    elapsed = time.perf_counter() - started
+    stats = dict(ThrottlingBedrockHandler.stats)
+    return {
+        "ok": sum(1 for r in results if "error" not in r),
+        "elapsed": elapsed,
+        "rate": n / elapsed,
+        "throttled_share": stats["throttled"] / max(1, stats["ok"] + stats["throttled"]),
+        "limiter": limiter.metrics(),
+    }
+
+
+class _Throttled(Exception):
+    response = {"Error": {"Code": "ThrottlingException"}, "ResponseMetadata": {"HTTPStatusCode": 429}}
+
+
+def test_throttle_cuts_limits_once_per_cooldown():
+    limiter = AdaptiveRateLimiter(max_concurrency=16, decrease=0.5, cooldown=10)
+    for _ in range(8):
+        limiter.acquire()
+    for _ in range(8):
+        limiter.release("throttle")
+    m = limiter.metrics()
+    assert m["throttles"] == 8 and m["decreases"] == 1
+    assert m["rate_limit"] is not None and m["concurrency_limit"] <= 8 * 0.5 + 0.5
+
+
+def test_success_recovers_and_reopens_bucket():
+    limiter = AdaptiveRateLimiter(max_rate=5, rate_step=50, max_concurrency=4, decrease=0.5, cooldown=0)
+    limiter.acquire()
+    limiter.release("throttle")
+    assert limiter.metrics()["rate_limit"] is not None
+    for _ in range(20):
+        with limiter.slot():
+            pass
+    m = limiter.metrics()
+    assert m["rate_limit"] is None and m["concurrency_limit"] == 4
+
+
+def test_slot_classifies_errors():
+    limiter = AdaptiveRateLimiter(cooldown=0)
+    for exc in (_Throttled(), ValueError("boom")):
+        try:
+            with limiter.slot():
+                raise exc
+        except Exception:
+            pass
+    m = limiter.metrics()
+    assert (m["throttles"], m["errors"], m["successes"], m["in_flight"]) == (1, 1, 0, 0)
+
+
+def test_backoff_is_jittered_and_capped():
+    limiter = AdaptiveRateLimiter(backoff_base=0.5, backoff_cap=4)
+    waits = [limiter.backoff(10) for _ in range(200)]
+    assert all(0 <= w <= 4 for w in waits) and len(set(waits)) > 100
+
+
+class _Unavailable(Exception):
+    response = {"Error": {"Code": "ServiceUnavailableException"}, "ResponseMetadata": {"HTTPStatusCode": 503}}
+
+
+def test_transient_errors_are_not_throttles():
+    assert is_transient(_Unavailable()) and not is_throttle(_Unavailable())
+    assert is_throttle(_Throttled()) and not is_transient(_Throttled())
+    assert not is_transient(ValueError("bad request"))
+
+
+class FakeEventStream(EventStream):
+    """EventStream that replays canned events and can fail part-way through."""
+
+    def __init__(self, events, error=None):
+        self._events, self._error, self.closed = events, error, False
+
+    def __iter__(self):
+        yield from self._events
+        if self._error:
+            raise self._error
+
+    def close(self):
+        self.closed = True
+
+
+def _streaming_client(limiter, stream):
+    client = boto3.client("bedrock-runtime", region_name="us-east-1", aws_access_key_id="fake",
+                          aws_secret_access_key="fake")
+    instrument_client(client, limiter)
+
+    class _Response:
+        status_code = 200
+
+    # Registered on the root event, so it runs after the limiter's before-call.bedrock-runtime handler
+    client.meta.events.register(
+        "before-call", lambda **kwargs: (_Response(), {"body": stream, "ResponseMetadata": {"HTTPStatusCode": 200}}))
+    return client
+
+
+def _invoke_streaming(client):
+    return client.invoke_model_with_response_stream(modelId="m", body=b"{}")["body"]
+
+
+def test_instrumented_client_holds_slot_until_stream_is_read():
+    limiter = AdaptiveRateLimiter()
+    body = _invoke_streaming(_streaming_client(limiter, FakeEventStream([{"chunk": 1}, {"chunk": 2}])))
+    assert limiter.metrics()["in_flight"] == 1  # headers are in, the body is not
+    assert list(body) == [{"chunk": 1}, {"chunk": 2}]
+    m = limiter.metrics()
+    assert (m["in_flight"], m["successes"]) == (0, 1)
+
+    stream = FakeEventStream([{"chunk": 1}])
+    body = _invoke_streaming(_streaming_client(limiter, stream))
+    body.close()
+    body.close()  # released once only
+    assert stream.closed and limiter.metrics()["in_flight"] == 0
+
+    body = _invoke_streaming(_streaming_client(limiter, FakeEventStream([{"chunk": 1}], error=_Throttled())))
+    with pytest.raises(_Throttled):
+        list(body)
+    m = limiter.metrics()
+    assert (m["in_flight"], m["throttles"], m["successes"]) == (0, 1, 1)
+
+    _invoke_streaming(_streaming_client(limiter, FakeEventStream([])))  # dropped unread
+    gc.collect()
+    assert limiter.metrics()["in_flight"] == 0
+
+
+class FlakyBedrockHandler(BaseHTTPRequestHandler):
+    """Answers every other request with a 503 ServiceUnavailableException."""
+
+    protocol_version = "HTTP/1.1"
+    lock = threading.Lock()
+    requests = 0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.lock:
+            FlakyBedrockHandler.requests += 1
+            fail = FlakyBedrockHandler.requests % 2 == 1
+        if fail:
+            payload = json.dumps({"message": "Service unavailable"}).encode()
+            self.send_response(503)
+            self.send_header("x-amzn-ErrorType", "ServiceUnavailableException")
+        else:
+            payload = json.dumps({"content": [{"type": "text", "text": "ok"}], "usage": {}}).encode()
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_call_bedrock_retries_transient_errors_as_errors(monkeypatch):
+    FlakyBedrockHandler.requests = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyBedrockHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    helper = _point_helper_at(server, monkeypatch)
+    monkeypatch.setattr(helper, "bedrock_limiter", AdaptiveRateLimiter(backoff_base=0.01, backoff_cap=0.05))
+    try:
+        helper.configure_bedrock(pool_size=4, max_concurrency=4)
+        result = helper.call_bedrock("flaky prompt", cache=False)
+        assert result["content"][0]["text"] == "ok"
+        m = helper.bedrock_limiter.metrics()
+        assert (m["errors"], m["throttles"], m["successes"]) == (1, 0, 1), m
+    finally:
+        server.shutdown()
+
+
+class _BackoffOnly(AdaptiveRateLimiter):
+    """Baseline: counts throttles but never lowers its limits."""
+
+    def _on_throttle(self):
+        self.counters["throttles"] += 1
+
+
+def test_sustained_throughput_without_throttling_storm(monkeypatch):
+    server = start_throttling_bedrock()
+    helper = _point_helper_at(server, monkeypatch)
+    limiter = AdaptiveRateLimiter(decrease=0.7, rate_step=4, backoff_base=0.1, backoff_cap=2)
+    monkeypatch.setattr(helper, "bedrock_limiter", limiter)
+    try:
+        report = run_load(helper, limiter)
+        assert report["ok"] == N_PROMPTS, report
+        assert report["rate"] > 0.6 * ALLOWED_RATE, report
+        assert report["throttled_share"] < 0.3, report
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    server = start_throttling_bedrock()
+    patch = pytest.MonkeyPatch()
+    helper = _point_helper_at(server, patch)
+    print(f"Fake endpoint allows {ALLOWED_RATE:.0f} req/s (burst {ALLOWED_BURST}), {N_PROMPTS} prompts, 32 workers")
+    for name, limiter in [
+        ("backoff only", _BackoffOnly(backoff_base=0.1, backoff_cap=2)),
+        ("adaptive (AIMD)", AdaptiveRateLimiter(decrease=0.7, rate_step=4, backoff_base=0.1, backoff_cap=2)),
+    ]:
+        ThrottlingBedrockHandler.reset()
+        patch.setattr(helper, "bedrock_limiter", limiter)
+        r = run_load(helper, limiter)
+        m = r["limiter"]
+        print(f"{name:30s} {r['ok']}/{N_PROMPTS} ok  {r['rate']:5.1f} req/s  "
+              f"throttled {r['throttled_share']:5.1%}  limits: rate={m['rate_limit']} conc={m['concurrency_limit']}")
+    server.shutdown()
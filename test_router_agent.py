@@ -0,0 +1,120 @@
+"""
+Router checks: the streaming AgentNameScanner picks agent names out of
+chunked JSON deltas (split names, escapes, nested objects, code fences); an
+agent past its deadline is reported as a timeout, keeps its worker until it
+returns, and new dispatches are refused with a clear error while every
+worker is held by such abandoned agents. An explicit timeout=0 is honoured
+rather than replaced by the per-agent default.
+
+Run:  python -m pytest -q test_router_agent.py
+"""
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "router"))
+
+from router import router_agent  # noqa: E402
+
+
+def _scan(text: str, chunk: int) -> list:
+    """Feed text to a fresh scanner in `chunk`-sized deltas; returns (delta index, name) per completed name."""
+    scanner = router_agent.AgentNameScanner()
+    deltas = [text[i:i + chunk] for i in range(0, len(text), chunk)]
+    return [(i, name) for i, delta in enumerate(deltas) for name in scanner.feed(delta)]
+
+
+def test_scanner_emits_names_as_soon_as_they_close():
+    text = '{"agents_to_invoke": [{"name": "agent_media", "reason": "video"}, {"name": "agent_claims"}], "error": null}'
+    for chunk in (1, 2, 3, 7, len(text)):
+        assert [name for _, name in _scan(text, chunk)] == ["agent_media", "agent_claims"], chunk
+    close_quote = text.index('agent_media"') + len("agent_media")
+    assert _scan(text, 1)[0] == (close_quote, "agent_media")  # not held back until the JSON is complete
+
+
+def test_scanner_handles_escapes_nesting_and_fences():
+    routing = {
+        "name": "top_level_is_not_an_agent",
+        "agents_to_invoke": [
+            {"reason": 'say "hi" {not json} [x] \\', "meta": {"name": "nested"}, "name": 'agent_"quoted"',
+             "tags": ["name", {"name": "in_list"}]},
+            {"name": "agent_\u00e9"},
+        ],
+        "error": None,
+    }
+    body = json.dumps(routing, indent=1)  # \" and \\ and \u00e9 escapes, as the model streams them
+    assert "\\u00e9" in body and '\\"quoted\\"' in body
+    text = f"Here is the routing:\n```json\n{body}\n```"
+    for chunk in (1, 4, 9):
+        assert [name for _, name in _scan(text, chunk)] == ['agent_"quoted"', "agent_\u00e9"], chunk
+
+
+def test_scanner_ignores_incomplete_names():
+    scanner = router_agent.AgentNameScanner()
+    assert scanner.feed('{"agents_to_invoke": [{"name": "agent_me') == []
+    assert scanner.feed('dia"') == ["agent_media"]
+    assert scanner.feed('}, {"name": "agent_cl') == []
+
+
+def _dispatch(name: str, query: str, timeout: float) -> dict:
+    fut = router_agent._submit_agent(name, query)
+    return router_agent._collect_outputs({name: (fut, time.monotonic() + timeout, timeout)})[name]
+
+
+def test_abandoned_agents_block_new_dispatch_until_they_return(monkeypatch):
+    release = threading.Event()
+
+    def hung_agent(query):
+        release.wait(5)
+        return {"status": "success", "query": query}
+
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(router_agent, "AGENTS", {"agent_hung": hung_agent})
+    monkeypatch.setattr(router_agent, "AGENT_POOL_SIZE", 1)
+    monkeypatch.setattr(router_agent, "_AGENT_POOL", pool)
+    monkeypatch.setattr(router_agent, "_ABANDONED", set())
+    try:
+        first = _dispatch("agent_hung", "q1", timeout=0.05)
+        assert first["status"] == "timeout"
+        assert len(router_agent._ABANDONED) == 1
+
+        refused = _dispatch("agent_hung", "q2", timeout=0.05)
+        assert refused["status"] == "rejected" and "pool is full" in refused["error"]
+
+        release.set()
+        deadline = time.monotonic() + 5
+        while router_agent._ABANDONED and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert not router_agent._ABANDONED
+
+        assert _dispatch("agent_hung", "q3", timeout=5) == {"status": "success", "query": "q3"}
+    finally:
+        release.set()
+        pool.shutdown(wait=True)
+
+
+def test_zero_timeout_is_not_replaced_by_the_default(monkeypatch):
+    release = threading.Event()
+
+    def slow_agent(query):
+        release.wait(5)
+        return {"status": "success", "query": query}
+
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(router_agent, "AGENTS", {"agent_slow": slow_agent})
+    monkeypatch.setattr(router_agent, "AGENT_TIMEOUTS", {"agent_slow": 5})
+    monkeypatch.setattr(router_agent, "_AGENT_POOL", pool)
+    monkeypatch.setattr(router_agent, "_ABANDONED", set())
+    monkeypatch.setattr(router_agent, "local_route",
+                        lambda query: {"agents_to_invoke": [{"name": "agent_slow"}], "error": None})
+    try:
+        started = time.monotonic()
+        outputs = router_agent.run_router("quote please", timeout=0)
+        assert outputs["agent_slow"]["status"] == "timeout" and "within 0s" in outputs["agent_slow"]["error"]
+        assert time.monotonic() - started < 1
+    finally:
+        release.set()
+        pool.shutdown(wait=True)
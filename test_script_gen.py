@@ -0,0 +1,156 @@
+"""
+Packed narration checks: reply parsing and validation, re-prompting only the
+products that failed, and the ScriptBatcher linger/size flush rules.
+Bedrock, S3 and the artifact cache are replaced by in-memory fakes.
+
+Run:  python -m pytest -q test_script_gen.py
+"""
+import json
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+import tools.script_gen as script_gen
+from agents.batch_runner import ScriptBatcher
+from tools.script_gen import MAX_NARRATION_CHARS, _parse_narrations, _validate_narration, generate_scripts_batch
+
+PRODUCTS = [{"id": f"p0{i}", "name": f"Plan {i}", "short_description": "Cover", "benefits": ["A"]} for i in range(1, 5)]
+
+
+def test_parse_narrations_tolerates_fences_and_chatter():
+    reply = 'Sure! Here you go:\n```json\n{"p01": "Hello", "p02": "World"}\n```\nAnything else?'
+    assert _parse_narrations(reply) == {"p01": "Hello", "p02": "World"}
+    for bad in ("no json here", '["a list"]', '{"p01": "unterminated'):
+        with pytest.raises(ValueError):
+            _parse_narrations(bad)
+
+
+def test_validate_narration():
+    assert _validate_narration("  A fine narration. ") is None
+    assert _validate_narration("") == "empty narration"
+    assert _validate_narration(None) == "empty narration"
+    assert _validate_narration(42) == "empty narration"
+    assert "max" in _validate_narration("x" * (MAX_NARRATION_CHARS + 1))
+
+
+class FakeBedrock:
+    """Replies per attempt from a script: list of {product id: narration} (or raw text) per call."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    def __call__(self, prompt, **kwargs):
+        ids = [p["id"] for p in json.loads(prompt.split("\n", 1)[1])]
+        self.prompts.append(ids)
+        reply = self.replies.pop(0)
+        text = reply if isinstance(reply, str) else json.dumps({pid: reply[pid] for pid in ids if pid in reply})
+        future = Future()
+        future.set_result({"content": [{"type": "text", "text": text}]})
+        return future
+
+
+class FakeS3:
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[(Bucket, Key)] = Body.decode("utf-8")
+
+
+@pytest.fixture
+def fakes(monkeypatch):
+    s3 = FakeS3()
+    monkeypatch.setattr(script_gen, "get_client", lambda *a, **k: s3)
+    monkeypatch.setattr(script_gen.artifact_store, "fetch", lambda *a, **k: None)
+    monkeypatch.setattr(script_gen.artifact_store, "save", lambda *a, **k: None)
+    return s3
+
+
+def test_only_failed_products_are_reprompted(fakes, monkeypatch):
+    bedrock = FakeBedrock([
+        {"p01": "One.", "p02": "", "p03": "x" * (MAX_NARRATION_CHARS + 50), "p04": "Four."},  # p02, p03 invalid
+        {"p02": "Two.", "p03": "Three."},
+    ])
+    monkeypatch.setattr(script_gen, "submit_bedrock", bedrock)
+    results = generate_scripts_batch(PRODUCTS, "bucket", "run", batch_size=8)
+    assert bedrock.prompts == [["p01", "p02", "p03", "p04"], ["p02", "p03"]]
+    assert all("narration_script_s3_uri" in r for r in results.values())
+    assert fakes.objects[("bucket", "run/p03/narration_script.txt")] == "Three."
+
+
+def test_unparseable_batch_is_retried_then_reported(fakes, monkeypatch):
+    bedrock = FakeBedrock([
+        "not json", {},                # attempt 1: p01 unparseable, p02 missing from the reply
+        {"p01": "One."}, "still not",  # attempt 2: p01 fixed, p02 unparseable
+        "nope",                        # attempt 3: only p02 is re-sent, and fails again
+    ])
+    monkeypatch.setattr(script_gen, "submit_bedrock", bedrock)
+    results = generate_scripts_batch(PRODUCTS[:2], "bucket", "run", batch_size=1, retries=2)
+    assert bedrock.prompts == [["p01"], ["p02"], ["p01"], ["p02"], ["p02"]]
+    assert results["p01"] == {"narration_script_s3_uri": "s3://bucket/run/p01/narration_script.txt"}
+    assert results["p02"]["error"].startswith("Narration failed validation: no JSON object")
+    assert ("bucket", "run/p02/narration_script.txt") not in fakes.objects
+
+
+def _recording_generate(calls):
+    def generate(products, s3_bucket, s3_prefix, batch_size):
+        calls.append([p["id"] for p in products])
+        return {p["id"]: {"narration_script_s3_uri": f"s3://{s3_bucket}/{s3_prefix}/{p['id']}"} for p in products}
+    return generate
+
+
+def test_batcher_flushes_when_batch_is_full():
+    calls = []
+    batcher = ScriptBatcher("b", "x", batch_size=2, linger=10, generate=_recording_generate(calls))
+    first, second = batcher.submit(PRODUCTS[0]), batcher.submit(PRODUCTS[1])
+    assert first.result(timeout=1)["narration_script_s3_uri"] == "s3://b/x/p01"
+    assert second.done() and calls == [["p01", "p02"]] and batcher.calls == 1
+
+
+def test_batcher_flushes_partial_batch_after_linger():
+    calls = []
+    batcher = ScriptBatcher("b", "x", batch_size=8, linger=0.1, generate=_recording_generate(calls))
+    started = time.perf_counter()
+    futures = [batcher.submit(p) for p in PRODUCTS[:3]]
+    assert not futures[0].done()
+    assert [f.result(timeout=2)["narration_script_s3_uri"] for f in futures] == ["s3://b/x/p01", "s3://b/x/p02",
+                                                                                  "s3://b/x/p03"]
+    assert 0.05 <= time.perf_counter() - started < 1.5
+    assert calls == [["p01", "p02", "p03"]]
+
+
+def test_batcher_turns_failures_into_per_product_errors():
+    def generate(products, s3_bucket, s3_prefix, batch_size):
+        if len(products) > 1:
+            raise RuntimeError("bedrock down")
+        return {}
+
+    batcher = ScriptBatcher("b", "x", batch_size=2, linger=0.05, generate=generate)
+    failed = [batcher.submit(p) for p in PRODUCTS[:2]]
+    assert [f.result(timeout=1) for f in failed] == [{"error": "bedrock down"}] * 2
+    missing = batcher.submit(PRODUCTS[2])
+    assert missing.result(timeout=2) == {"error": "No narration returned"}
+
+
+def test_batcher_counts_calls_from_many_threads():
+    calls = []
+    batcher = ScriptBatcher("b", "x", batch_size=4, linger=0.05, generate=_recording_generate(calls))
+    products = [{"id": f"q{i}"} for i in range(64)]
+    futures = []
+    lock = threading.Lock()
+
+    def submit(p):
+        f = batcher.submit(p)
+        with lock:
+            futures.append(f)
+
+    threads = [threading.Thread(target=submit, args=(p,)) for p in products]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all("narration_script_s3_uri" in f.result(timeout=2) for f in futures)
+    assert batcher.calls == len(calls) and sorted(sum(calls, [])) == sorted(p["id"] for p in products)
@@ -0,0 +1,66 @@
+"""
+Slide renderer checks: render_decks draws each distinct slide once (across a
+process pool), returns frames in deck order, reuses frames on the next run,
+and writes only to the output directory, never to the working directory.
+
+Run:  python -m pytest -q test_slide_renderer.py
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+import tools.slide_renderer as slide_renderer
+from tools.slide_renderer import render_deck, render_decks, slide_hash
+
+SIZE = (320, 180)
+
+
+def _deck(name: str, n: int) -> list:
+    return [{"title": f"{name} {i}", "content": [f"Point {i}.1", f"Point {i}.2"]} for i in range(n)]
+
+
+def test_default_output_dir_is_the_ignored_cache():
+    if "SLIDE_OUTPUT_DIR" not in os.environ:
+        relative = os.path.relpath(slide_renderer.OUTPUT_DIR, slide_renderer.PROJECT_ROOT)
+        assert relative.split(os.sep) == [".cache", "slides"]
+
+
+def test_render_decks_uses_the_pool_and_dedupes(tmp_path, monkeypatch):
+    cwd = tmp_path / "cwd"
+    cwd.mkdir()
+    monkeypatch.chdir(cwd)
+    out = tmp_path / "frames"
+    shared = {"title": "Disclaimer", "content": "Terms apply."}
+    decks = [_deck("Home", 6) + [shared], _deck("Travel", 5) + [shared], [shared]]
+    pools = []
+
+    class RecordingPool(ProcessPoolExecutor):
+        def __init__(self, max_workers):
+            pools.append(max_workers)
+            super().__init__(max_workers=max_workers)
+
+    monkeypatch.setattr(slide_renderer, "ProcessPoolExecutor", RecordingPool)
+    paths = render_decks(decks, out_dir=str(out), size=SIZE, max_workers=2)
+    assert pools == [2]  # 12 distinct slides >= MIN_SLIDES_FOR_POOL
+    assert [len(deck) for deck in paths] == [7, 6, 1]
+    assert paths[0][-1] == paths[1][-1] == paths[2][0]  # identical slides share one frame
+    assert len(os.listdir(out)) == 12 and not os.listdir(cwd)
+    for deck, deck_paths in zip(decks, paths):
+        for slide, path in zip(deck, deck_paths):
+            assert os.path.basename(path) == f"slide_{slide_hash(slide, size=SIZE)[:24]}.png"
+    with Image.open(paths[0][0]) as frame:
+        assert frame.size == SIZE and frame.format == "PNG"
+
+    before = {name: os.path.getmtime(out / name) for name in os.listdir(out)}
+    assert render_decks(decks, out_dir=str(out), size=SIZE, max_workers=2) == paths  # reused, not redrawn
+    assert {name: os.path.getmtime(out / name) for name in os.listdir(out)} == before
+
+
+def test_render_deck_in_process(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    out = tmp_path / "frames"
+    deck = _deck("Pet", 3) + [{"title": "Long", "content": "word " * 400}]  # overflowing text is cut
+    paths = render_deck(deck, out_dir=str(out), size=SIZE)
+    assert len(paths) == 4 and sorted(os.listdir(out)) == sorted(os.path.basename(p) for p in paths)
+    assert sorted(os.listdir(tmp_path)) == ["frames"]
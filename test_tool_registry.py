@@ -0,0 +1,46 @@
+"""
+Tool registry checks: workflow tools are listed from the cached manifest and
+their modules are imported only on first use. Each check runs in a fresh
+interpreter so modules imported by other tests do not hide an eager import.
+
+Run:  python -m pytest -q test_tool_registry.py
+"""
+import json
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+TOOL_MODULES = ("tools.catalog", "tools.script_gen", "tools.tts", "tools.slides", "tools.nova_vedio")
+
+
+def _run(code: str) -> dict:
+    script = f"import json, sys\n{code}\nprint(json.dumps(out))"
+    proc = subprocess.run([sys.executable, "-c", script], cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=120)
+    assert proc.returncode == 0, proc.stderr
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def test_specs_and_pipeline_do_not_import_tools():
+    out = _run(f"""
+from tools.tool_registry import WORKFLOW_TOOLS, list_tool_specs
+from agents.pipeline import build_media_pipeline
+specs = list_tool_specs()
+build_media_pipeline()
+out = {{"names": [s["name"] for s in specs], "imported": [m for m in {TOOL_MODULES!r} if m in sys.modules]}}
+""")
+    assert out["names"] == ["recommend_product", "generate_script", "synthesize_speech", "create_slides",
+                            "generate_nova_video"]
+    assert out["imported"] == []
+
+
+def test_tool_module_is_imported_on_first_use():
+    out = _run("""
+from tools.dynamic_tool_registry import get_tool
+proxy = get_tool("synthesize_speech")
+before = "tools.tts" in sys.modules
+tool = proxy.load()
+out = {"before": before, "after": "tools.tts" in sys.modules, "same": proxy.load() is tool,
+       "others": "tools.nova_vedio" in sys.modules}
+""")
+    assert out == {"before": False, "after": True, "same": True, "others": False}
@@ -0,0 +1,153 @@
+"""
+Chunked speech synthesis checks: sentence packing in split_text (over-long
+sentences, unbroken runs, empty text), in-order concurrent synthesis, and the
+put_object / multipart paths of upload_stream including abort on failure.
+Polly, S3 and the caches are replaced by in-memory fakes.
+
+Run:  python -m pytest -q test_tts.py
+"""
+import io
+import threading
+import time
+
+import pytest
+
+import tools.tts as tts
+from tools.audio_cache import AudioCache
+from tools.tts import split_text, synthesize_chunks, upload_stream
+
+
+def test_split_text_packs_whole_sentences():
+    text = "First sentence here.  Second one!\n\nThird?  Fourth and last."
+    assert split_text(text, max_chars=35) == ["First sentence here. Second one!", "Third? Fourth and last."]
+    assert split_text(text, max_chars=39) == ["First sentence here. Second one! Third?", "Fourth and last."]
+    assert split_text(text, max_chars=1000) == ["First sentence here. Second one! Third? Fourth and last."]
+
+
+def test_split_text_breaks_long_sentences_on_words():
+    sentence = " ".join(f"word{i}" for i in range(30)) + "."
+    chunks = split_text(f"Intro. {sentence} Outro.", max_chars=50)
+    assert all(len(c) <= 50 for c in chunks)
+    assert " ".join(chunks) == f"Intro. {sentence} Outro."
+    assert all(not c.startswith(" ") and not c.endswith(" ") for c in chunks)
+
+
+def test_split_text_hard_cuts_only_unbroken_runs():
+    run = "x" * 25
+    assert split_text(f"Go {run} now.", max_chars=10) == ["Go", "x" * 10, "x" * 10, "xxxxx now."]
+
+
+def test_split_text_of_empty_text_is_empty():
+    assert split_text("") == [] and split_text(" \n\t ") == []
+
+
+class FakePolly:
+    def __init__(self, fail_on: str = None, delay: float = 0.0):
+        self.fail_on, self.delay = fail_on, delay
+        self.texts = []
+        self._lock = threading.Lock()
+
+    def synthesize_speech(self, Text, OutputFormat, VoiceId, Engine):
+        with self._lock:
+            self.texts.append(Text)
+        if self.fail_on and self.fail_on in Text:
+            raise RuntimeError("polly failed")
+        time.sleep(self.delay * (len(Text) % 3))  # finish out of order
+        return {"AudioStream": io.BytesIO(f"<{Text}>".encode("utf-8"))}
+
+
+class FakeS3:
+    def __init__(self, fail_part: int = None):
+        self.objects, self.parts, self.calls = {}, {}, []
+        self.fail_part = fail_part
+
+    def get_object(self, Bucket, Key):
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)])}
+
+    def put_object(self, Bucket, Key, Body, ContentType=None):
+        self.calls.append("put_object")
+        self.objects[(Bucket, Key)] = bytes(Body)
+
+    def create_multipart_upload(self, Bucket, Key, ContentType=None):
+        self.calls.append("create_multipart_upload")
+        return {"UploadId": "up-1"}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.calls.append(f"upload_part {PartNumber}")
+        if PartNumber == self.fail_part:
+            raise RuntimeError("part upload failed")
+        self.parts[PartNumber] = Body
+        return {"ETag": f"etag-{PartNumber}"}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.calls.append("complete_multipart_upload")
+        numbers = [p["PartNumber"] for p in MultipartUpload["Parts"]]
+        self.objects[(Bucket, Key)] = b"".join(self.parts[n] for n in numbers)
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.calls.append("abort_multipart_upload")
+
+
+@pytest.fixture
+def fresh_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(tts, "audio_cache", AudioCache(str(tmp_path / "audio"), max_bytes=1 << 20, mirror_bucket=None))
+
+
+def test_chunks_are_yielded_in_order(fresh_cache):
+    chunks = [f"Chunk {i}." for i in range(12)]
+    polly = FakePolly(delay=0.01)
+    assert list(synthesize_chunks(polly, chunks, max_workers=3)) == [f"<{c}>".encode() for c in chunks]
+    assert sorted(polly.texts) == sorted(chunks)
+
+
+def test_small_streams_use_one_put_object(monkeypatch):
+    s3 = FakeS3()
+    upload_stream(s3, "b", "k.mp3", [b"ab", b"cd"])
+    assert s3.calls == ["put_object"] and s3.objects[("b", "k.mp3")] == b"abcd"
+
+
+def test_large_streams_use_multipart_parts_in_order(monkeypatch):
+    monkeypatch.setattr(tts, "MIN_PART_BYTES", 4)
+    s3 = FakeS3()
+    upload_stream(s3, "b", "k.mp3", [b"abc", b"def", b"gh", b"i"])
+    # parts are flushed once the buffer reaches MIN_PART_BYTES: "abcdef", then the "ghi" tail
+    assert s3.calls == ["create_multipart_upload", "upload_part 1", "upload_part 2", "complete_multipart_upload"]
+    assert s3.parts == {1: b"abcdef", 2: b"ghi"}
+    assert s3.objects[("b", "k.mp3")] == b"abcdefghi"
+
+
+def test_multipart_is_aborted_when_a_part_fails(monkeypatch):
+    monkeypatch.setattr(tts, "MIN_PART_BYTES", 4)
+    s3 = FakeS3(fail_part=2)
+    with pytest.raises(RuntimeError, match="part upload failed"):
+        upload_stream(s3, "b", "k.mp3", [b"abcd", b"efgh", b"ij"])
+    assert s3.calls[-1] == "abort_multipart_upload" and "complete_multipart_upload" not in s3.calls
+
+
+def test_multipart_is_aborted_when_synthesis_fails(monkeypatch, fresh_cache):
+    monkeypatch.setattr(tts, "MIN_PART_BYTES", 4)
+    s3 = FakeS3()
+    parts = synthesize_chunks(FakePolly(fail_on="Chunk 5."), [f"Chunk {i}." for i in range(8)], max_workers=2)
+    with pytest.raises(RuntimeError, match="polly failed"):
+        upload_stream(s3, "b", "k.mp3", parts)
+    assert s3.calls[0] == "create_multipart_upload" and s3.calls[-1] == "abort_multipart_upload"
+    assert ("b", "k.mp3") not in s3.objects
+
+
+def test_synthesize_speech_streams_long_scripts(monkeypatch, fresh_cache):
+    s3, polly = FakeS3(), FakePolly()
+    script = " ".join(f"Sentence number {i} of the narration." for i in range(200))  # ~7 KB, 3 chunks
+    s3.objects[("src", "run/p01/narration_script.txt")] = script.encode("utf-8")
+    monkeypatch.setattr(tts, "get_client", lambda service, region: polly if service == "polly" else s3)
+    monkeypatch.setattr(tts.artifact_store, "fetch", lambda *a, **k: None)
+    monkeypatch.setattr(tts.artifact_store, "save", lambda *a, **k: None)
+
+    result = tts.synthesize_speech(script_s3_uri="s3://src/run/p01/narration_script.txt", s3_bucket="out",
+                                   s3_prefix="run/p01")
+    assert result == {"narration_audio_s3_uri": "s3://out/run/p01/narration_audio.mp3", "chunks": 3}
+    expected = b"".join(f"<{c}>".encode() for c in split_text(script))
+    assert s3.objects[("out", "run/p01/narration_audio.mp3")] == expected
+
+    s3.objects[("src", "empty.txt")] = b"  \n "
+    assert tts.synthesize_speech(script_s3_uri="s3://src/empty.txt", s3_bucket="out", s3_prefix="x") == {
+        "error": "Script is empty"}
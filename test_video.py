@@ -0,0 +1,142 @@
+"""
+Video encode checks with a fake ffmpeg process: frames (paths, PNG bytes and
+PIL images) are streamed into stdin, -progress blocks on stderr reach the
+callback, a non-zero exit becomes CalledProcessError with ffmpeg's message,
+and concurrent encodes never exceed MAX_CONCURRENT_ENCODES.
+
+Run:  python -m pytest -q test_video.py
+"""
+import io
+import subprocess
+import threading
+import time
+
+import pytest
+from PIL import Image
+
+import tools.video as video
+from tools.video import encode_video, render_videos
+
+PROGRESS = (b"frame=1\nfps=0.0\nout_time_ms=5000000\nspeed=2.5x\nprogress=continue\n"
+            b"[libx264 @ 0x55d0] using cpu capabilities: AVX2\n"
+            b"frame=2\nout_time_ms=10000000\nspeed=2.6x\nprogress=end\n")
+
+
+class FakeStdin:
+    def __init__(self, accept_frames: int = None):
+        self.frames, self.closed = [], False
+        self.accept_frames = accept_frames
+
+    def write(self, data):
+        if self.accept_frames is not None and len(self.frames) >= self.accept_frames:
+            raise BrokenPipeError(32, "Broken pipe")
+        self.frames.append(data)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeFfmpeg:
+    """Stands in for subprocess.Popen: records the command and frames, replays stderr, exits with returncode."""
+
+    def __init__(self, stderr: bytes = PROGRESS, returncode: int = 0, accept_frames: int = None, hold: float = 0.0):
+        self.stderr_bytes, self.returncode, self.accept_frames, self.hold = stderr, returncode, accept_frames, hold
+        self.runs = []
+        self.running = self.max_running = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, cmd, stdin=None, stderr=None, stdout=None):
+        assert (stdin, stderr, stdout) == (subprocess.PIPE, subprocess.PIPE, subprocess.DEVNULL)
+        fake = self
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+
+        class Process:
+            def __init__(self):
+                self.cmd = cmd
+                self.stdin = FakeStdin(fake.accept_frames)
+                self.stderr = io.BytesIO(fake.stderr_bytes)
+                self.killed = False
+                fake.runs.append(self)
+
+            def wait(self):
+                time.sleep(fake.hold)
+                with fake._lock:
+                    fake.running -= 1
+                return fake.returncode
+
+            def kill(self):
+                self.killed = True
+
+        return Process()
+
+
+@pytest.fixture
+def ffmpeg(monkeypatch):
+    def install(**kwargs):
+        fake = FakeFfmpeg(**kwargs)
+        monkeypatch.setattr(video.subprocess, "Popen", fake)
+        return fake
+    return install
+
+
+def test_frames_are_streamed_and_progress_parsed(ffmpeg, tmp_path):
+    fake = ffmpeg()
+    png_path = tmp_path / "slide.png"
+    Image.new("RGB", (8, 8), "red").save(png_path)
+    frames = [str(png_path), b"\x89PNG raw bytes", Image.new("RGB", (8, 8), "blue")]
+    progress = []
+    out = encode_video(frames, str(tmp_path / "audio.mp3"), str(tmp_path / "out" / "video.mp4"), duration=4,
+                       preset="ultrafast", on_progress=progress.append)
+
+    assert out == str(tmp_path / "out" / "video.mp4") and (tmp_path / "out").is_dir()
+    run = fake.runs[0]
+    assert run.stdin.closed and len(run.stdin.frames) == 3
+    assert run.stdin.frames[0] == png_path.read_bytes() and run.stdin.frames[1] == b"\x89PNG raw bytes"
+    assert run.stdin.frames[2].startswith(b"\x89PNG")  # PIL frame encoded as PNG
+    cmd = run.cmd
+    assert cmd[cmd.index("-f") + 1] == "image2pipe" and cmd[cmd.index("-framerate") + 1] == "1/4"
+    assert cmd[cmd.index("-preset") + 1] == "ultrafast" and cmd[-1] == str(tmp_path / "out" / "video.mp4")
+    assert [(p["frame"], p["progress"]) for p in progress] == [("1", "continue"), ("2", "end")]
+    assert progress[1]["out_time_ms"] == "10000000"
+
+
+def test_failing_progress_callback_does_not_break_the_encode(ffmpeg, tmp_path):
+    ffmpeg()
+
+    def explode(block):
+        raise RuntimeError("ui gone")
+
+    assert encode_video([b"frame"], "a.mp3", str(tmp_path / "v.mp4"), on_progress=explode) == str(tmp_path / "v.mp4")
+
+
+def test_nonzero_exit_raises_with_ffmpeg_message(ffmpeg, tmp_path):
+    fake = ffmpeg(stderr=b"progress=end\n[png @ 0x1] Invalid PNG signature\npipe:0: Invalid data found\n",
+                  returncode=1, accept_frames=1)  # ffmpeg quits after the first frame
+    with pytest.raises(subprocess.CalledProcessError) as info:
+        encode_video([b"bad", b"never written"], "a.mp3", str(tmp_path / "v.mp4"))
+    assert info.value.returncode == 1
+    assert info.value.stderr == "[png @ 0x1] Invalid PNG signature\npipe:0: Invalid data found"
+    assert fake.runs[0].stdin.frames == [b"bad"] and not fake.runs[0].killed  # broken pipe is not an error itself
+
+    results = render_videos([{"images": [b"bad"], "audio": "a.mp3", "out_path": str(tmp_path / "w.mp4")}])
+    assert results == [{"out_path": None, "error": "[png @ 0x1] Invalid PNG signature\npipe:0: Invalid data found"}]
+
+
+def test_unknown_preset_is_rejected_before_ffmpeg_starts(ffmpeg, tmp_path):
+    fake = ffmpeg()
+    with pytest.raises(ValueError, match="Unknown x264 preset"):
+        encode_video([b"frame"], "a.mp3", str(tmp_path / "v.mp4"), preset="warp")
+    assert fake.runs == []
+
+
+def test_concurrent_encodes_are_bounded(ffmpeg, monkeypatch, tmp_path):
+    monkeypatch.setattr(video, "MAX_CONCURRENT_ENCODES", 2)
+    monkeypatch.setattr(video, "_encode_slots", threading.BoundedSemaphore(2))
+    fake = ffmpeg(hold=0.05)
+    jobs = [{"images": [b"frame"], "audio": "a.mp3", "out_path": str(tmp_path / f"v{i}.mp4")} for i in range(6)]
+    results = render_videos(jobs, max_concurrent=6)
+    assert [r["out_path"] for r in results] == [job["out_path"] for job in jobs]
+    assert len(fake.runs) == 6 and fake.max_running == 2
+    assert all("-threads" in run.cmd for run in fake.runs)  # cores shared between concurrent encodes
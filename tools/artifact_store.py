@@ -0,0 +1,152 @@
+# tools/artifact_store.py
+"""
+Content-addressed S3 cache for generated artifacts (narration, MP3, slides).
+Objects live at s3://{bucket}/{ARTIFACT_PREFIX}/{kind}/{digest}/{filename}.
+The digest hashes everything that shapes the output (product content, prompt
+template version, voice, tool version), so a new run for the same inputs
+copies the cached object into its run prefix (or references it directly)
+instead of calling Bedrock or Polly again.
+
+Invalidate by bumping the relevant version constant, or explicitly:
+    python -m tools.artifact_store invalidate <bucket> [kind]
+"""
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+
+from botocore.exceptions import ClientError
+
+from aws_clients import get_client
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+ARTIFACT_PREFIX = os.environ.get("ARTIFACT_CACHE_PREFIX", "cache/artifacts")
+ARTIFACT_MODE = os.environ.get("ARTIFACT_CACHE_MODE", "copy")  # copy | reference
+ARTIFACT_CACHE_ENABLED = os.environ.get("ARTIFACT_CACHE", "1") != "0"
+S3_REGION = "eu-west-1"
+
+
+def artifact_digest(kind: str, **parts) -> str:
+    """sha256 over the artifact kind and every input that determines its content."""
+    raw = json.dumps([kind, parts], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ArtifactStore:
+    """Looks up, publishes and records cached artifacts. Cache failures never fail the caller."""
+
+    def __init__(self, prefix: str = ARTIFACT_PREFIX, mode: str = ARTIFACT_MODE,
+                 enabled: bool = ARTIFACT_CACHE_ENABLED, region: str = S3_REGION, client=None):
+        if mode not in ("copy", "reference"):
+            raise ValueError(f"Unknown artifact cache mode: {mode}")
+        self.prefix = prefix.strip("/")
+        self.mode = mode
+        self.enabled = enabled
+        self.region = region
+        self._client = client
+        self._known = set()  # (bucket, key) confirmed to exist; skips a HEAD on repeat hits
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "stores": 0, "invalidated": 0, "errors": 0}
+
+    @property
+    def s3(self):
+        return self._client or get_client("s3", self.region)
+
+    def cache_key(self, kind: str, digest: str, filename: str) -> str:
+        return f"{self.prefix}/{kind}/{digest}/{filename}"
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] += n
+
+    def _exists(self, bucket: str, key: str) -> bool:
+        if (bucket, key) in self._known:
+            return True
+        try:
+            self.s3.head_object(Bucket=bucket, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in ("404", "NoSuchKey", "NotFound"):
+                raise
+            return False
+        with self._lock:
+            self._known.add((bucket, key))
+        return True
+
+    def fetch(self, bucket: str, kind: str, digest: str, filename: str, dest_key: str):
+        """
+        On a hit, return the S3 URI to use for this run: dest_key after a
+        server-side copy ("copy" mode) or the cache object itself ("reference").
+        Returns None on a miss, when disabled, or if the cache is unreachable.
+        """
+        if not self.enabled:
+            return None
+        key = self.cache_key(kind, digest, filename)
+        try:
+            if not self._exists(bucket, key):
+                self._count("misses")
+                return None
+            if self.mode == "reference":
+                uri = f"s3://{bucket}/{key}"
+            else:
+                self.s3.copy_object(Bucket=bucket, Key=dest_key, CopySource={"Bucket": bucket, "Key": key})
+                uri = f"s3://{bucket}/{dest_key}"
+        except Exception as e:
+            logger.warning(f"⚠️ Artifact cache lookup failed for {kind}: {e}")
+            self._count("errors")
+            return None
+        self._count("hits")
+        logger.info(f"♻️ Reusing cached {kind} artifact {digest[:12]}")
+        return uri
+
+    def save(self, bucket: str, kind: str, digest: str, filename: str, source_key: str):
+        """Record a freshly generated object (already uploaded at source_key) in the cache."""
+        if not self.enabled:
+            return
+        key = self.cache_key(kind, digest, filename)
+        try:
+            self.s3.copy_object(Bucket=bucket, Key=key, CopySource={"Bucket": bucket, "Key": source_key})
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to cache {kind} artifact: {e}")
+            self._count("errors")
+            return
+        with self._lock:
+            self._known.add((bucket, key))
+            self.counters["stores"] += 1
+
+    def invalidate(self, bucket: str, kind: str = None) -> int:
+        """Delete cached artifacts of one kind (or all kinds); returns the number removed."""
+        prefix = f"{self.prefix}/{kind}/" if kind else f"{self.prefix}/"
+        removed = 0
+        paginator = self.s3.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            keys = [{"Key": obj["Key"]} for obj in page.get("Contents", [])]
+            if keys:
+                self.s3.delete_objects(Bucket=bucket, Delete={"Objects": keys, "Quiet": True})
+                removed += len(keys)
+        with self._lock:
+            self._known = {(b, k) for b, k in self._known if not (b == bucket and k.startswith(prefix))}
+            self.counters["invalidated"] += removed
+        logger.info(f"🧹 Invalidated {removed} cached artifacts under s3://{bucket}/{prefix}")
+        return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.counters)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+
+# Process-wide store shared by generate_script, synthesize_speech and create_slides
+artifact_store = ArtifactStore()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != "invalidate":
+        print("usage: python -m tools.artifact_store invalidate <bucket> [narration|audio|slides]")
+        sys.exit(1)
+    artifact_store.invalidate(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
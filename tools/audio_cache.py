@@ -0,0 +1,164 @@
+# tools/audio_cache.py
+"""
+Local disk cache of synthesized speech, keyed by normalized text, voice,
+engine and output format. Used per Polly chunk, so boilerplate that recurs
+across narrations (disclaimers, intros) is voiced once. Least-recently-used
+files are evicted once the directory exceeds its byte budget. Optionally
+mirrored to S3 so other machines can fill their local cache from it.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from aws_clients import get_client
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.environ.get("TTS_AUDIO_CACHE_DIR", os.path.join(PROJECT_ROOT, ".cache", "audio"))
+MAX_BYTES = int(os.environ.get("TTS_AUDIO_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+MIRROR_BUCKET = os.environ.get("TTS_AUDIO_CACHE_BUCKET")  # unset = local only
+MIRROR_PREFIX = os.environ.get("TTS_AUDIO_CACHE_PREFIX", "cache/audio")
+S3_REGION = "eu-west-1"
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+def audio_key(text: str, voice: str, engine: str, output_format: str) -> str:
+    raw = json.dumps([normalize_text(text), voice, engine, output_format], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """Byte-budgeted LRU of audio files on disk. Safe to share between threads."""
+
+    def __init__(self, directory: str = CACHE_DIR, max_bytes: int = MAX_BYTES,
+                 mirror_bucket: str = MIRROR_BUCKET, mirror_prefix: str = MIRROR_PREFIX, s3_client=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.mirror_bucket = mirror_bucket
+        self.mirror_prefix = mirror_prefix.strip("/")
+        self._s3 = s3_client
+        self._lock = threading.Lock()
+        self._entries = None  # filename -> size, least recently used first
+        self._bytes = 0
+        self.counters = {"hits": 0, "mirror_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "errors": 0}
+
+    def _load(self):
+        """Index existing files oldest-first by mtime (hits bump mtime)."""
+        if self._entries is not None:
+            return
+        files = []
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for name in os.listdir(self.directory):
+                if name.endswith(".tmp"):
+                    continue
+                st = os.stat(os.path.join(self.directory, name))
+                files.append((st.st_mtime, name, st.st_size))
+        except OSError as e:
+            logger.warning(f"⚠️ Audio cache directory unavailable: {e}")
+        self._entries = OrderedDict((name, size) for _, name, size in sorted(files))
+        self._bytes = sum(self._entries.values())
+
+    def _filename(self, key: str, output_format: str) -> str:
+        return f"{key}.{output_format}"
+
+    def _mirror_key(self, filename: str) -> str:
+        return f"{self.mirror_prefix}/{filename}"
+
+    @property
+    def s3(self):
+        return self._s3 or get_client("s3", S3_REGION)
+
+    def get(self, key: str, output_format: str = "mp3"):
+        """Cached audio bytes, or None on a miss."""
+        filename = self._filename(key, output_format)
+        path = os.path.join(self.directory, filename)
+        with self._lock:
+            self._load()
+            if filename in self._entries:
+                try:
+                    with open(path, "rb") as f:
+                        data = f.read()
+                    os.utime(path)
+                    self._entries.move_to_end(filename)
+                    self.counters["hits"] += 1
+                    return data
+                except OSError:
+                    self._bytes -= self._entries.pop(filename)
+
+        if self.mirror_bucket:
+            try:
+                obj = self.s3.get_object(Bucket=self.mirror_bucket, Key=self._mirror_key(filename))
+                data = obj["Body"].read()
+                self._store_local(filename, data)
+                with self._lock:
+                    self.counters["mirror_hits"] += 1
+                return data
+            except Exception as e:
+                if getattr(e, "response", {}).get("Error", {}).get("Code") not in ("NoSuchKey", "404"):
+                    logger.warning(f"⚠️ Audio cache mirror read failed: {e}")
+                    with self._lock:
+                        self.counters["errors"] += 1
+        with self._lock:
+            self.counters["misses"] += 1
+        return None
+
+    def _store_local(self, filename: str, data: bytes):
+        path = os.path.join(self.directory, filename)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with self._lock:
+            self._load()
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+            self._bytes += len(data) - self._entries.pop(filename, 0)
+            self._entries[filename] = len(data)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                old, size = self._entries.popitem(last=False)
+                try:
+                    os.remove(os.path.join(self.directory, old))
+                except OSError:
+                    pass
+                self._bytes -= size
+                self.counters["evictions"] += 1
+
+    def put(self, key: str, data: bytes, output_format: str = "mp3"):
+        """Store audio locally (and in the mirror when configured). Failures are logged, not raised."""
+        filename = self._filename(key, output_format)
+        try:
+            self._store_local(filename, data)
+            with self._lock:
+                self.counters["stores"] += 1
+        except OSError as e:
+            logger.warning(f"⚠️ Failed to cache audio locally: {e}")
+            with self._lock:
+                self.counters["errors"] += 1
+        if self.mirror_bucket:
+            try:
+                self.s3.put_object(Bucket=self.mirror_bucket, Key=self._mirror_key(filename), Body=data)
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to mirror cached audio: {e}")
+                with self._lock:
+                    self.counters["errors"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.counters)
+            stats["bytes"] = self._bytes
+            stats["entries"] = len(self._entries or ())
+        lookups = stats["hits"] + stats["mirror_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["hits"] + stats["mirror_hits"]) / lookups, 3) if lookups else 0.0
+        return stats
+
+
+# Process-wide cache used by tools.tts
+audio_cache = AudioCache()
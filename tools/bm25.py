@@ -0,0 +1,186 @@
+# tools/bm25.py
+"""
+Vectorized BM25 ranking over product text with NumPy.
+Each product's name, short_description, benefits and keywords are indexed
+into a sparse term -> (doc ids, BM25 weights) matrix at build time, so a
+query is scored against the whole catalog with one bincount, and batches
+of queries are scored together in memory-bounded chunks. Raw term
+frequencies are kept, so updated() re-tokenizes only edited products.
+"""
+from collections.abc import Sequence
+
+import numpy as np
+
+from tools.product_index import tokenize
+
+FIELD_WEIGHTS = {"name": 2.0, "short_description": 1.0, "benefits": 1.0, "keywords": 2.0}
+STOPWORDS = {
+    "a", "about", "against", "an", "and", "any", "are", "be", "can", "do", "for", "from", "get", "give",
+    "i", "in", "is", "it", "me", "my", "of", "on", "or", "our", "please", "something", "that", "the",
+    "to", "want", "what", "which", "with", "you", "your", "need", "looking",
+}
+MAX_CELLS_PER_CHUNK = 2_000_000  # queries x products handled per vectorized step in rank_batch
+
+
+def _terms(text) -> list:
+    return [t for t in tokenize(text) if t not in STOPWORDS]
+
+
+def _field_text(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(v) for v in value)
+    return str(value or "")
+
+
+class BM25Index:
+    """BM25 (k1, b) over weighted product fields, stored as per-term postings arrays."""
+
+    def __init__(self, products, k1: float = 1.5, b: float = 0.75, field_weights: dict = None):
+        # Keep sequences as-is so compact catalogs materialize product dicts only on return
+        self.products = products if isinstance(products, Sequence) else list(products)
+        self.k1, self.b = k1, b
+        self.field_weights = field_weights or FIELD_WEIGHTS
+        vocab = {}
+        term_ids, docs, tfs, lengths = self._count_terms(self.products, range(len(self.products)), vocab)
+        self._finish(vocab, term_ids, docs, tfs, lengths)
+
+    def _count_terms(self, products, rows, vocab: dict):
+        """Weighted term frequencies of products[rows] as flat (term id, doc, tf) arrays, plus each row's length."""
+        term_ids, docs, tfs, lengths = [], [], [], []
+        for doc in rows:
+            product = products[doc]
+            tf = {}
+            for field, weight in self.field_weights.items():
+                for term in _terms(_field_text(product.get(field))):
+                    tid = vocab.setdefault(term, len(vocab))
+                    tf[tid] = tf.get(tid, 0.0) + weight
+            term_ids.extend(tf.keys())
+            docs.extend([doc] * len(tf))
+            tfs.extend(tf.values())
+            lengths.append(sum(tf.values()))
+        return (np.array(term_ids, dtype=np.int32), np.array(docs, dtype=np.int32),
+                np.array(tfs, dtype=np.float32), np.array(lengths, dtype=np.float32))
+
+    def _finish(self, vocab: dict, term_ids, docs, tfs, lengths):
+        """Turn raw term frequencies into BM25 weights; vectorized, no tokenizing."""
+        # Sort by term id (then doc) so each term's postings are one contiguous slice (CSR over terms)
+        order = np.lexsort((docs, term_ids))
+        self.vocab = vocab
+        self.lengths = lengths
+        self._term_ids, self.doc_ids, self._tfs = term_ids[order], docs[order], tfs[order]
+
+        n_docs = len(lengths)
+        avgdl = float(lengths.mean()) if n_docs else 1.0
+        df = np.bincount(self._term_ids, minlength=len(vocab)).astype(np.float32)
+        idf = np.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+        norm = self.k1 * (1.0 - self.b + self.b * lengths[self.doc_ids] / (avgdl or 1.0))
+        self.weights = (idf[self._term_ids] * self._tfs * (self.k1 + 1.0) / (self._tfs + norm)).astype(np.float32)
+        self.term_ptr = np.concatenate([[0], np.cumsum(df)]).astype(np.int64)
+
+    def updated(self, products, changed_rows):
+        """
+        Index for `products`, which must keep the same rows in the same order
+        as this index (in-place edits). Only `changed_rows` are re-tokenized;
+        IDF and length normalization depend on the whole corpus, so all weights
+        are recomputed, but that step is vectorized. This index is left intact
+        for readers still holding it.
+        """
+        if len(products) != len(self.products):
+            raise ValueError("updated() needs the same number of rows; rebuild instead")
+        changed = np.array(sorted(set(changed_rows)), dtype=np.int32)
+        new = BM25Index.__new__(BM25Index)
+        new.products = products if isinstance(products, Sequence) else list(products)
+        new.k1, new.b, new.field_weights = self.k1, self.b, self.field_weights
+        vocab = dict(self.vocab)  # terms no longer used keep their id with empty postings
+        term_ids, docs, tfs, lengths = new._count_terms(new.products, changed.tolist(), vocab)
+        keep = ~np.isin(self.doc_ids, changed)
+        all_lengths = self.lengths.copy()
+        all_lengths[changed] = lengths
+        new._finish(vocab, np.concatenate([self._term_ids[keep], term_ids]),
+                    np.concatenate([self.doc_ids[keep], docs]), np.concatenate([self._tfs[keep], tfs]), all_lengths)
+        return new
+
+    def __len__(self):
+        return len(self.products)
+
+    def _postings(self, query: str):
+        term_ids = {self.vocab[t] for t in _terms(query) if t in self.vocab}
+        if not term_ids:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        slices = [slice(self.term_ptr[t], self.term_ptr[t + 1]) for t in term_ids]
+        return np.concatenate([self.doc_ids[s] for s in slices]), np.concatenate([self.weights[s] for s in slices])
+
+    def score(self, query: str) -> np.ndarray:
+        """BM25 score of every product for one query (array of len(products))."""
+        docs, weights = self._postings(query)
+        return np.bincount(docs, weights=weights, minlength=len(self.products))
+
+    def score_batch(self, queries) -> np.ndarray:
+        """Scores for many queries at once: array of shape (len(queries), len(products))."""
+        n = len(self.products)
+        scores = np.zeros((len(queries), n))
+        for qi, (docs, weights) in enumerate(self._postings(q) for q in queries):
+            scores[qi] = np.bincount(docs, weights=weights, minlength=n)
+        return scores
+
+    def _score_rows(self, postings: list):
+        n = len(self.products)
+        for docs, weights in postings:
+            yield np.bincount(docs, weights=weights, minlength=n)
+
+    def _top_dense(self, scores, top_k: int) -> list:
+        """Top-k of every score row (a (queries, products) matrix or an iterable of rows)."""
+        k = min(top_k, len(self.products))
+        results = []
+        for row in scores:
+            if k == 0:
+                results.append([])
+                continue
+            # 1-D argpartition per row is faster than one axis=1 call on wide matrices
+            cand = np.argpartition(-row, k - 1)[:k]
+            cand = cand[np.lexsort((cand, -row[cand]))]
+            results.append([
+                {"product": self.products[i], "score": round(float(row[i]), 4)} for i in cand if row[i] > 0
+            ])
+        return results
+
+    def _top_sparse(self, postings: list, top_k: int) -> list:
+        """Top-k by merging postings with one sort; cost follows matched postings, not catalog size."""
+        n = len(self.products)
+        results = [[] for _ in postings]
+        if not any(len(d) for d, _ in postings):
+            return results
+        keys = np.concatenate([d.astype(np.int64) + qi * n for qi, (d, _) in enumerate(postings)])
+        keys, inverse = np.unique(keys, return_inverse=True)
+        sums = np.bincount(inverse, weights=np.concatenate([w for _, w in postings]))
+        qids, docs = keys // n, keys % n
+        order = np.lexsort((docs, -sums, qids))  # by query, then score desc, then catalog order
+        qids, docs, sums = qids[order], docs[order], sums[order]
+        keep = (np.arange(len(qids)) - np.searchsorted(qids, qids, side="left")) < top_k
+        for qi, doc, score in zip(qids[keep], docs[keep], sums[keep]):
+            results[qi].append({"product": self.products[doc], "score": round(float(score), 4)})
+        return results
+
+    def rank(self, query: str, top_k: int = 5) -> list:
+        """Ranked candidates [{"product", "score"}] for one query; empty when nothing matches."""
+        return self._top_dense(self.score(query)[np.newaxis, :], top_k)[0]
+
+    def rank_batch(self, queries, top_k: int = 5) -> list:
+        """
+        Ranked candidates for each query, vectorized per chunk of queries.
+        Chunks whose matched postings are sparse relative to the catalog are
+        merged with one sort; otherwise each query gets a dense bincount +
+        argpartition over the catalog.
+        """
+        queries = list(queries)
+        n = max(1, len(self.products))
+        chunk = max(1, MAX_CELLS_PER_CHUNK // n)
+        results = []
+        for start in range(0, len(queries), chunk):
+            postings = [self._postings(q) for q in queries[start:start + chunk]]
+            matched = sum(len(d) for d, _ in postings)
+            if matched * 16 < len(postings) * n:
+                results.extend(self._top_sparse(postings, top_k))
+            else:
+                results.extend(self._top_dense(self._score_rows(postings), top_k))
+        return results
@@ -1,32 +1,69 @@
 # tools/catalog.py
-import json
 import logging
+import os
 from strands import tool
+from tools.catalog_service import CatalogService
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
-try:
-    with open("product_catalog.json") as f:
-        CATALOG = json.load(f)
-except Exception as e:
-    logger.error(f"❌ Failed to load product_catalog.json: {e}")
-    CATALOG = []
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CATALOG_PATH = os.environ.get("PRODUCT_CATALOG_PATH", os.path.join(PROJECT_ROOT, "product_catalog.json"))
+
+# Minimum BM25 score for a free-text match to count as a recommendation
+MIN_RANK_SCORE = 0.5
+
+# Hot-reloaded catalog: compact storage (JSON, NDJSON or mmap'd .pcat) plus keyword
+# index and BM25 ranker, swapped atomically when the file changes. Readers lease
+# the snapshot (CATALOG_SERVICE.lease()) so a reload never closes it under them
+CATALOG_SERVICE = CatalogService(CATALOG_PATH).start()
+
+
+def search_products(user_text: str, top_k: int = 5) -> list:
+    """
+    Rank all catalog products against the text with BM25 over name,
+    description, benefits and keywords.
+    Returns up to top_k [{"product": ..., "score": ...}], best first; empty means no match.
+    """
+    with CATALOG_SERVICE.lease() as snap:
+        return snap.ranker.rank(user_text, top_k=top_k)
+
+
+def rank_requests(texts, top_k: int = 5) -> list:
+    """Batch variant of search_products for bulk jobs: one ranked list per text."""
+    with CATALOG_SERVICE.lease() as snap:
+        return snap.ranker.rank_batch(texts, top_k=top_k)
+
+
+def match_product(user_text: str):
+    """
+    Return the best keyword-matching catalog product, or None.
+    Used to decide whether a query is unambiguous enough for the fixed pipeline.
+    """
+    with CATALOG_SERVICE.lease() as snap:
+        return snap.index.best(user_text)
+
 
 @tool
 def recommend_product(user_text: str) -> dict:
     """
-    Recommend a product from catalog based on simple keyword matching.
+    Recommend the best product from the catalog: keyword match first,
+    then BM25 ranking over product descriptions for natural phrasing.
+    Returns {"error": ..., "no_match": True} when no product matches.
     """
-    if not CATALOG:
-        return {"error": "Product catalog not loaded."}
-
-    try:
-        q = (user_text or "").lower()
-        for p in CATALOG:
-            if any(k in q for k in p.get("keywords", [])):
-                return p
-        return CATALOG[0]
-    except Exception as e:
-        logger.error(f"❌ recommend_product failed: {e}")
-        return {"error": str(e)}
+    with CATALOG_SERVICE.lease() as snap:  # one consistent catalog version for this call
+        if not snap.catalog:
+            return {"error": snap.load_error or "Product catalog not loaded."}
+
+        try:
+            product = snap.index.best(user_text)
+            if product is None:
+                ranked = snap.ranker.rank(user_text, top_k=1)
+                if ranked and ranked[0]["score"] >= MIN_RANK_SCORE:
+                    product = ranked[0]["product"]
+            if product is None:
+                return {"error": "No product matches the request.", "no_match": True}
+            return product
+        except Exception as e:
+            logger.error(f"❌ recommend_product failed: {e}")
+            return {"error": str(e)}
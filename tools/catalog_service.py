@@ -0,0 +1,216 @@
+# tools/catalog_service.py
+"""
+Hot-reloading product catalog service.
+A background thread polls the catalog file's mtime; when it changes, a new
+snapshot (catalog + keyword index + BM25 ranker) is built off the request
+path and published with a single reference swap. The first snapshot is built
+by that thread (or by the first reader, if it gets there first), so creating
+the service at import costs nothing. Readers grab the current
+snapshot once per call, so they never see a half-built index and never wait
+for a rebuild. Readers lease the snapshot for the duration of their work; a
+replaced mmap-backed catalog is closed when its last lease is released, so a
+slow search or batch never reads from a closed file.
+"""
+import logging
+import os
+import threading
+from contextlib import contextmanager
+
+from tools.bm25 import BM25Index
+from tools.catalog_store import CatalogStore, load_catalog, product_hash
+from tools.product_index import ProductIndex
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+POLL_SECONDS = float(os.environ.get("CATALOG_POLL_SECONDS", "30"))
+
+
+def _close(catalog):
+    """Release a catalog's file resources (mmap and fd); in-memory catalogs have none."""
+    close = getattr(catalog, "close", None)
+    if close is not None:
+        try:
+            close()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not close retired catalog: {e}")
+
+
+def _content_hashes(catalog) -> tuple:
+    return tuple(product_hash(product) for product in catalog)
+
+
+class _CatalogLeases:
+    """Open leases on one catalog; shared by every snapshot that reuses that catalog."""
+
+    __slots__ = ("catalog", "count", "retired")
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.count = 0
+        self.retired = False
+
+
+class CatalogSnapshot:
+    """Immutable view of one catalog version and its indexes."""
+
+    __slots__ = ("catalog", "index", "ranker", "mtime", "version", "ids", "hashes", "load_error", "leases")
+
+    def __init__(self, catalog, index, ranker, mtime=None, version=0, ids=(), hashes=(), load_error=None,
+                 leases=None):
+        self.catalog = catalog
+        self.leases = leases or _CatalogLeases(catalog)
+        self.index = index
+        self.ranker = ranker
+        self.mtime = mtime
+        self.version = version
+        self.ids = tuple(ids)
+        self.hashes = tuple(hashes) if hashes is not None else None  # None: not computed yet
+        self.load_error = load_error
+
+    @classmethod
+    def empty(cls, load_error=None):
+        catalog = CatalogStore()
+        return cls(catalog, ProductIndex(catalog), BM25Index(catalog), load_error=load_error)
+
+
+class CatalogService:
+    """Owns the current CatalogSnapshot and replaces it when the source file changes."""
+
+    def __init__(self, path: str, poll_seconds: float = POLL_SECONDS):
+        self.path = path
+        self.poll_seconds = poll_seconds
+        self._snapshot = None
+        self._failed_mtime = None
+        self._reload_lock = threading.Lock()  # one rebuild at a time; readers never take it
+        self._lease_lock = threading.Lock()  # guards the snapshot swap and lease counts; held only briefly
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _current(self) -> CatalogSnapshot:
+        if self._snapshot is None:  # first use: build it, or wait for the watcher's initial build
+            self.reload()
+        return self._snapshot
+
+    def snapshot(self) -> CatalogSnapshot:
+        """
+        Current snapshot, without a lease: a reload may close its catalog at
+        any time. Use lease() for anything that reads the catalog.
+        """
+        return self._current()
+
+    @contextmanager
+    def lease(self):
+        """
+        Current snapshot, kept open until the block exits. Take it once per
+        request and use it throughout; a reload in the meantime does not close it.
+        """
+        self._current()
+        with self._lease_lock:
+            snapshot = self._snapshot
+            snapshot.leases.count += 1
+        try:
+            yield snapshot
+        finally:
+            leases = snapshot.leases
+            with self._lease_lock:
+                leases.count -= 1
+                last = leases.retired and leases.count == 0
+            if last:
+                _close(leases.catalog)
+
+    def _build(self, previous: CatalogSnapshot, mtime: float) -> CatalogSnapshot:
+        catalog = load_catalog(self.path)
+        try:
+            return self._index(catalog, previous, mtime)
+        except BaseException:
+            _close(catalog)
+            raise
+
+    def _index(self, catalog, previous: CatalogSnapshot, mtime: float) -> CatalogSnapshot:
+        ids = tuple(catalog.ids)  # a column in both stores (the .pcat header), no record decoded
+        # Content hashes are free from a .pcat header; other catalogs hash only when a reload needs a diff
+        hashes = getattr(catalog, "hashes", None)
+
+        version = (previous.version + 1) if previous else 1
+        same_rows = previous is not None and previous.ids == ids and not previous.load_error
+        if same_rows:
+            old_hashes = previous.hashes if previous.hashes is not None else _content_hashes(previous.catalog)
+            hashes = hashes if hashes is not None else _content_hashes(catalog)
+            changed = [row for row, h in enumerate(hashes) if h != old_hashes[row]]
+            if not changed:
+                logger.info("Catalog file touched but content unchanged")
+                _close(catalog)
+                return CatalogSnapshot(previous.catalog, previous.index, previous.ranker, mtime,
+                                       previous.version, previous.ids, old_hashes, leases=previous.leases)
+            index = previous.index.updated(catalog, changed, previous.catalog)
+            ranker = previous.ranker.updated(catalog, changed)
+            logger.info(f"🔄 Catalog v{version}: {len(changed)} changed products re-indexed incrementally")
+        else:
+            index = ProductIndex(catalog)
+            ranker = BM25Index(catalog)
+            logger.info(f"🔄 Catalog v{version}: rows added/removed/reordered, indexes rebuilt")
+        return CatalogSnapshot(catalog, index, ranker, mtime, version, ids, hashes)
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Rebuild and swap in a new snapshot if the file changed (or force=True).
+        On failure the previous snapshot stays live. Returns True if swapped.
+        """
+        with self._reload_lock:
+            previous = self._snapshot
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                if previous is None:
+                    error = f"Product catalog not found: {self.path}"
+                    logger.error(f"❌ {error}")
+                    self._snapshot = CatalogSnapshot.empty(error)
+                return False
+            if not force and (mtime == self._failed_mtime or (previous is not None and previous.mtime == mtime)):
+                return False
+            try:
+                snapshot = self._build(previous, mtime)
+            except Exception as e:  # any bad file (e.g. valid JSON that is not a list) keeps the old snapshot
+                error = f"Failed to load product catalog {self.path}: {e}"
+                logger.error(f"❌ {error}")
+                self._failed_mtime = mtime  # don't retry until the file changes again
+                if previous is None:
+                    self._snapshot = CatalogSnapshot.empty(error)
+                return False
+            self._failed_mtime = None
+            with self._lease_lock:
+                self._snapshot = snapshot  # atomic reference swap
+            if previous is not None and previous.leases is not snapshot.leases:
+                self._retire(previous.leases)
+            return True
+
+    def _retire(self, leases: _CatalogLeases):
+        """Close a replaced catalog now if nobody leases it, otherwise when its last lease is released."""
+        with self._lease_lock:
+            leases.retired = True
+            idle = leases.count == 0
+        if idle:
+            _close(leases.catalog)
+
+    def _watch(self):
+        while True:
+            try:
+                self.reload()  # the first pass builds the initial snapshot
+            except Exception as e:
+                logger.error(f"❌ Catalog reload failed: {e}")
+            if self._stop.wait(self.poll_seconds):
+                return
+
+    def start(self):
+        """Start the background poller (daemon thread), which also builds the first snapshot; idempotent."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name="catalog-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_seconds + 1)
@@ -0,0 +1,252 @@
+# tools/catalog_store.py
+"""
+Compact product catalog storage.
+CatalogStore keeps products column-wise (one list per field, keyword and
+benefit strings interned and stored as tuples) and builds a product dict
+only when one is accessed. MappedCatalog reads a prebuilt binary index
+through mmap and decodes a record only when it is accessed; ids, keywords
+and content hashes live in the file header, so indexes and reload diffs are
+built without decoding records.
+
+Supported sources: JSON array (.json), NDJSON (.ndjson / .jsonl, streamed
+line by line) and the binary index (.pcat) written by write_binary().
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Sequence
+from functools import cached_property
+
+BINARY_MAGIC = b"PCAT2\n"
+_COUNT = struct.Struct("<Q")
+
+CORE_FIELDS = ("id", "name", "short_description", "benefits", "keywords")
+_CORE = frozenset(CORE_FIELDS)
+
+
+def product_hash(product: dict) -> str:
+    """Content hash of one product, used to find changed rows on reload."""
+    return hashlib.sha1(json.dumps(product, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _intern_all(values) -> tuple:
+    if not values:
+        return ()
+    try:
+        return tuple(map(sys.intern, values))
+    except TypeError:  # non-string entries
+        return tuple(sys.intern(str(v)) for v in values)
+
+
+class CatalogStore(Sequence):
+    """Column-oriented, read-only product catalog; indexing returns a fresh product dict."""
+
+    __slots__ = ("ids", "names", "descriptions", "benefits", "keywords", "extras", "_by_id")
+
+    def __init__(self):
+        self.ids, self.names, self.descriptions = [], [], []
+        self.benefits, self.keywords = [], []
+        self.extras = {}  # row -> dict of non-core fields, only for rows that have them
+        self._by_id = {}
+
+    def append(self, product: dict):
+        row = len(self.ids)
+        pid = product.get("id")
+        self.ids.append(sys.intern(str(pid)) if pid is not None else None)
+        self.names.append(product.get("name"))
+        self.descriptions.append(product.get("short_description"))
+        self.benefits.append(_intern_all(product.get("benefits")))
+        self.keywords.append(_intern_all(product.get("keywords")))
+        if not product.keys() <= _CORE:
+            self.extras[row] = {k: v for k, v in product.items() if k not in _CORE}
+        if pid is not None:
+            self._by_id[self.ids[row]] = row
+
+    @classmethod
+    def from_products(cls, products):
+        store = cls()
+        for p in products:
+            store.append(p)
+        return store
+
+    @classmethod
+    def from_json(cls, path: str):
+        with open(path, encoding="utf-8") as f:
+            return cls.from_products(json.load(f))
+
+    @classmethod
+    def from_ndjson(cls, path: str):
+        """Stream one product per line; blank lines are skipped."""
+        store = cls()
+        with open(path, encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    store.append(json.loads(line))
+                except ValueError as e:
+                    raise ValueError(f"{path}:{line_no}: invalid product record: {e}") from e
+        return store
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(len(self)))]
+        if row < 0:
+            row += len(self)
+        product = {}
+        if self.ids[row] is not None:
+            product["id"] = self.ids[row]
+        product["name"] = self.names[row]
+        product["short_description"] = self.descriptions[row]
+        product["benefits"] = list(self.benefits[row])
+        product["keywords"] = list(self.keywords[row])
+        product.update(self.extras.get(row, {}))
+        return product
+
+    def get(self, product_id: str):
+        row = self._by_id.get(product_id)
+        return None if row is None else self[row]
+
+
+class MappedCatalog(Sequence):
+    """
+    Read-only view over a binary catalog index via mmap.
+    Layout: magic, uint64 count, uint64 header length, JSON header with the
+    per-row "ids", "keywords" and "hashes", (count + 1) uint64 offsets, then
+    one UTF-8 JSON record per product. Opening only checks the fixed header
+    and the offsets table bounds; the JSON header is parsed on first use of
+    ids/keywords/hashes and records are decoded only when accessed.
+    A truncated or corrupt file raises ValueError.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self._file.close()
+            raise ValueError(f"{path}: empty product catalog index")
+        try:
+            self._open()
+        except (ValueError, struct.error) as e:
+            self.close()
+            raise ValueError(f"{path}: corrupt product catalog index: {e}") from None
+
+    def _open(self):
+        size = len(self._mm)
+        fixed = len(BINARY_MAGIC) + 2 * _COUNT.size
+        if size < fixed or self._mm[:len(BINARY_MAGIC)] != BINARY_MAGIC:
+            raise ValueError("missing header (rebuild with python -m tools.catalog_store)")
+        self._count, header_len = struct.unpack_from("<QQ", self._mm, len(BINARY_MAGIC))
+        self._header_at = fixed
+        self._offsets_at = fixed + header_len
+        self._data_at = self._offsets_at + (self._count + 1) * _COUNT.size
+        if self._data_at > size:
+            raise ValueError(f"truncated: {size} bytes, offsets table ends at {self._data_at}")
+        if self._offset(0) != 0 or self._data_at + self._offset(self._count) != size:
+            raise ValueError("offsets table does not match the record data")
+
+    @cached_property
+    def _header(self) -> dict:
+        try:
+            header = json.loads(self._mm[self._header_at:self._offsets_at])
+        except ValueError as e:
+            raise ValueError(f"{self.path}: corrupt catalog header: {e}") from None
+        columns = [header.get(name) if isinstance(header, dict) else None for name in ("ids", "keywords", "hashes")]
+        if not all(isinstance(col, list) and len(col) == self._count for col in columns):
+            raise ValueError(f"{self.path}: catalog header columns do not have {self._count} rows")
+        return dict(zip(("ids", "keywords", "hashes"), columns))
+
+    @cached_property
+    def ids(self) -> tuple:
+        return tuple(sys.intern(str(pid)) if pid is not None else None for pid in self._header["ids"])
+
+    @cached_property
+    def keywords(self) -> list:
+        """Per-row keyword tuples, like CatalogStore.keywords; read from the header, no record decoded."""
+        return [_intern_all(kws) for kws in self._header["keywords"]]
+
+    @cached_property
+    def hashes(self) -> tuple:
+        return tuple(self._header["hashes"])
+
+    @cached_property
+    def _by_id(self) -> dict:
+        return {pid: row for row, pid in enumerate(self.ids) if pid is not None}
+
+    def _offset(self, i: int) -> int:
+        return _COUNT.unpack_from(self._mm, self._offsets_at + i * _COUNT.size)[0]
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(len(self)))]
+        if row < 0:
+            row += self._count
+        if not 0 <= row < self._count:
+            raise IndexError(row)
+        start, end = self._offset(row), self._offset(row + 1)
+        if not start <= end <= len(self._mm) - self._data_at:
+            raise ValueError(f"{self.path}: corrupt offsets for record {row}")
+        return json.loads(self._mm[self._data_at + start:self._data_at + end])
+
+    def get(self, product_id: str):
+        row = self._by_id.get(product_id)
+        return None if row is None else self[row]
+
+    def close(self):
+        if hasattr(self, "_mm"):
+            self._mm.close()
+        self._file.close()
+
+
+def write_binary(products, path: str):
+    """Write products (any iterable of dicts) as a binary index for MappedCatalog."""
+    products = list(products)
+    records = [json.dumps(p, ensure_ascii=False, separators=(",", ":")).encode("utf-8") for p in products]
+    header = json.dumps({
+        "ids": [p.get("id") for p in products],
+        "keywords": [list(p.get("keywords") or ()) for p in products],
+        "hashes": [product_hash(p) for p in products],
+    }, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(BINARY_MAGIC)
+        f.write(_COUNT.pack(len(records)))
+        f.write(_COUNT.pack(len(header)))
+        f.write(header)
+        offset = 0
+        f.write(_COUNT.pack(0))
+        for rec in records:
+            offset += len(rec)
+            f.write(_COUNT.pack(offset))
+        for rec in records:
+            f.write(rec)
+    os.replace(tmp, path)
+
+
+def load_catalog(path: str):
+    """Load a catalog by file extension: .pcat (mmap), .ndjson/.jsonl (streamed) or JSON array."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".pcat":
+        return MappedCatalog(path)
+    if ext in (".ndjson", ".jsonl"):
+        return CatalogStore.from_ndjson(path)
+    return CatalogStore.from_json(path)
+
+
+if __name__ == "__main__":
+    # Build a binary index: python -m tools.catalog_store product_catalog.json product_catalog.pcat
+    src, dst = sys.argv[1], sys.argv[2]
+    write_binary(load_catalog(src), dst)
+    print(f"✅ Wrote {dst}")
@@ -1,32 +1,171 @@
-# tools/tool_registry.py
+# tools/dynamic_tool_registry.py
+"""
+Process-wide, lazily-loaded tool registry.
+Tools are discovered once per process by reading the @tool-decorated
+functions out of each module's source (ast, no import). Specs are persisted
+in a manifest keyed by file mtimes, and a tool module is imported only when
+the tool is first called or handed to an Agent.
+"""
+import ast
 import importlib
+import json
 import os
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
-TOOLS_DIR = os.path.dirname(__file__)
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TOOLS_DIR)
+MANIFEST_PATH = os.environ.get("TOOL_MANIFEST_PATH", os.path.join(PROJECT_ROOT, ".cache", "tool_manifest.json"))
+EXCLUDED_FILES = {"__init__.py", "tool_registry.py", "dynamic_tool_registry.py"}
+
+_lock = threading.Lock()
+_registry = None  # tool name -> LazyTool
+
+
+def _is_tool_decorator(node) -> bool:
+    target = node.func if isinstance(node, ast.Call) else node
+    return (isinstance(target, ast.Name) and target.id == "tool") or \
+        (isinstance(target, ast.Attribute) and target.attr == "tool")
+
+
+def _describe(file_name: str, mtime: float) -> dict:
+    """Return the specs of every @tool function in one module, read from source."""
+    path = os.path.join(TOOLS_DIR, file_name)
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    specs = []
+    for node in tree.body:
+        if not isinstance(node, ast.FunctionDef) or not any(_is_tool_decorator(d) for d in node.decorator_list):
+            continue
+        args = node.args.args
+        defaults = [None] * (len(args) - len(node.args.defaults)) + node.args.defaults
+        specs.append({
+            "name": node.name,
+            "module": f"tools.{file_name[:-3]}",
+            "description": ast.get_docstring(node) or "",
+            "parameters": [
+                {
+                    "name": a.arg,
+                    "type": ast.unparse(a.annotation) if a.annotation else None,
+                    "required": d is None,
+                }
+                for a, d in zip(args, defaults)
+            ],
+        })
+    return {"file": file_name, "mtime": mtime, "tools": specs}
+
+
+def _tool_files() -> dict:
+    return {
+        f: os.path.getmtime(os.path.join(TOOLS_DIR, f))
+        for f in os.listdir(TOOLS_DIR)
+        if f.endswith(".py") and f not in EXCLUDED_FILES
+    }
+
+
+def load_manifest() -> dict:
+    """Return {file name: {"mtime", "tools"}}, re-reading only files whose mtime changed."""
+    files = _tool_files()
+    try:
+        with open(MANIFEST_PATH, encoding="utf-8") as f:
+            cached = json.load(f).get("files", {})
+    except (OSError, ValueError):
+        cached = {}
+
+    manifest, changed = {}, set(cached) != set(files)
+    for file_name, mtime in sorted(files.items()):
+        entry = cached.get(file_name)
+        if entry is None or entry.get("mtime") != mtime:
+            try:
+                entry = _describe(file_name, mtime)
+            except SyntaxError as e:
+                logger.warning(f"⚠️ Failed to parse tools.{file_name[:-3]}: {e}")
+                continue
+            changed = True
+        manifest[file_name] = entry
+
+    if changed:
+        try:
+            os.makedirs(os.path.dirname(MANIFEST_PATH), exist_ok=True)
+            tmp = f"{MANIFEST_PATH}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"files": manifest}, f, indent=2)
+            os.replace(tmp, MANIFEST_PATH)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write tool manifest: {e}")
+    return manifest
+
+
+class LazyTool:
+    """Proxy for a @tool function; its module is imported on first use."""
+
+    def __init__(self, spec: dict):
+        self.spec = spec
+        self.tool_name = spec["name"]
+        self.module = spec["module"]
+        self._tool = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Import the module and return the real strands tool object."""
+        if self._tool is None:
+            with self._lock:
+                if self._tool is None:
+                    self._tool = getattr(importlib.import_module(self.module), self.tool_name)
+                    logger.info(f"✅ Tool loaded: {self.module}.{self.tool_name}")
+        return self._tool
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+    def __repr__(self):
+        return f"LazyTool({self.module}.{self.tool_name}, loaded={self._tool is not None})"
+
+
+def _get_registry() -> dict:
+    global _registry
+    if _registry is None:
+        with _lock:
+            if _registry is None:
+                registry = {}
+                for entry in load_manifest().values():
+                    for spec in entry["tools"]:
+                        registry[spec["name"]] = LazyTool(spec)
+                _registry = registry
+    return _registry
+
+
+def refresh_tools():
+    """Drop the process-wide registry so the next lookup re-checks tool files."""
+    global _registry
+    with _lock:
+        _registry = None
+
+
+def list_tool_specs() -> list:
+    """Tool specs (name, description, parameters) without importing any tool module."""
+    return [t.spec for t in _get_registry().values()]
+
+
+def get_tool(name: str) -> LazyTool:
+    """Lazy proxy for one tool; raises KeyError for unknown names."""
+    return _get_registry()[name]
+
 
 def list_tools():
     """
     Auto-discover all tools in the tools/ folder that are decorated with @tool.
     Returns a list of tool objects that can be passed directly to the Agent.
+    Discovery runs once per process; later calls are dictionary lookups.
     """
     tool_list = []
-
-    for file in os.listdir(TOOLS_DIR):
-        if file.endswith(".py") and file != "__init__.py" and file != "tool_registry.py" and file != "dynamic_tool_registry.py":
-            module_name = f"tools.{file[:-3]}"  # remove .py
-            try:
-                module = importlib.import_module(module_name)
-                # Add any callable decorated with 'tool' (simplest: attributes ending without _private)
-                for attr_name in dir(module):
-                    attr = getattr(module, attr_name)
-                    if callable(attr) and hasattr(attr, "__wrapped__"):  # strands @tool uses __wrapped__
-                        tool_list.append(attr)
-                        logger.info(f"✅ Tool loaded: {module_name}.{attr_name}")
-            except Exception as e:
-                logger.warning(f"⚠️ Failed to import {module_name}: {e}")
-
+    for lazy in _get_registry().values():
+        try:
+            tool_list.append(lazy.load())
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to import {lazy.module}: {e}")
     return tool_list
@@ -0,0 +1,188 @@
+# tools/nova_dedup.py
+"""
+Content-addressed deduplication for Nova Reel generations.
+A generation is keyed by the (already truncated) narration text, model id and
+videoGenerationConfig without its seed. Completed keys map to their
+output.mp4 URI in a small SQLite file; identical requests that arrive while a
+job is running share that job's handle instead of starting another one.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from aws_clients import get_client
+from tools.nova_jobs import MODEL_ID, NovaJob, get_job_manager
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEDUP_PATH = os.environ.get("NOVA_DEDUP_PATH", os.path.join(PROJECT_ROOT, ".cache", "nova_videos.sqlite"))
+DETERMINISTIC_SEED = os.environ.get("NOVA_DETERMINISTIC_SEED", "0") == "1"
+MAX_SEED = 2147483646
+
+
+def generation_key(text: str, model_id: str = MODEL_ID, config: dict = None) -> str:
+    """sha256 over text, model id and the generation config minus its seed."""
+    config = {k: v for k, v in (config or {}).items() if k != "seed"}
+    raw = json.dumps([text, model_id, config], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def s3_object_exists(s3_uri: str) -> bool:
+    """HEAD the object so a deleted video is regenerated instead of returned."""
+    bucket, key = s3_uri.replace("s3://", "").split("/", 1)
+    try:
+        get_client("s3").head_object(Bucket=bucket, Key=key)
+        return True
+    except Exception:
+        return False
+
+
+def deterministic_seed(key: str) -> int:
+    """Stable seed in Nova's accepted range, derived from a generation key."""
+    return int(key[:16], 16) % (MAX_SEED + 1)
+
+
+class VideoStore:
+    """SQLite map of generation key -> completed video URI. Safe to share between threads."""
+
+    def __init__(self, path: str = DEDUP_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = None
+
+    def _conn(self):
+        if self._db is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS videos ("
+                " key TEXT PRIMARY KEY, video_s3_uri TEXT NOT NULL, invocation_arn TEXT, created REAL NOT NULL)"
+            )
+        return self._db
+
+    def get(self, key: str):
+        """Return {"video_s3_uri", "invocation_arn"} for a completed generation, or None."""
+        with self._lock:
+            row = self._conn().execute(
+                "SELECT video_s3_uri, invocation_arn FROM videos WHERE key = ?", (key,)
+            ).fetchone()
+        return {"video_s3_uri": row[0], "invocation_arn": row[1]} if row else None
+
+    def put(self, key: str, video_s3_uri: str, invocation_arn: str = None):
+        with self._lock:
+            db = self._conn()
+            db.execute(
+                "INSERT OR REPLACE INTO videos (key, video_s3_uri, invocation_arn, created) VALUES (?, ?, ?, ?)",
+                (key, video_s3_uri, invocation_arn, time.time()),
+            )
+            db.commit()
+
+    def forget(self, key: str):
+        with self._lock:
+            db = self._conn()
+            db.execute("DELETE FROM videos WHERE key = ?", (key,))
+            db.commit()
+
+
+class NovaDeduplicator:
+    """Front door for Nova submissions: completed hit -> finished handle, in-flight hit -> shared handle."""
+
+    def __init__(self, store: VideoStore = None, manager_for=get_job_manager, exists=None):
+        self.store = store or VideoStore()
+        self._manager_for = manager_for  # region -> NovaJobManager
+        self._exists = exists  # optional video_s3_uri -> bool check before trusting a stored URI
+        self._inflight = {}  # key -> NovaJob
+        self._starting = {}  # key -> Event set once the first identical request has submitted
+        self._lock = threading.Lock()
+        self.counters = {"completed_hits": 0, "inflight_hits": 0, "submitted": 0}
+
+    def _finished(self, key: str, stored: dict) -> NovaJob:
+        job = NovaJob(stored.get("invocation_arn") or f"dedup:{key}", None, 0)
+        job._finish("Completed", {"video_s3_uri": stored["video_s3_uri"], "deduplicated": True})
+        return job
+
+    def _on_done(self, key: str, job: NovaJob):
+        result = job.result()
+        if job.status == "Completed" and result.get("video_s3_uri"):
+            self.store.put(key, result["video_s3_uri"], job.invocation_arn)
+        with self._lock:
+            if self._inflight.get(key) is job:
+                del self._inflight[key]
+
+    def submit(self, text: str, config: dict, output_s3_uri: str, model_id: str = MODEL_ID,
+               region: str = "eu-west-1", timeout: float = None, deterministic: bool = DETERMINISTIC_SEED) -> NovaJob:
+        """
+        Return a NovaJob for this generation, reusing a completed or running one when possible.
+        With deterministic=True the seed is derived from the key, so regenerations are reproducible.
+        """
+        key = generation_key(text, model_id, config)
+        stored = self.store.get(key)
+        if stored and (self._exists is None or self._exists(stored["video_s3_uri"])):
+            self.counters["completed_hits"] += 1
+            logger.info(f"♻️ Reusing Nova video {stored['video_s3_uri']}")
+            return self._finished(key, stored)
+        if stored:
+            self.store.forget(key)
+
+        while True:
+            with self._lock:
+                job = self._inflight.get(key)
+                if job is not None:
+                    self.counters["inflight_hits"] += 1
+                    logger.info(f"♻️ Joining in-flight Nova job {job.invocation_arn}")
+                    return job
+                starting = self._starting.get(key)
+                if starting is None:
+                    starting = self._starting[key] = threading.Event()
+                    break
+            # An identical request is calling start_async_invoke right now; join it once it has an ARN
+            starting.wait()
+            stored = self.store.get(key)
+            if stored:
+                self.counters["completed_hits"] += 1
+                return self._finished(key, stored)
+
+        config = dict(config)
+        if deterministic:
+            config["seed"] = deterministic_seed(key)
+        model_input = {
+            "taskType": "TEXT_VIDEO",
+            "textToVideoParams": {"text": text},
+            "videoGenerationConfig": config,
+        }
+        try:
+            job = self._manager_for(region).submit(model_input, output_s3_uri, model_id=model_id, timeout=timeout)
+            with self._lock:
+                self._inflight[key] = job
+                self.counters["submitted"] += 1
+        finally:
+            with self._lock:
+                self._starting.pop(key, None)
+            starting.set()
+        job.add_done_callback(lambda j: self._on_done(key, j))
+        return job
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.counters, inflight=len(self._inflight))
+
+
+_deduplicator = None
+_deduplicator_lock = threading.Lock()
+
+
+def get_deduplicator() -> NovaDeduplicator:
+    """Process-wide deduplicator backed by DEDUP_PATH."""
+    global _deduplicator
+    with _deduplicator_lock:
+        if _deduplicator is None:
+            _deduplicator = NovaDeduplicator(exists=s3_object_exists)
+        return _deduplicator
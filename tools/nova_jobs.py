@@ -0,0 +1,209 @@
+# tools/nova_jobs.py
+"""
+Non-blocking Nova Reel job manager.
+submit() starts an async invocation and returns a NovaJob handle at once.
+One background poller thread tracks every outstanding invocation ARN with
+per-job adaptive backoff and deadlines, and completes each job's Future
+(so callers can wait, add callbacks, or fire-and-forget).
+When many jobs are due at once and the client supports it, statuses are
+fetched with one list_async_invokes call instead of one call per job.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from aws_clients import get_client
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+MODEL_ID = "amazon.nova-reel-v1:0"
+INITIAL_POLL_SECONDS = float(os.environ.get("NOVA_POLL_INITIAL", "10"))
+MAX_POLL_SECONDS = float(os.environ.get("NOVA_POLL_MAX", "60"))
+POLL_BACKOFF = 1.5
+JOB_TIMEOUT_SECONDS = float(os.environ.get("NOVA_JOB_TIMEOUT", "1800"))
+LIST_BATCH_THRESHOLD = 5  # due jobs needed before switching to list_async_invokes
+
+
+class NovaJob:
+    """Handle for one Nova Reel invocation; wraps a Future of the tool-style result dict."""
+
+    def __init__(self, invocation_arn: str, output_s3_uri: str, timeout: float):
+        self.invocation_arn = invocation_arn
+        self.output_s3_uri = output_s3_uri
+        self.submitted_at = time.monotonic()
+        self.deadline = self.submitted_at + timeout
+        self.interval = INITIAL_POLL_SECONDS
+        self.next_poll = self.submitted_at + self.interval
+        self.status = "InProgress"
+        self.future = Future()
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self, timeout: float = None) -> dict:
+        """Block until the job finishes: {"video_s3_uri": ...} or {"video_s3_uri": None, "error": ...}."""
+        return self.future.result(timeout)
+
+    def add_done_callback(self, fn):
+        """fn(job) is called from the poller thread when the job finishes."""
+        self.future.add_done_callback(lambda _: fn(self))
+
+    def _finish(self, status: str, result: dict):
+        self.status = status
+        result.setdefault("invocation_arn", self.invocation_arn)
+        if not self.future.done():
+            self.future.set_result(result)
+
+
+class NovaJobManager:
+    """Tracks many Nova async invocations from a single poller thread."""
+
+    def __init__(self, client=None, region: str = "eu-west-1", initial_interval: float = None,
+                 max_interval: float = None, default_timeout: float = None):
+        self._client = client
+        self.region = region
+        self.initial_interval = initial_interval or INITIAL_POLL_SECONDS
+        self.max_interval = max_interval or MAX_POLL_SECONDS
+        self.default_timeout = default_timeout or JOB_TIMEOUT_SECONDS
+        self._jobs = {}  # invocation ARN -> NovaJob
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_client("bedrock-runtime", self.region)
+        return self._client
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._jobs)
+
+    def submit(self, model_input: dict, output_s3_uri: str, model_id: str = MODEL_ID, timeout: float = None) -> NovaJob:
+        """Start a Nova invocation and track it. Raises if start_async_invoke fails."""
+        response = self.client.start_async_invoke(
+            modelId=model_id,
+            modelInput=model_input,
+            outputDataConfig={"s3OutputDataConfig": {"s3Uri": output_s3_uri}},
+        )
+        logger.info(f"Nova job started: {response['invocationArn']}")
+        return self.track(response["invocationArn"], output_s3_uri, timeout)
+
+    def track(self, invocation_arn: str, output_s3_uri: str = None, timeout: float = None) -> NovaJob:
+        """Track an already-started invocation."""
+        job = NovaJob(invocation_arn, output_s3_uri, timeout or self.default_timeout)
+        job.interval = self.initial_interval
+        job.next_poll = job.submitted_at + job.interval
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("NovaJobManager is shut down")
+            self._jobs.setdefault(invocation_arn, job)
+            job = self._jobs[invocation_arn]
+            self._ensure_thread()
+            self._cond.notify()
+        return job
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="nova-poller", daemon=True)
+            self._thread.start()
+
+    def shutdown(self):
+        """Stop polling; unfinished jobs are completed with an error."""
+        with self._cond:
+            self._stopped = True
+            jobs, self._jobs = list(self._jobs.values()), {}
+            self._cond.notify()
+        for job in jobs:
+            job._finish("Cancelled", {"video_s3_uri": None, "error": "Nova job manager shut down"})
+
+    # --- poller ---------------------------------------------------------
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped and not self._jobs:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                now = time.monotonic()
+                wake = min(min(j.next_poll, j.deadline) for j in self._jobs.values())
+                if wake > now:
+                    self._cond.wait(wake - now)
+                    continue
+                due = [j for j in self._jobs.values() if j.next_poll <= now or j.deadline <= now]
+            self._poll(due)
+
+    def _fetch_statuses(self, due: list) -> dict:
+        """Return {arn: response-like dict}; a missing ARN means "not fetched this round"."""
+        statuses = {}
+        if len(due) >= LIST_BATCH_THRESHOLD and hasattr(self.client, "list_async_invokes"):
+            try:
+                oldest = min(j.submitted_at for j in due)
+                since = time.time() - (time.monotonic() - oldest) - 60
+                kwargs = {"submitTimeAfter": since, "maxResults": 1000}
+                while True:
+                    page = self.client.list_async_invokes(**kwargs)
+                    for summary in page.get("asyncInvokeSummaries", []):
+                        statuses[summary["invocationArn"]] = summary
+                    if not page.get("nextToken"):
+                        break
+                    kwargs["nextToken"] = page["nextToken"]
+            except Exception as e:
+                logger.warning(f"⚠️ list_async_invokes failed, polling jobs one by one: {e}")
+        for job in due:
+            if job.invocation_arn not in statuses:
+                try:
+                    statuses[job.invocation_arn] = self.client.get_async_invoke(invocationArn=job.invocation_arn)
+                except Exception as e:
+                    logger.warning(f"⚠️ Failed to poll Nova job {job.invocation_arn}: {e}")
+        return statuses
+
+    def _poll(self, due: list):
+        statuses = self._fetch_statuses(due)
+        now = time.monotonic()
+        finished = []
+        for job in due:
+            info = statuses.get(job.invocation_arn)
+            status = info.get("status") if info else None
+            if status == "Completed":
+                bucket_uri = (info.get("outputDataConfig", {}).get("s3OutputDataConfig", {}).get("s3Uri")
+                              or job.output_s3_uri or "").rstrip("/")
+                video_uri = f"{bucket_uri}/output.mp4"
+                logger.info(f"✅ Video generated: {video_uri}")
+                finished.append((job, "Completed", {"video_s3_uri": video_uri}))
+            elif status == "Failed":
+                msg = info.get("failureMessage", "Unknown error")
+                logger.error(f"❌ Nova job failed: {msg}")
+                finished.append((job, "Failed", {"video_s3_uri": None, "error": msg}))
+            elif now >= job.deadline:
+                waited = now - job.submitted_at
+                logger.error(f"❌ Nova job {job.invocation_arn} exceeded its deadline ({waited:.0f}s)")
+                finished.append((job, "TimedOut", {"video_s3_uri": None,
+                                                   "error": f"Nova job did not complete within {waited:.0f}s"}))
+            else:
+                # Still running (or poll failed): back off, but never sleep past the deadline
+                job.interval = min(job.interval * POLL_BACKOFF, self.max_interval)
+                job.next_poll = min(now + job.interval, job.deadline)
+
+        with self._cond:
+            for job, _, _ in finished:
+                self._jobs.pop(job.invocation_arn, None)
+        for job, status, result in finished:
+            job._finish(status, result)
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def get_job_manager(region: str = "eu-west-1") -> NovaJobManager:
+    """Process-wide job manager per region."""
+    with _managers_lock:
+        if region not in _managers:
+            _managers[region] = NovaJobManager(region=region)
+        return _managers[region]
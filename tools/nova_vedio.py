@@ -1,17 +1,16 @@
-import boto3
-import time
 import random
 import logging
 import json
 import ast
 import os
 from strands import tool
+from aws_clients import get_client
+from tools.nova_dedup import get_deduplicator
+from tools.nova_jobs import get_job_manager
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
-s3 = boto3.client("s3")
-
 
 def extract_narration_text(script_s3_path: str) -> str:
     """
@@ -20,7 +19,7 @@ def extract_narration_text(script_s3_path: str) -> str:
     """
     bucket, key = script_s3_path.replace("s3://", "").split("/", 1)
     #logger.info(f"📄 (Good) Reading narration script from s3://{bucket}/{key}")
-    script_obj = s3.get_object(Bucket=bucket, Key=key)
+    script_obj = get_client("s3").get_object(Bucket=bucket, Key=key)
     logger.info(f"✅ Successfully read narration script from S3")
     script_content = script_obj["Body"].read().decode("utf-8")
     #logger.info(f"📜 Script content length: {len(script_content)} chars and text is :{script_content}")
@@ -45,15 +44,20 @@ def generate_nova_video(
     s3_bucket: str = None,
     s3_prefix: str = None,
     region: str = "eu-west-1",
+    wait: bool = True,
+    timeout_seconds: int = None,
+    dedup: bool = True,
 ):
     """
     Generate a video with Amazon Nova Reel using async API.
     - Reads narration text from S3 (JSON or dict-like file).
     - Cleans and truncates narration to 512 chars max.
     - Saves video to s3://{s3_bucket}/{s3_prefix}/nova_video/output.mp4
+    - The job is tracked by the shared NovaJobManager poller; wait=False returns
+      the invocation ARN immediately, timeout_seconds bounds the wait.
+    - dedup=True reuses the video of an identical earlier (or running) generation.
     """
 
-    bedrock_runtime = boto3.client("bedrock-runtime", region_name=region)
     #logger.info(f"🌍 Using Bedrock region: {region}")
     if not s3_bucket or not s3_prefix:
         #logger.info(f" The s3_bucket is {s3_bucket}, s3_prefix is {s3_prefix}")
@@ -84,55 +88,37 @@ def generate_nova_video(
     # --- Prepare Nova input ---
     model_id = "amazon.nova-reel-v1:0"
     seed = random.randint(0, 2147483646)
-    logger.info(f"-------- before calling nova api -------")
-    model_input = {
-        "taskType": "TEXT_VIDEO",
-        "textToVideoParams": {"text": narration_text},
-        "videoGenerationConfig": {
-            "fps": 24,
-            "durationSeconds": 6,
-            "dimension": "1280x720",
-            "seed": seed,
-        },
+    video_config = {
+        "fps": 24,
+        "durationSeconds": 6,
+        "dimension": "1280x720",
+        "seed": seed,
     }
-    logger.info(f"-------- after calling nova api -------")
     # Always output to nova_video/ under run prefix
     video_prefix = f"{s3_prefix}/nova_video"  # simple forward slash
     output_s3_uri = f"s3://{s3_bucket}/{video_prefix}/"
-    output_config = {"s3OutputDataConfig": {"s3Uri": output_s3_uri}}
     #logger.info(f"🎥 Video will be saved to: {output_s3_uri}" )
 
 
     logger.info("🎬 Submitting Nova Reel async job...")
     try:
-        response = bedrock_runtime.start_async_invoke(
-            modelId=model_id, modelInput=model_input, outputDataConfig=output_config
-        )
+        if dedup:
+            job = get_deduplicator().submit(narration_text, video_config, output_s3_uri,
+                                            model_id=model_id, region=region, timeout=timeout_seconds)
+        else:
+            model_input = {
+                "taskType": "TEXT_VIDEO",
+                "textToVideoParams": {"text": narration_text},
+                "videoGenerationConfig": video_config,
+            }
+            job = get_job_manager(region).submit(model_input, output_s3_uri, model_id=model_id, timeout=timeout_seconds)
     except Exception as e:
         logger.error(f"❌ Failed to start Nova job: {e}")
         return {"video_s3_uri": None, "error": str(e)}
 
-    invocation_arn = response["invocationArn"]
-    logger.info(f"Nova job started: {invocation_arn}")
-
-    # --- Poll job status ---
-    while True:
-        try:
-            job = bedrock_runtime.get_async_invoke(invocationArn=invocation_arn)
-            status = job["status"]
-        except Exception as e:
-            logger.error(f"❌ Failed to poll Nova job: {e}")
-            return {"video_s3_uri": None, "error": str(e)}
-
-        if status == "Completed":
-            bucket_uri = job["outputDataConfig"]["s3OutputDataConfig"]["s3Uri"]
-            video_uri = f"{bucket_uri}/output.mp4"
-            logger.info(f"✅ Video generated: {video_uri}")
-            return {"video_s3_uri": video_uri}
-        elif status == "Failed":
-            msg = job.get("failureMessage", "Unknown error")
-            logger.error(f"❌ Nova job failed: {msg}")
-            return {"video_s3_uri": None, "error": msg}
-        else:
-            logger.info("⏳ Job in progress... waiting 15s")
-            time.sleep(15)
+    if not wait and not job.done():
+        # Fire-and-forget: the shared poller keeps tracking the job
+        return {"video_s3_uri": None, "invocation_arn": job.invocation_arn, "status": "InProgress"}
+
+    # Only this call waits; polling happens on the manager's single background thread
+    return job.result()
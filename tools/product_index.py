@@ -0,0 +1,127 @@
+# tools/product_index.py
+"""
+Inverted keyword index over the product catalog.
+Built once when the catalog loads; a lookup only touches the postings of the
+query's tokens, so its cost does not grow with catalog size for typical queries.
+"""
+import heapq
+import math
+import re
+from collections import defaultdict
+from collections.abc import Sequence
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _stem(token: str) -> str:
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        token = token[:-1]
+    for suffix in ("ion", "ing"):
+        if len(token) > len(suffix) + 4 and token.endswith(suffix):
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text: str) -> list:
+    """
+    Lowercase word tokens with light suffix folding, so
+    "annuities" -> "annuity" and "protection" / "protecting" -> "protect".
+    """
+    return [_stem(t) for t in _TOKEN_RE.findall((text or "").lower())]
+
+
+def _keyword_tokens(keywords) -> dict:
+    """token -> number of the product's keywords containing it."""
+    counts = {}
+    for kw in keywords or ():
+        for tok in set(tokenize(kw)):
+            counts[tok] = counts.get(tok, 0) + 1
+    return counts
+
+
+class ProductIndex:
+    """token -> {product position: weight} postings built from product keywords."""
+
+    def __init__(self, products):
+        # Keep sequences as-is so compact catalogs materialize product dicts only on return
+        self.products = products if isinstance(products, Sequence) else list(products)
+        self._postings = defaultdict(dict)
+        for pos, keywords in enumerate(self._keyword_column()):
+            for tok, count in _keyword_tokens(keywords).items():
+                self._postings[tok][pos] = count
+        n = len(self.products)
+        self._idf = {tok: math.log(1 + n / len(post)) for tok, post in self._postings.items()}
+
+    def _keyword_column(self):
+        """Per-row keywords; column stores (CatalogStore, MappedCatalog) provide them without building products."""
+        column = getattr(self.products, "keywords", None)
+        if column is not None and len(column) == len(self.products):
+            return column
+        return (product.get("keywords", []) for product in self.products)
+
+    def updated(self, products, changed_rows, previous_products=None):
+        """
+        Copy-on-write index for `products`, which must keep the same rows in
+        the same order as this index (in-place edits). Only `changed_rows`
+        are re-tokenized; postings of untouched tokens are shared, so this
+        index stays valid for readers still holding it.
+        """
+        if len(products) != len(self.products):
+            raise ValueError("updated() needs the same number of rows; rebuild instead")
+        previous_products = previous_products if previous_products is not None else self.products
+        new = ProductIndex.__new__(ProductIndex)
+        new.products = products
+        new._postings = defaultdict(dict, self._postings)
+        new._idf = dict(self._idf)
+        touched = set()
+
+        def writable(tok):
+            if tok not in touched:
+                new._postings[tok] = dict(new._postings.get(tok, {}))
+                touched.add(tok)
+            return new._postings[tok]
+
+        for row in changed_rows:
+            for tok in _keyword_tokens(previous_products[row].get("keywords")):
+                writable(tok).pop(row, None)
+            for tok, count in _keyword_tokens(products[row].get("keywords")).items():
+                writable(tok)[row] = count
+
+        n = len(products)
+        for tok in touched:
+            if new._postings[tok]:
+                new._idf[tok] = math.log(1 + n / len(new._postings[tok]))
+            else:
+                del new._postings[tok]
+                new._idf.pop(tok, None)
+        return new
+
+    def __len__(self):
+        return len(self.products)
+
+    def scores(self, user_text: str) -> dict:
+        """Return {product position: score} for every product sharing a token with the text."""
+        acc = defaultdict(float)
+        for tok in set(tokenize(user_text)):
+            postings = self._postings.get(tok)
+            if postings:
+                idf = self._idf[tok]
+                for pos, weight in postings.items():
+                    acc[pos] += weight * idf
+        return acc
+
+    def search(self, user_text: str, top_k: int = 5) -> list:
+        """
+        Top-k matching products as [{"product": ..., "score": ...}], best first.
+        Ties keep catalog order. An empty list means no product matched.
+        """
+        acc = self.scores(user_text)
+        best = heapq.nsmallest(top_k, acc.items(), key=lambda kv: (-kv[1], kv[0]))
+        return [{"product": self.products[pos], "score": round(score, 4)} for pos, score in best]
+
+    def best(self, user_text: str):
+        """Best matching product, or None when nothing matches."""
+        hits = self.search(user_text, top_k=1)
+        return hits[0]["product"] if hits else None
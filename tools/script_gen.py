@@ -1,13 +1,40 @@
 # tools/script_gen.py
-import boto3
+import json
 import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from strands import tool
-from bedrock_helper import call_bedrock
+from aws_clients import get_client
+from bedrock_helper import MODEL_ID, call_bedrock, submit_bedrock
+from prompt_builder import PromptTemplate
+from tools.artifact_store import artifact_digest, artifact_store
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
-s3 = boto3.client("s3", region_name="eu-west-1")
+S3_REGION = "eu-west-1"
+# Bump when the prompts below change so cached narrations are not reused
+PROMPT_TEMPLATE_VERSION = "2"
+TOOL_VERSION = "1"
+BATCH_PROMPT_TEMPLATE_VERSION = "2"
+BATCH_SIZE = int(os.environ.get("SCRIPT_BATCH_SIZE", "8"))
+MAX_NARRATION_CHARS = 500
+
+# Instructions are the static (cacheable) system prompt; only the product info varies per call
+NARRATION_PROMPT = PromptTemplate("""
+You are a helpful AI assistant specialized in insurance product narration.
+Generate a concise, clear, and engaging product description suitable for narration in under {max_chars} characters.
+Always produce non-empty, human-readable text, even if the description is missing.
+Return ONLY plain text.
+""", "Product info:\n{product_text}", call_site="generate_script", max_chars=MAX_NARRATION_CHARS)
+
+def _product_text(product: dict) -> str:
+    product_name = product.get("name", "Unknown Product")
+    product_desc = product.get("short_description") or "This product offers valuable benefits."
+    product_benefits = ", ".join(product.get("benefits", []))
+    return f"{product_name} - {product_desc}\nBenefits: {product_benefits}"
+
 
 @tool
 def generate_script(product, s3_bucket: str, s3_prefix: str) -> dict:
@@ -25,32 +52,30 @@ def generate_script(product, s3_bucket: str, s3_prefix: str) -> dict:
         # 🔥 Normalize input (dict OR string)
         if isinstance(product, dict):
             product_name = product.get("name", "Unknown Product")
-            product_desc = product.get("short_description") or "This product offers valuable benefits."
-            product_benefits = ", ".join(product.get("benefits", []))
-            product_text = f"{product_name} - {product_desc}\nBenefits: {product_benefits}"
+            product_text = _product_text(product)
         elif isinstance(product, str):
             product_text = product
         else:
             return {"error": "Product parameter must be a dictionary or string."}
 
-        # 🔥 Construct robust LLM prompt
-        prompt = f"""
-You are a helpful AI assistant specialized in insurance product narration.
-Generate a concise, clear, and engaging product description suitable for narration in under 500 characters.
-Always produce non-empty, human-readable text, even if the description is missing.
-
-Product info:
-{product_text}
+        key = f"{s3_prefix}/narration_script.txt"
+        digest = artifact_digest("narration", product=product_text, template=PROMPT_TEMPLATE_VERSION,
+                                 model=MODEL_ID, tool=TOOL_VERSION)
+        cached_uri = artifact_store.fetch(s3_bucket, "narration", digest, "narration_script.txt", key)
+        if cached_uri:
+            return {"narration_script_s3_uri": cached_uri, "cached": True}
 
-Return ONLY plain text.
-"""
+        # 🔥 Construct robust LLM prompt
+        prompt = NARRATION_PROMPT.render(product_text=product_text)
 
         logger.info("🤖 Calling Bedrock LLM for script generation...")
         #logger.info(f"📝 Prompt: {prompt}")
 
         # 🔥 Call Bedrock with exception handling
         try:
-            result = call_bedrock(prompt)
+            # Same product -> same narration; reuse cached responses across runs
+            result = call_bedrock(prompt, cache=True, system=NARRATION_PROMPT.static,
+                                  call_site=NARRATION_PROMPT.call_site)
         except Exception as e:
             logger.error(f"❌ Bedrock call failed: {e}")
             return {"error": f"Bedrock call failed: {e}"}
@@ -84,15 +109,127 @@ Return ONLY plain text.
 
         # 🔥 Upload to S3
         try:
-            key = f"{s3_prefix}/narration_script.txt"
-            s3.put_object(Bucket=s3_bucket, Key=key, Body=narration_text.encode("utf-8"))
+            get_client("s3", S3_REGION).put_object(Bucket=s3_bucket, Key=key, Body=narration_text.encode("utf-8"))
             s3_uri = f"s3://{s3_bucket}/{key}"
         except Exception as e:
             logger.error(f"❌ Failed to upload narration to S3: {e}")
             return {"error": f"S3 upload failed: {e}"}
 
+        artifact_store.save(s3_bucket, "narration", digest, "narration_script.txt", key)
         return {"narration_script_s3_uri": s3_uri}
 
     except Exception as e:
         logger.error(f"❌ generate_script failed: {e}")
         return {"error": str(e)}
+
+
+# ---------------------------------------------------------------------------
+# Packed multi-product generation for bulk runs
+# ---------------------------------------------------------------------------
+
+BATCH_PROMPT = PromptTemplate("""
+You are a helpful AI assistant specialized in insurance product narration.
+For EACH product in the user message, write a concise, clear, and engaging description suitable for narration.
+Each narration must be non-empty plain text under {max_chars} characters.
+Respond with ONLY a JSON object mapping every product id to its narration, e.g.
+{{"<id>": "<narration>", ...}}
+""", "Products (JSON):\n{products}", call_site="generate_scripts_batch", max_chars=MAX_NARRATION_CHARS)
+
+
+def _parse_narrations(text: str) -> dict:
+    """Pull the JSON object out of the model reply (tolerates code fences and chatter)."""
+    match = re.search(r"\{.*\}", text or "", re.DOTALL)
+    if not match:
+        raise ValueError("no JSON object in response")
+    data = json.loads(match.group(0))
+    if not isinstance(data, dict):
+        raise ValueError("response is not a JSON object")
+    return data
+
+
+def _validate_narration(narration) -> str:
+    """Return a validation error, or None when the narration is usable."""
+    if not isinstance(narration, str) or not narration.strip():
+        return "empty narration"
+    if len(narration.strip()) > MAX_NARRATION_CHARS:
+        return f"narration is {len(narration.strip())} chars (max {MAX_NARRATION_CHARS})"
+    return None
+
+
+def _batch_prompt(items: dict) -> str:
+    packed = json.dumps([{"id": pid, "info": text} for pid, text in items.items()], ensure_ascii=False, indent=1)
+    return BATCH_PROMPT.render(products=packed)
+
+
+def generate_scripts_batch(products: list, s3_bucket: str, s3_prefix: str, batch_size: int = BATCH_SIZE,
+                           retries: int = 2) -> dict:
+    """
+    Generate narrations for many products with one Bedrock call per batch_size
+    products. Each reply is split per product id and validated (non-empty,
+    <= 500 chars); only the products that failed are re-prompted. Results go
+    to s3://{s3_bucket}/{s3_prefix}/{product_id}/narration_script.txt.
+    Returns {product_id: {"narration_script_s3_uri": ...} | {"error": ...}}.
+    """
+    if not s3_bucket or not s3_prefix:
+        return {p.get("id"): {"error": "s3_bucket and s3_prefix are required."} for p in products}
+
+    results, pending, digests = {}, {}, {}
+    for product in products:
+        pid = str(product.get("id") or product.get("name"))
+        key = f"{s3_prefix}/{pid}/narration_script.txt"
+        text = _product_text(product)
+        digests[pid] = artifact_digest("narration", product=text, template=f"batch-{BATCH_PROMPT_TEMPLATE_VERSION}",
+                                       model=MODEL_ID, tool=TOOL_VERSION)
+        cached_uri = artifact_store.fetch(s3_bucket, "narration", digests[pid], "narration_script.txt", key)
+        if cached_uri:
+            results[pid] = {"narration_script_s3_uri": cached_uri, "cached": True}
+        else:
+            pending[pid] = text
+
+    narrations, errors = {}, {}
+    for attempt in range(retries + 1):
+        if not pending:
+            break
+        ids = list(pending)
+        batches = [ids[i:i + batch_size] for i in range(0, len(ids), batch_size)]
+        logger.info(f"🤖 Packed script generation: {len(ids)} products in {len(batches)} calls (attempt {attempt + 1})")
+        futures = [
+            # ~150 tokens per 500-char narration plus JSON overhead. Not prompt-cached: a
+            # malformed reply must not be replayed on retry (narrations are cached per product)
+            (batch, submit_bedrock(_batch_prompt({pid: pending[pid] for pid in batch}),
+                                   max_tokens=200 * len(batch) + 100, cache=False,
+                                   system=BATCH_PROMPT.static, call_site=BATCH_PROMPT.call_site))
+            for batch in batches
+        ]
+        for batch, future in futures:
+            try:
+                reply = future.result()
+                parsed = _parse_narrations(reply.get("content", [{}])[0].get("text", ""))
+            except Exception as e:
+                logger.warning(f"⚠️ Packed batch failed: {e}")
+                errors.update({pid: str(e) for pid in batch})
+                continue
+            for pid in batch:
+                error = _validate_narration(parsed.get(pid))
+                if error:
+                    errors[pid] = error
+                else:
+                    narrations[pid] = parsed[pid].strip()
+                    errors.pop(pid, None)
+                    pending.pop(pid)
+
+    def upload(pid):
+        key = f"{s3_prefix}/{pid}/narration_script.txt"
+        try:
+            get_client("s3", S3_REGION).put_object(Bucket=s3_bucket, Key=key, Body=narrations[pid].encode("utf-8"))
+        except Exception as e:
+            logger.error(f"❌ Failed to upload narration for {pid}: {e}")
+            return pid, {"error": f"S3 upload failed: {e}"}
+        artifact_store.save(s3_bucket, "narration", digests[pid], "narration_script.txt", key)
+        return pid, {"narration_script_s3_uri": f"s3://{s3_bucket}/{key}"}
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results.update(pool.map(upload, narrations))
+    for pid in pending:
+        results[pid] = {"error": f"Narration failed validation: {errors.get(pid, 'missing from response')}"}
+    return results
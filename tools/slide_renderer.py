@@ -0,0 +1,161 @@
+# tools/slide_renderer.py
+"""
+Pillow slide rasterizer.
+Turns a slide deck ([{"title", "content"}, ...], as written by create_slides)
+into PNG frames for tools.video. Fonts and template backgrounds are built
+once per process; each PNG is named by a hash of its slide, template and
+size, so unchanged slides are never re-rendered. render_decks() spreads the
+slides of many decks over a process pool for batch jobs.
+"""
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from PIL import Image, ImageDraw, ImageFont
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTPUT_DIR = os.environ.get("SLIDE_OUTPUT_DIR", os.path.join(PROJECT_ROOT, ".cache", "slides"))
+MAX_WORKERS = int(os.environ.get("SLIDE_RENDER_WORKERS", str(os.cpu_count() or 1)))
+MIN_SLIDES_FOR_POOL = 8  # below this, process start-up costs more than it saves
+RENDERER_VERSION = "1"  # bump when layout changes so old PNGs are not reused
+SIZE = (1280, 720)
+PNG_COMPRESS_LEVEL = 1  # frames are consumed locally by ffmpeg; favour encode speed over size
+
+FONT_CANDIDATES = [p for p in (os.environ.get("SLIDE_FONT_PATH"),) if p] + [
+    "DejaVuSans.ttf", "Arial.ttf", "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+]
+BOLD_FONT_CANDIDATES = [p for p in (os.environ.get("SLIDE_BOLD_FONT_PATH"),) if p] + [
+    "DejaVuSans-Bold.ttf", "Arial Bold.ttf", "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+]
+
+TEMPLATES = {
+    "default": {"background": "#ffffff", "accent": "#0b5394", "title": "#0b5394", "body": "#222222"},
+    "dark": {"background": "#1c1f26", "accent": "#f1c232", "title": "#ffffff", "body": "#d9d9d9"},
+}
+
+
+@lru_cache(maxsize=None)
+def _font(size: int, bold: bool = False):
+    for path in (BOLD_FONT_CANDIDATES if bold else FONT_CANDIDATES):
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size=size)  # Pillow >= 10.1
+    except TypeError:
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=None)
+def _template(name: str, size: tuple) -> Image.Image:
+    """Background with accent bars; callers copy() it before drawing."""
+    colors = TEMPLATES.get(name, TEMPLATES["default"])
+    width, height = size
+    img = Image.new("RGB", size, colors["background"])
+    draw = ImageDraw.Draw(img)
+    bar = max(4, height // 60)
+    draw.rectangle([0, 0, width, bar], fill=colors["accent"])
+    draw.rectangle([0, height - bar, width, height], fill=colors["accent"])
+    return img
+
+
+def _wrap(draw, text: str, font, max_width: int) -> list:
+    lines = []
+    for paragraph in str(text or "").splitlines() or [""]:
+        line = ""
+        for word in paragraph.split():
+            candidate = f"{line} {word}" if line else word
+            if line and draw.textlength(candidate, font=font) > max_width:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        lines.append(line)
+    return lines
+
+
+def slide_hash(slide: dict, template: str = "default", size: tuple = SIZE) -> str:
+    raw = json.dumps([slide, template, list(size), RENDERER_VERSION], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def draw_slide(slide: dict, template: str = "default", size: tuple = SIZE) -> Image.Image:
+    colors = TEMPLATES.get(template, TEMPLATES["default"])
+    width, height = size
+    margin = width // 16
+    img = _template(template, tuple(size)).copy()
+    draw = ImageDraw.Draw(img)
+
+    title_font = _font(max(12, height // 12), bold=True)
+    body_font = _font(max(10, height // 24))
+    y = height // 8
+    for line in _wrap(draw, slide.get("title", ""), title_font, width - 2 * margin):
+        draw.text((margin, y), line, font=title_font, fill=colors["title"])
+        y += int(title_font.size * 1.25) if hasattr(title_font, "size") else 24
+    y += height // 20
+
+    content = slide.get("content", "")
+    items = content if isinstance(content, (list, tuple)) else [content]
+    line_height = int(body_font.size * 1.4) if hasattr(body_font, "size") else 18
+    for item in items:
+        prefix = "• " if len(items) > 1 else ""
+        for i, line in enumerate(_wrap(draw, f"{prefix}{item}", body_font, width - 2 * margin)):
+            if y + line_height > height - margin:
+                return img  # out of room; the rest of the text is cut
+            x = margin if i == 0 or not prefix else margin + margin // 3  # indent wrapped bullet lines
+            draw.text((x, y), line, font=body_font, fill=colors["body"])
+            y += line_height
+    return img
+
+
+def render_slide(slide: dict, out_dir: str = OUTPUT_DIR, template: str = "default", size: tuple = SIZE) -> tuple:
+    """Render one slide to out_dir/slide_<hash>.png. Returns (path, rendered); rendered is False when reused."""
+    path = os.path.join(out_dir, f"slide_{slide_hash(slide, template, size)[:24]}.png")
+    if os.path.exists(path):
+        return path, False
+    os.makedirs(out_dir, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    draw_slide(slide, template, size).save(tmp, format="PNG", compress_level=PNG_COMPRESS_LEVEL)
+    os.replace(tmp, path)
+    return path, True
+
+
+def _render_job(args):
+    return render_slide(*args)
+
+
+def render_deck(slides: list, out_dir: str = OUTPUT_DIR, template: str = "default", size: tuple = SIZE) -> list:
+    """PNG paths for one deck, in slide order, rendered in this process."""
+    return [render_slide(slide, out_dir, template, size)[0] for slide in slides]
+
+
+def render_decks(decks: list, out_dir: str = OUTPUT_DIR, template: str = "default", size: tuple = SIZE,
+                 max_workers: int = MAX_WORKERS) -> list:
+    """
+    PNG paths for many decks ([[path, ...], ...] in input order). Slides are
+    deduplicated by content hash and spread over a process pool, so a batch
+    uses every core and identical slides are drawn once.
+    """
+    unique = {}
+    for deck in decks:
+        for slide in deck:
+            unique.setdefault(slide_hash(slide, template, size), slide)
+    jobs = [(slide, out_dir, template, size) for slide in unique.values()]
+
+    if max_workers <= 1 or len(jobs) < MIN_SLIDES_FOR_POOL:
+        results = [_render_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_render_job, jobs, chunksize=max(1, len(jobs) // (max_workers * 4))))
+
+    paths = dict(zip(unique.keys(), (path for path, _ in results)))
+    rendered = sum(1 for _, was_rendered in results if was_rendered)
+    logger.info(f"🖼️ Slides: {rendered} rendered, {len(results) - rendered} reused across {len(decks)} decks")
+    return [[paths[slide_hash(slide, template, size)] for slide in deck] for deck in decks]
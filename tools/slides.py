@@ -1,16 +1,35 @@
 # tools/slides.py
-import json, boto3, logging
+import json, logging
 from strands import tool
+from aws_clients import get_client
+from tools.artifact_store import artifact_digest, artifact_store
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
-s3 = boto3.client("s3", region_name="eu-west-1")
+S3_REGION = "eu-west-1"
+TOOL_VERSION = "1"
+
+def _upload_rendered(slides: list, s3_bucket: str, s3_prefix: str) -> dict:
+    """Rasterize the deck locally (reusing unchanged PNGs) and upload the frames next to slides.json."""
+    from tools.slide_renderer import render_deck  # Pillow is only needed when rendering
+
+    paths = render_deck(slides)
+    s3 = get_client("s3", S3_REGION)
+    uris = []
+    for i, path in enumerate(paths):
+        key = f"{s3_prefix}/slides/slide_{i:02d}.png"
+        s3.upload_file(path, s3_bucket, key, ExtraArgs={"ContentType": "image/png"})
+        uris.append(f"s3://{s3_bucket}/{key}")
+    return {"slide_images": paths, "slide_image_s3_uris": uris}
+
 
 @tool
-def create_slides(product: dict, s3_bucket: str, s3_prefix: str) -> dict:
+def create_slides(product: dict, s3_bucket: str, s3_prefix: str, render: bool = False) -> dict:
     """
     Save simple JSON slide deck into S3.
+    With render=True the deck is also rasterized to PNG frames (local paths
+    for tools.video plus S3 copies under {s3_prefix}/slides/).
     """
     if not isinstance(product, dict):
         return {"error": "Product must be a dict"}
@@ -23,8 +42,17 @@ def create_slides(product: dict, s3_bucket: str, s3_prefix: str) -> dict:
             {"title": "Benefits", "content": ", ".join(product.get("benefits", []))},
         ]
         key = f"{s3_prefix}/slides.json"
-        s3.put_object(Bucket=s3_bucket, Key=key, Body=json.dumps(slides))
-        return {"slides_s3_uri": f"s3://{s3_bucket}/{key}"}
+        digest = artifact_digest("slides", slides=slides, tool=TOOL_VERSION)
+        cached_uri = artifact_store.fetch(s3_bucket, "slides", digest, "slides.json", key)
+        if cached_uri:
+            result = {"slides_s3_uri": cached_uri, "cached": True}
+        else:
+            get_client("s3", S3_REGION).put_object(Bucket=s3_bucket, Key=key, Body=json.dumps(slides))
+            artifact_store.save(s3_bucket, "slides", digest, "slides.json", key)
+            result = {"slides_s3_uri": f"s3://{s3_bucket}/{key}"}
+        if render:
+            result.update(_upload_rendered(slides, s3_bucket, s3_prefix))
+        return result
     except Exception as e:
         logger.error(f"❌ create_slides failed: {e}")
         return {"error": str(e)}
@@ -2,25 +2,31 @@
 """
 Tool Registry for dynamic LLM-based orchestration.
 
-All tools used in the insurance-media workflow are registered here.
-The agent_dynamic.py will load tools from this registry only.
+All tools used in the insurance-media workflow are registered here, by name.
+Lookups go through tools.dynamic_tool_registry: specs come from the cached
+manifest and a tool module is imported only when the tool is first used.
 """
 
-from tools.catalog import recommend_product
-from tools.script_gen import generate_script
-from tools.tts import synthesize_speech
-from tools.slides import create_slides
-from tools.nova_vedio import generate_nova_video
+from tools.dynamic_tool_registry import get_tool, list_tool_specs as _all_tool_specs
+
+WORKFLOW_TOOLS = ("recommend_product", "generate_script", "synthesize_speech", "create_slides", "generate_nova_video")
+
+
+def list_tool_specs():
+    """Specs (name, description, parameters) of the workflow tools, without importing them."""
+    specs = {spec["name"]: spec for spec in _all_tool_specs()}
+    return [specs[name] for name in WORKFLOW_TOOLS]
+
+
+def list_lazy_tools():
+    """Callable proxies for the workflow tools; each module is imported on its first call."""
+    return [get_tool(name) for name in WORKFLOW_TOOLS]
+
 
 def list_tools():
     """
     Return a list of all callable tool functions.
     Do NOT return strings or file paths. Must be imported @tool functions.
+    These are handed to strands Agents, so the tool modules are imported here.
     """
-    return [
-        recommend_product,
-        generate_script,
-        synthesize_speech,
-        create_slides,
-        generate_nova_video
-    ]
+    return [get_tool(name).load() for name in WORKFLOW_TOOLS]
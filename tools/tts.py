@@ -1,19 +1,146 @@
 # tools/tts.py
-import boto3
 import logging
+import os
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from strands import tool
+from aws_clients import get_client
+from tools.artifact_store import artifact_digest, artifact_store
+from tools.audio_cache import audio_cache, audio_key
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
-polly = boto3.client("polly", region_name="us-east-1")
-s3 = boto3.client("s3", region_name="eu-west-1")
+POLLY_REGION = "us-east-1"
+S3_REGION = "eu-west-1"
+VOICE_ID = "Joanna"
+ENGINE = os.environ.get("TTS_ENGINE", "standard")
+OUTPUT_FORMAT = "mp3"
+TOOL_VERSION = "1"
+
+# Polly rejects synthesize_speech text over 3000 characters; stay under it
+MAX_CHUNK_CHARS = int(os.environ.get("TTS_MAX_CHUNK_CHARS", "2900"))
+MAX_WORKERS = int(os.environ.get("TTS_MAX_WORKERS", "4"))
+MIN_PART_BYTES = 5 * 1024 * 1024  # S3 minimum size for every multipart part but the last
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def _split_long(sentence: str, max_chars: int) -> list:
+    """Break a sentence longer than max_chars on word boundaries (hard-cut only unbroken runs)."""
+    pieces, current = [], ""
+    for word in sentence.split(" "):
+        while len(word) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(word[:max_chars])
+            word = word[max_chars:]
+        if current and len(current) + 1 + len(word) > max_chars:
+            pieces.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_text(text: str, max_chars: int = MAX_CHUNK_CHARS) -> list:
+    """Pack whole sentences into chunks of at most max_chars characters, in order."""
+    chunks, current = [], ""
+    for sentence in _SENTENCE_RE.split(" ".join(text.split())):
+        pieces = [sentence] if len(sentence) <= max_chars else _split_long(sentence, max_chars)
+        for piece in pieces:
+            if current and len(current) + 1 + len(piece) > max_chars:
+                chunks.append(current)
+                current = piece
+            else:
+                current = f"{current} {piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _synthesize_chunk(polly, text: str) -> bytes:
+    """MP3 bytes for one chunk, from the audio cache when this exact text was voiced before."""
+    key = audio_key(text, VOICE_ID, ENGINE, OUTPUT_FORMAT)
+    audio = audio_cache.get(key, OUTPUT_FORMAT)
+    if audio is not None:
+        return audio
+    resp = polly.synthesize_speech(Text=text, OutputFormat=OUTPUT_FORMAT, VoiceId=VOICE_ID, Engine=ENGINE)
+    with resp["AudioStream"] as stream:
+        audio = stream.read()
+    audio_cache.put(key, audio, OUTPUT_FORMAT)
+    return audio
+
+
+def synthesize_chunks(polly, chunks: list, max_workers: int = MAX_WORKERS):
+    """
+    Yield each chunk's MP3 bytes in order while later chunks synthesize concurrently.
+    At most 2 * max_workers chunks are in flight or buffered at any time.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="polly") as pool:
+        pending = deque()
+        remaining = iter(chunks)
+        try:
+            for chunk in remaining:
+                pending.append(pool.submit(_synthesize_chunk, polly, chunk))
+                if len(pending) >= 2 * max_workers:
+                    break
+            while pending:
+                audio = pending.popleft().result()
+                chunk = next(remaining, None)
+                if chunk is not None:
+                    pending.append(pool.submit(_synthesize_chunk, polly, chunk))
+                yield audio
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def upload_stream(s3, bucket: str, key: str, parts, content_type: str = "audio/mpeg"):
+    """
+    Upload an iterable of byte strings to one S3 object in order. Small totals
+    use a single put_object; larger ones a multipart upload, so only one
+    part (>= 5 MB) is buffered at a time.
+    """
+    buffer, upload_id, uploaded = bytearray(), None, []
+
+    def flush():
+        part = s3.upload_part(Bucket=bucket, Key=key, UploadId=upload_id,
+                              PartNumber=len(uploaded) + 1, Body=bytes(buffer))
+        uploaded.append({"PartNumber": len(uploaded) + 1, "ETag": part["ETag"]})
+        buffer.clear()
+
+    try:
+        for data in parts:
+            buffer += data
+            if len(buffer) >= MIN_PART_BYTES:
+                if upload_id is None:
+                    upload_id = s3.create_multipart_upload(Bucket=bucket, Key=key, ContentType=content_type)["UploadId"]
+                flush()
+        if upload_id is None:
+            s3.put_object(Bucket=bucket, Key=key, Body=bytes(buffer), ContentType=content_type)
+            return
+        if buffer:
+            flush()
+        s3.complete_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id,
+                                     MultipartUpload={"Parts": uploaded})
+    except Exception:
+        if upload_id is not None:
+            s3.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
+
 
 @tool
 def synthesize_speech(script_s3_uri: str, s3_bucket: str, s3_prefix: str) -> dict:
     """
     Convert script text (from S3) into speech using Polly.
     Save directly to S3 as MP3.
+    Long scripts are split on sentence boundaries, synthesized concurrently
+    and streamed to S3 in order.
     """
     if not script_s3_uri or not script_s3_uri.startswith("s3://"):
         return {"error": "Invalid script_s3_uri"}
@@ -21,15 +148,31 @@ def synthesize_speech(script_s3_uri: str, s3_bucket: str, s3_prefix: str) -> dic
         return {"error": "s3_bucket and s3_prefix are required"}
 
     try:
+        s3 = get_client("s3", S3_REGION)
+        polly = get_client("polly", POLLY_REGION)
         bucket, key = script_s3_uri.replace("s3://", "").split("/", 1)
         obj = s3.get_object(Bucket=bucket, Key=key)
         text = obj["Body"].read().decode("utf-8")
 
-        resp = polly.synthesize_speech(Text=text, OutputFormat="mp3", VoiceId="Joanna")
+        audio_s3_key = f"{s3_prefix}/narration_audio.mp3"
+        digest = artifact_digest("audio", text=text, voice=VOICE_ID, engine=ENGINE, format=OUTPUT_FORMAT,
+                                 tool=TOOL_VERSION)
+        cached_uri = artifact_store.fetch(s3_bucket, "audio", digest, "narration_audio.mp3", audio_s3_key)
+        if cached_uri:
+            return {"narration_audio_s3_uri": cached_uri, "cached": True}
 
-        audio_key = f"{s3_prefix}/narration_audio.mp3"
-        s3.upload_fileobj(resp["AudioStream"], s3_bucket, audio_key)
-        return {"narration_audio_s3_uri": f"s3://{s3_bucket}/{audio_key}"}
+        chunks = split_text(text)
+        if not chunks:
+            return {"error": "Script is empty"}
+        if len(chunks) == 1:
+            audio = _synthesize_chunk(polly, chunks[0])
+            s3.put_object(Bucket=s3_bucket, Key=audio_s3_key, Body=audio, ContentType="audio/mpeg")
+        else:
+            logger.info(f"🔊 Synthesizing {len(chunks)} chunks ({len(text)} chars) with {MAX_WORKERS} workers")
+            # Polly MP3 output has no container header, so chunk streams concatenate cleanly
+            upload_stream(s3, s3_bucket, audio_s3_key, synthesize_chunks(polly, chunks))
+        artifact_store.save(s3_bucket, "audio", digest, "narration_audio.mp3", audio_s3_key)
+        return {"narration_audio_s3_uri": f"s3://{s3_bucket}/{audio_s3_key}", "chunks": len(chunks)}
 
     except Exception as e:
         logger.error(f"❌ synthesize_speech failed: {e}")
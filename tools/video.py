@@ -1,12 +1,127 @@
 # /tools/video.py
-import subprocess, os
+import io, logging, os, subprocess, threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from strands import tool
 
-@tool
-def render_video(images: list, audio: str, out_path: str) -> str:
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+X264_PRESETS = ("ultrafast", "superfast", "veryfast", "faster", "fast", "medium", "slow", "slower", "veryslow")
+VIDEO_PRESET = os.environ.get("VIDEO_PRESET", "veryfast")
+VIDEO_FPS = int(os.environ.get("VIDEO_FPS", "24"))
+MAX_CONCURRENT_ENCODES = int(os.environ.get("VIDEO_MAX_ENCODES", str(max(1, (os.cpu_count() or 1) // 2))))
+
+_encode_slots = threading.BoundedSemaphore(MAX_CONCURRENT_ENCODES)
+
+
+def configure_encodes(max_concurrent: int):
+    """Change how many ffmpeg processes may run at once (applies to encodes started afterwards)."""
+    global _encode_slots, MAX_CONCURRENT_ENCODES
+    MAX_CONCURRENT_ENCODES = max(1, max_concurrent)
+    _encode_slots = threading.BoundedSemaphore(MAX_CONCURRENT_ENCODES)
+
+
+def _frame_bytes(frame) -> bytes:
+    """PNG bytes for a frame given as a path, PNG bytes or a PIL image."""
+    if isinstance(frame, (bytes, bytearray)):
+        return bytes(frame)
+    if isinstance(frame, (str, os.PathLike)):
+        with open(frame, "rb") as f:
+            return f.read()
+    buf = io.BytesIO()
+    frame.save(buf, format="PNG", compress_level=0)  # ffmpeg decodes it straight away; skip compression
+    return buf.getvalue()
+
+
+def _read_progress(stream, on_progress, tail: deque):
+    """Parse `-progress pipe:2` key=value blocks from stderr; keep other lines for error messages."""
+    block = {}
+    for raw in iter(stream.readline, b""):
+        line = raw.decode("utf-8", "replace").strip()
+        key, sep, value = line.partition("=")
+        if not sep or " " in key:
+            tail.append(line)
+            continue
+        block[key] = value
+        if key == "progress":
+            if on_progress:
+                try:
+                    on_progress(block)
+                except Exception as e:
+                    logger.warning(f"⚠️ Progress callback failed: {e}")
+            block = {}
+
+
+def encode_video(frames, audio: str, out_path: str, duration: float = 5, preset: str = None,
+                 fps: int = VIDEO_FPS, on_progress=None) -> str:
     """
-    Combine slides + narration into a video using ffmpeg.
+    Encode slides + narration by streaming PNG frames into ffmpeg's stdin
+    (image2pipe), so no concat list or frame files are needed. Each frame is
+    shown for `duration` seconds. on_progress(dict) receives ffmpeg's
+    progress blocks (frame, out_time_ms, speed, progress=continue|end).
+    At most MAX_CONCURRENT_ENCODES encodes run at once.
     """
+    preset = preset or VIDEO_PRESET
+    if preset not in X264_PRESETS:
+        raise ValueError(f"Unknown x264 preset: {preset}")
+    out_dir = os.path.dirname(out_path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+
+    cmd = [
+        "ffmpeg", "-y", "-nostats", "-loglevel", "error", "-progress", "pipe:2",
+        "-f", "image2pipe", "-c:v", "png", "-framerate", f"1/{duration}", "-i", "pipe:0",
+        "-i", os.path.abspath(audio),
+        "-c:v", "libx264", "-preset", preset, "-tune", "stillimage", "-r", str(fps), "-pix_fmt", "yuv420p",
+        "-c:a", "aac", "-shortest", os.path.abspath(out_path),
+    ]
+    slots = _encode_slots
+    if MAX_CONCURRENT_ENCODES > 1:
+        # Share the cores between concurrent encodes instead of letting each x264 claim all of them
+        cmd[-1:-1] = ["-threads", str(max(1, (os.cpu_count() or 1) // MAX_CONCURRENT_ENCODES))]
+
+    with slots:
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE, stdout=subprocess.DEVNULL)
+        tail = deque(maxlen=20)
+        reader = threading.Thread(target=_read_progress, args=(proc.stderr, on_progress, tail), daemon=True)
+        reader.start()
+        try:
+            for frame in frames:
+                proc.stdin.write(_frame_bytes(frame))
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass  # ffmpeg exited early; its return code and stderr explain why
+        except BaseException:
+            proc.kill()
+            raise
+        finally:
+            returncode = proc.wait()
+            reader.join()
+    if returncode != 0:
+        logger.error(f"❌ ffmpeg exited with {returncode}: {' | '.join(tail)}")
+        raise subprocess.CalledProcessError(returncode, cmd, stderr="\n".join(tail))
+    return out_path
+
+
+def render_videos(jobs: list, max_concurrent: int = None) -> list:
+    """
+    Encode many videos concurrently. jobs: [{"images", "audio", "out_path", ...encode_video kwargs}].
+    Returns [{"out_path"} | {"out_path", "error"}] in job order.
+    """
+    def run(job):
+        job = dict(job)
+        try:
+            return {"out_path": encode_video(job.pop("images"), job.pop("audio"), job.pop("out_path"), **job)}
+        except Exception as e:
+            logger.error(f"❌ Encode failed: {e}")
+            return {"out_path": None, "error": getattr(e, "stderr", None) or str(e)}
+
+    with ThreadPoolExecutor(max_workers=max_concurrent or MAX_CONCURRENT_ENCODES) as pool:
+        return list(pool.map(run, jobs))
+
+
+def _render_concat(images: list, audio: str, out_path: str, duration: float, preset: str) -> str:
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
     out_dir = os.path.dirname(out_path)
     listf = os.path.join(out_dir, "slides.txt")
@@ -14,13 +129,29 @@ def render_video(images: list, audio: str, out_path: str) -> str:
     with open(listf, "w", encoding="utf-8") as f:
         for img in images:
             f.write(f"file '{os.path.abspath(img)}'\n")
-            f.write("duration 5\n")
+            f.write(f"duration {duration}\n")
         f.write(f"file '{os.path.abspath(images[-1])}'\n")
 
     cmd = [
         "ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", listf,
-        "-i", os.path.abspath(audio), "-c:v", "libx264", "-pix_fmt", "yuv420p",
+        "-i", os.path.abspath(audio), "-c:v", "libx264", "-preset", preset, "-pix_fmt", "yuv420p",
         "-c:a", "aac", "-shortest", os.path.abspath(out_path)
     ]
-    subprocess.run(cmd, check=True)
+    with _encode_slots:
+        subprocess.run(cmd, check=True)
     return out_path
+
+
+@tool
+def render_video(images: list, audio: str, out_path: str, duration: float = 5, preset: str = None,
+                 mode: str = "pipe") -> str:
+    """
+    Combine slides + narration into a video using ffmpeg.
+    mode="pipe" streams the frames into ffmpeg's stdin; mode="concat" uses a
+    slides.txt concat list. preset picks the x264 speed/size trade-off.
+    """
+    if mode == "concat":
+        if preset and preset not in X264_PRESETS:
+            raise ValueError(f"Unknown x264 preset: {preset}")
+        return _render_concat(images, audio, out_path, duration, preset or VIDEO_PRESET)
+    return encode_video(images, audio, out_path, duration=duration, preset=preset)